@@ -3,7 +3,8 @@ import pandas as pd
 from os import *
 from datetime import *
 from pathlib import *
-from scraper import scrape_and_save
+from scraper import scrape_and_save, get_price_history
+from dataset import ProductDataset, DATASET_DIR, MANIFEST_NAME
 
 
 # Page configuration
@@ -16,7 +17,11 @@ st.set_page_config(
 # ===== HELPER FUNCTIONS =====
 
 def get_scraped_files():
-    """Get list of all scraped data files with their details"""
+    """
+    Get list of all scraped data files with their details: products_*.csv
+    exports plus the dataset segments listed in its manifest (scheduled jobs
+    append to the dataset by default)
+    """
     scraped_dir = Path('scraped_data')
     if not scraped_dir.exists():
         return []
@@ -32,6 +37,19 @@ def get_scraped_files():
             'path': str(file)
         })
     
+    # Only read an existing manifest (ProductDataset() would create the directory)
+    if Path(DATASET_DIR, MANIFEST_NAME).exists():
+        for segment in ProductDataset(DATASET_DIR).segments():
+            segment_file = Path(segment['path'])
+            if not segment_file.exists():
+                continue
+            files.append({
+                'filename': f"{segment['site']} / {segment['job']} ({segment['rows']} products)",
+                'size_kb': round(segment_file.stat().st_size / 1024, 2),
+                'modified': segment['written_at'],
+                'path': str(segment_file)
+            })
+    
     # Sort by modified time (newest first)
     files.sort(key=lambda x: x['modified'], reverse=True)
     return files
@@ -180,7 +198,7 @@ with st.sidebar:
                     """)
                 
                 with col2:
-                    if st.button("📂 View", key=file['filename']):
+                    if st.button("📂 View", key=file['path']):
                         st.session_state.selected_file = file['path']
         else:
             st.info("📭 No scraped files yet. Run scraper to generate data.")
@@ -420,6 +438,43 @@ if st.button("🚀 Start Scraping", width='stretch', type="primary"):
                    "• Try a different e-commerce site")
 
 
+# ===== PRICE HISTORY =====
+st.markdown("---")
+st.subheader("📈 Price History")
+st.write("Every scrape is recorded in `scraped_data/price_history.db`. Look up one product, "
+         "or list recent price / stock / availability changes.")
+
+price_history = get_price_history()
+history_col1, history_col2 = st.columns([3, 1])
+
+with history_col1:
+    product_query = st.text_input(
+        "🔎 Product code, URL or name",
+        value="",
+        placeholder="Leave empty to see recent changes"
+    )
+
+with history_col2:
+    changes_days = st.number_input("Changes in last N days", min_value=1, max_value=365, value=1)
+
+if product_query:
+    matches = price_history.find_products(product_query)
+    if matches.empty:
+        st.info("📭 No product with that code, URL or name in the price history yet.")
+    else:
+        labels = {row.product_id: f"{row.product_name} ({row.site})" for row in matches.itertuples()}
+        product_id = st.selectbox("Product", list(labels), format_func=labels.get)
+        product_history = price_history.history(product_id)
+        st.line_chart(product_history.set_index("scraped_at")["price_value"])
+        st.dataframe(product_history, width='stretch')
+else:
+    since = datetime.now() - timedelta(days=int(changes_days))
+    changes = price_history.changes_since(since)
+    st.markdown(f"**{len(changes)} new or changed products since {since.strftime('%Y-%m-%d %H:%M')}**")
+    if not changes.empty:
+        st.dataframe(changes, width='stretch', height=400)
+
+
 # Footer
 st.markdown("""
 <div style="text-align: center; color: #666; font-size: 0.9rem; margin-top: 3rem;">
@@ -0,0 +1,225 @@
+"""
+Local caches for repeated scrapes
+HTTPCache stores page bodies + validators (ETag / Last-Modified) per URL so
+scheduled runs can send conditional requests and reuse parsed products on 304.
+ResultCache remembers the last parsed products per URL under a normalized
+content fingerprint, for sites that send no validators.
+Both store the parse version (selectors + parser, see scraper.parse_version())
+with the products: products parsed by another version are not reused.
+"""
+
+import re
+import json
+import hashlib
+import os
+from datetime import datetime
+
+CACHE_DIR = os.path.join("scraped_data", ".cache")
+
+
+# Parts of a page that change on every request without changing the products:
+# scripts/styles (nonces, tracking), comments, CSRF tokens and request timestamps
+VOLATILE_PATTERNS = [
+    re.compile(r"<script\b[^>]*>.*?</script\s*>", re.I | re.S),
+    re.compile(r"<style\b[^>]*>.*?</style\s*>", re.I | re.S),
+    re.compile(r"<!--.*?-->", re.S),
+    re.compile(r"<(?:input|meta)\b[^>]*(?:csrf|token|nonce)[^>]*>", re.I),
+    re.compile(
+        r"""\s(?:nonce|data-nonce|[\w-]*csrf[\w-]*|data-request-id|data-timestamp)\s*=\s*"""
+        r"""(?:"[^"]*"|'[^']*'|[^\s>]+)""",
+        re.I,
+    ),
+    re.compile(r"\b\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?"),
+]
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def fingerprint_html(html: str):
+    """
+    Hash of the page with volatile parts (see VOLATILE_PATTERNS) removed and
+    whitespace collapsed, so re-renders of an unchanged listing hash the same.
+    """
+    for pattern in VOLATILE_PATTERNS:
+        html = pattern.sub("", html)
+    html = WHITESPACE_RE.sub(" ", html).strip()
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+
+def _url_key(url: str):
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def _write_atomic(file_path: str, data: str):
+    """Write to a temp file and rename, so readers never see half-written files."""
+    tmp_path = f"{file_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(data)
+    os.replace(tmp_path, file_path)
+
+
+class HTTPCache:
+    """
+    On-disk HTTP cache keyed by URL.
+
+    For every URL it keeps:
+    - <key>.html : last response body
+    - <key>.json : url, ETag, Last-Modified, fetch time and the products parsed from the body
+
+    Usage:
+        headers = cache.conditional_headers(url)   # If-None-Match / If-Modified-Since
+        ... on 304: products = cache.load_products(url)
+        ... on 200: cache.store(url, html, resp.headers, products)
+    """
+
+    def __init__(self, directory: str = None):
+        self.directory = os.path.join(directory or CACHE_DIR, "http")
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _paths(self, url: str):
+        key = _url_key(url)
+        return (
+            os.path.join(self.directory, f"{key}.json"),
+            os.path.join(self.directory, f"{key}.html"),
+        )
+
+    def lookup(self, url: str):
+        """
+        Returns: cached metadata dict for url, or None if nothing is cached
+        """
+        meta_path, _ = self._paths(url)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return meta if meta.get("url") == url else None
+
+    def conditional_headers(self, url: str):
+        """
+        Returns: dict of conditional request headers for url (empty if not cached)
+        """
+        meta = self.lookup(url)
+        if not meta:
+            return {}
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def load_body(self, url: str):
+        _, body_path = self._paths(url)
+        try:
+            with open(body_path, encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def load_products(self, url: str, version: str = None):
+        """
+        Returns: list of product dicts parsed from the cached body, or None
+        (also when they were parsed by another parse version)
+        """
+        meta = self.lookup(url)
+        if not meta or (version is not None and meta.get("version") != version):
+            return None
+        return meta.get("products")
+
+    def store(self, url: str, html: str, headers, products, version: str = None, revalidated: bool = False):
+        """
+        Save body, validators and parsed products for url.
+        revalidated: headers are from a 304, validators it does not repeat are kept
+        Responses without ETag / Last-Modified are not cached (nothing to revalidate).
+        Returns: True if the entry was stored
+        """
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if revalidated:
+            meta = self.lookup(url) or {}
+            etag = etag or meta.get("etag")
+            last_modified = last_modified or meta.get("last_modified")
+        if not etag and not last_modified:
+            return False
+
+        meta_path, body_path = self._paths(url)
+        _write_atomic(body_path, html)
+        _write_atomic(meta_path, json.dumps({
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "version": version,
+            "products": [dict(p) for p in products],
+        }, ensure_ascii=False))
+        return True
+
+
+class ResultCache:
+    """
+    Last parsed result per URL, keyed by the page's content fingerprint.
+
+    A record holds the fingerprint, the products and the files they were
+    saved to (with size + mtime), so an unchanged page can skip both the
+    parse and the export when those files are still as we left them.
+    """
+
+    def __init__(self, directory: str = None):
+        self.directory = os.path.join(directory or CACHE_DIR, "results")
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, url: str):
+        return os.path.join(self.directory, f"{_url_key(url)}.json")
+
+    def lookup(self, url: str, fingerprint: str = None, version: str = None):
+        """
+        Returns: the stored record for url if its fingerprint and parse version
+        match (any fingerprint / version when None is given), else None
+        """
+        try:
+            with open(self._path(url), encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if record.get("url") != url:
+            return None
+        if fingerprint is not None and record.get("fingerprint") != fingerprint:
+            return None
+        if version is not None and record.get("version") != version:
+            return None
+        return record
+
+    def store(self, url: str, fingerprint: str, products, saved_files=(), version: str = None):
+        """Save the parsed products for url together with the files they were written to."""
+        files = []
+        for file_path in saved_files:
+            if file_path and os.path.exists(file_path):
+                st = os.stat(file_path)
+                files.append([file_path, st.st_size, st.st_mtime])
+
+        _write_atomic(self._path(url), json.dumps({
+            "url": url,
+            "fingerprint": fingerprint,
+            "version": version,
+            "stored_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "products": [dict(p) for p in products],
+            "saved_files": files,
+        }, ensure_ascii=False))
+
+    @staticmethod
+    def files_current(record, expected_paths):
+        """
+        True if the record's saved files are exactly expected_paths and none of
+        them was modified (or removed) since they were written.
+        """
+        files = record.get("saved_files") or []
+        if sorted(f[0] for f in files) != sorted(expected_paths):
+            return False
+        for file_path, size, mtime in files:
+            try:
+                st = os.stat(file_path)
+            except OSError:
+                return False
+            if st.st_size != size or st.st_mtime != mtime:
+                return False
+        return True
@@ -0,0 +1,162 @@
+"""
+Append-only product dataset
+Every save adds a new segment file under Hive-style partitions
+    scraped_data/dataset/date=YYYY-MM-DD/site=<host>/job=<job name>/part-....parquet
+instead of overwriting products_YYYYMMDD files, so several runs per day
+(or several scheduled jobs at once) never clobber each other.
+Segments are written to a temp file and renamed into place; a segment only
+becomes visible to readers once its line is in the manifest (_manifest.jsonl).
+"""
+
+import json
+import os
+import uuid
+from datetime import datetime
+from urllib.parse import quote, urlsplit
+
+import pandas as pd
+
+DATASET_DIR = os.path.join("scraped_data", "dataset")
+MANIFEST_NAME = "_manifest.jsonl"
+DEFAULT_JOB = "manual"
+
+
+def site_of(url: str):
+    """Returns: partition value for a URL's site (lowercase host, without www.)"""
+    host = urlsplit(url).netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def _partition_value(value):
+    # Hive-style escaping (same as pyarrow.dataset's "uri" segment encoding)
+    return quote(str(value), safe="")
+
+
+def _matches(value, wanted):
+    if wanted is None:
+        return True
+    if isinstance(wanted, (list, tuple, set, frozenset)):
+        return value in wanted
+    return value == wanted
+
+
+class ProductDataset:
+    """
+    Partitioned, append-only store of scraped products.
+
+    Usage:
+        dataset = ProductDataset()
+        dataset.append(write_fn, rows=len(products), site="example.com", job="Daily Job")
+        df = dataset.read(date="2025-12-26", site="example.com")
+
+    write_fn(file_path) writes one segment file (Parquet or CSV); the dataset
+    picks the partition, the unique file name and does the atomic rename.
+    """
+
+    def __init__(self, directory: str = None):
+        self.directory = directory or DATASET_DIR
+        self.manifest_path = os.path.join(self.directory, MANIFEST_NAME)
+        os.makedirs(self.directory, exist_ok=True)
+
+    def partition_dir(self, date: str, site: str, job: str):
+        return os.path.join(
+            self.directory,
+            f"date={_partition_value(date)}",
+            f"site={_partition_value(site)}",
+            f"job={_partition_value(job)}",
+        )
+
+    def append(self, write, rows: int, site: str, job: str = None, extension: str = "parquet",
+               url: str = None):
+        """
+        Add one segment to the dataset.
+
+        Args:
+            write: callable(file_path) that writes the segment file
+            rows (int): number of products in the segment (recorded in the manifest)
+            site (str): site partition (see site_of())
+            job (str): job partition (default: "manual")
+            extension (str): "parquet" or "csv"
+            url (str): source URL, recorded in the manifest
+
+        Returns: path of the new segment file
+        """
+        now = datetime.now()
+        job = job or DEFAULT_JOB
+        date = now.strftime("%Y-%m-%d")
+
+        directory = self.partition_dir(date, site, job)
+        os.makedirs(directory, exist_ok=True)
+        file_name = f"part-{now.strftime('%H%M%S')}-{os.getpid()}-{uuid.uuid4().hex[:8]}.{extension}"
+        file_path = os.path.join(directory, file_name)
+
+        # Write the whole segment under a temp name, then rename: readers never see half a file
+        tmp_path = os.path.join(directory, f".{file_name}.tmp")
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, file_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        self._add_to_manifest({
+            "path": os.path.relpath(file_path, self.directory).replace(os.sep, "/"),
+            "date": date,
+            "site": site,
+            "job": job,
+            "format": extension,
+            "rows": rows,
+            "url": url,
+            "written_at": now.strftime("%Y-%m-%d %H:%M:%S"),
+        })
+        return file_path
+
+    def _add_to_manifest(self, entry):
+        # One write() of one line in append mode: concurrent writers do not interleave
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        fd = os.open(self.manifest_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+
+    def segments(self, date=None, site=None, job=None):
+        """
+        Manifest entries of the segments in the matching partitions.
+        Each filter is a single value or a list of values (None = all).
+        Returns: list of dicts (path is made absolute under the dataset directory)
+        """
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                lines = f.readlines()
+        except OSError:
+            return []
+
+        entries = []
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # torn last line of a crashed writer
+            if _matches(entry["date"], date) and _matches(entry["site"], site) and _matches(entry["job"], job):
+                entry["path"] = os.path.join(self.directory, *entry["path"].split("/"))
+                entries.append(entry)
+        return entries
+
+    def read(self, date=None, site=None, job=None):
+        """
+        Load the matching partitions into one DataFrame, with date / site / job
+        columns added. Only the matching segment files are opened.
+        Returns: pd.DataFrame (empty if nothing matches)
+        """
+        frames = []
+        for entry in self.segments(date, site, job):
+            if not os.path.exists(entry["path"]):
+                continue
+            if entry["format"] == "parquet":
+                frame = pd.read_parquet(entry["path"])
+            else:
+                frame = pd.read_csv(entry["path"])
+            frames.append(frame.assign(date=entry["date"], site=entry["site"], job=entry["job"]))
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
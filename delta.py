@@ -0,0 +1,159 @@
+"""
+Change detection between consecutive scrapes of the same URL
+The last snapshot of every URL is kept as {product identity: state hash,
+product}; a new scrape is diffed against it and only added / removed /
+changed products are written to scraped_data/deltas/, with a summary.
+"""
+
+import os
+import json
+import hashlib
+from datetime import datetime
+
+from cache import CACHE_DIR, _url_key, _write_atomic
+from dataset import site_of
+from history import TRACKED_FIELDS, product_identity
+
+DELTA_DIR = os.path.join("scraped_data", "deltas")
+
+
+def state_hash(product):
+    """Short hash of the fields that count as a change (TRACKED_FIELDS)"""
+    state = "\x1f".join(str(product.get(field) or "") for field in TRACKED_FIELDS)
+    return hashlib.blake2b(state.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class ProductDelta:
+    """
+    Result of diffing one scrape against the previous snapshot of the same URL.
+    added / removed: lists of {"product_id", "product"}
+    changed: list of {"product_id", "changes": {field: [old, new]}, "product"}
+    """
+
+    def __init__(self, url, previous_at=None):
+        self.url = url
+        self.previous_at = previous_at
+        self.added = []
+        self.removed = []
+        self.changed = []
+        self.unchanged = 0
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def summary(self):
+        return {
+            "added": len(self.added),
+            "removed": len(self.removed),
+            "changed": len(self.changed),
+            "unchanged": self.unchanged,
+        }
+
+    def describe(self):
+        if self.previous_at is None:
+            return f"first snapshot, {len(self.added)} products"
+        return (f"{len(self.added)} added, {len(self.removed)} removed, "
+                f"{len(self.changed)} changed, {self.unchanged} unchanged")
+
+    def to_dict(self):
+        return {
+            "url": self.url,
+            "previous_at": self.previous_at,
+            "summary": self.summary(),
+            "added": self.added,
+            "removed": self.removed,
+            "changed": self.changed,
+        }
+
+
+def diff_products(previous, products, url, previous_at=None):
+    """
+    Compare products with a previous snapshot ({product_id: [state_hash, product dict]}).
+    Only products whose state hash differs are compared field by field.
+    Returns: (ProductDelta, new snapshot dict)
+    """
+    delta = ProductDelta(url, previous_at)
+    snapshot = {}
+    for product in products:
+        product_id = product_identity(product, url)
+        if product_id is not None:
+            record = product.to_dict() if hasattr(product, "to_dict") else dict(product)
+            snapshot[product_id] = [state_hash(product), record]
+
+    for product_id, (digest, product) in snapshot.items():
+        old = previous.get(product_id)
+        if old is None:
+            delta.added.append({"product_id": product_id, "product": product})
+        elif old[0] != digest:
+            changes = {
+                field: [old[1].get(field), product.get(field)]
+                for field in TRACKED_FIELDS if old[1].get(field) != product.get(field)
+            }
+            delta.changed.append({"product_id": product_id, "changes": changes, "product": product})
+        else:
+            delta.unchanged += 1
+
+    for product_id, (_, product) in previous.items():
+        if product_id not in snapshot:
+            delta.removed.append({"product_id": product_id, "product": product})
+
+    return delta, snapshot
+
+
+class ChangeDetector:
+    """
+    Keeps the last snapshot per URL (scraped_data/.cache/snapshots) and writes
+    a delta file for every scrape that changed something.
+
+    Usage:
+        delta, delta_path = detector.detect(url, products)
+    """
+
+    def __init__(self, directory: str = None, delta_directory: str = None):
+        self.directory = os.path.join(directory or CACHE_DIR, "snapshots")
+        self.delta_directory = delta_directory or DELTA_DIR
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, url: str):
+        return os.path.join(self.directory, f"{_url_key(url)}.json")
+
+    def load(self, url: str):
+        """
+        Returns: (snapshot dict, taken_at) of the last scrape of url, or ({}, None)
+        """
+        try:
+            with open(self._path(url), encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return {}, None
+        if record.get("url") != url:
+            return {}, None
+        return record["products"], record["taken_at"]
+
+    def detect(self, url: str, products):
+        """
+        Diff products against the last snapshot of url, write the delta file
+        (only when something changed) and make products the new snapshot.
+        Returns: (ProductDelta, delta file path or None)
+        """
+        previous, previous_at = self.load(url)
+        delta, snapshot = diff_products(previous, products, url, previous_at)
+        now = datetime.now()
+
+        delta_path = None
+        if delta:
+            os.makedirs(self.delta_directory, exist_ok=True)
+            site = site_of(url).replace(":", "_") or "page"
+            delta_path = os.path.join(
+                self.delta_directory, f"delta_{site}_{now.strftime('%Y%m%d_%H%M%S')}_{_url_key(url)[:8]}.json"
+            )
+            document = delta.to_dict()
+            document["scraped_at"] = now.strftime("%Y-%m-%d %H:%M:%S")
+            _write_atomic(delta_path, json.dumps(document, ensure_ascii=False, indent=1))
+
+        _write_atomic(self._path(url), json.dumps({
+            "url": url,
+            "taken_at": now.strftime("%Y-%m-%d %H:%M:%S"),
+            "products": snapshot,
+        }, ensure_ascii=False))
+        return delta, delta_path
@@ -0,0 +1,220 @@
+"""
+URL frontier for large crawls / refreshes
+Holds the URLs still to fetch, one priority queue per domain. URLs are
+deduplicated on their canonical form (history.normalize_url: no scheme,
+www., tracking parameters or fragment), so the same page listed twice, or
+with different utm_* tags, is fetched once. The fetcher takes URLs from the
+domain that is ready soonest, so one slow or strict host never blocks the rest.
+"""
+
+import re
+import io
+import gzip
+import hashlib
+from heapq import heappush, heappop, heapreplace
+from itertools import count
+from threading import Lock
+from time import monotonic
+from urllib.parse import urldefrag, urlsplit
+from xml.etree.ElementTree import iterparse
+
+from history import normalize_url
+
+_normalize_url = normalize_url.__wrapped__
+
+DEFAULT_PRIORITY = 0
+
+
+def host_of(url: str):
+    """Returns: the per-domain queue key of a URL (lowercase host[:port], as HostThrottle uses)"""
+    return urlsplit(url).netloc.lower()
+
+
+def url_fingerprint(url: str):
+    """64-bit hash of the canonical URL (an int in a set costs far less than the URL string)"""
+    # Uncached: every URL is added once, it would only evict normalize_url's cache entries
+    digest = hashlib.blake2b(_normalize_url(url).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def _open_sitemap(f):
+    # Buffered binary file object; gzipped sitemaps (.xml.gz) are detected by their magic bytes
+    if f.peek(2)[:2] == b"\x1f\x8b":
+        return gzip.GzipFile(fileobj=f)
+    return f
+
+
+def iter_sitemap(source):
+    """
+    Stream the <loc> entries of a sitemap (urlset) or sitemap index without
+    loading the document into memory: each entry is dropped once read.
+    source: file path or binary file object (plain or gzipped XML); a path
+    is opened and closed here, a file object is left open
+    Yields: ("url", page URL) or ("sitemap", nested sitemap URL)
+    """
+    raw = open(source, "rb") if isinstance(source, str) else source
+    buffered = raw if hasattr(raw, "peek") else io.BufferedReader(raw)
+    f = _open_sitemap(buffered)
+    try:
+        root = loc = None
+        for event, elem in iterparse(f, events=("start", "end")):
+            if root is None:
+                root = elem
+            if event == "start":
+                continue
+            tag = elem.tag.rsplit("}", 1)[-1]
+            if tag == "loc":
+                loc = (elem.text or "").strip()
+            elif tag in ("url", "sitemap"):
+                if loc:
+                    yield tag, loc
+                loc = None
+                # Detach finished entries from the root too: cleared but still
+                # attached, 200k empty <url> elements would add up to ~16 MB
+                root.clear()
+    finally:
+        if isinstance(source, str):
+            f.close()
+            raw.close()
+        elif buffered is not raw:
+            buffered.detach()  # closing our wrapper would close the caller's file
+
+
+class URLFrontier:
+    """
+    Deduplicated, prioritized URLs to fetch, queued per domain.
+
+    Usage:
+        frontier = URLFrontier(priority_rules=[(r"/laptops", 10)])
+        frontier.add_file("urls.txt")
+        frontier.add_sitemap("sitemap.xml.gz")
+        while frontier:
+            url = frontier.pop(HOST_THROTTLE.ready_in)
+
+    Within a domain, higher priority URLs come first (then insertion order).
+    Across domains, pop() takes the domain that can be fetched soonest;
+    ready_in(domain) tells it how long a domain still has to wait (e.g.
+    HostThrottle.ready_in), otherwise domains simply take turns.
+    Thread-safe.
+    """
+
+    def __init__(self, priority_rules=()):
+        # (regex, priority) pairs: the first pattern found in a URL sets its default priority
+        self.priority_rules = [(re.compile(pattern), priority) for pattern, priority in priority_rules]
+        self._seen = set()
+        self._queues = {}   # domain -> heap of (-priority, seq, url)
+        self._ready = []    # heap of (ready_at, seq, domain) for domains with queued URLs
+        self._seq = count()
+        self._pending = 0
+        self._lock = Lock()
+
+    @classmethod
+    def from_urls(cls, urls, priority_rules=()):
+        frontier = cls(priority_rules)
+        frontier.add_many(urls)
+        return frontier
+
+    def __len__(self):
+        return self._pending
+
+    def __contains__(self, url):
+        # True if url (in any spelling with the same canonical form) was ever added
+        return url_fingerprint(url) in self._seen
+
+    def priority_of(self, url: str):
+        for pattern, priority in self.priority_rules:
+            if pattern.search(url):
+                return priority
+        return DEFAULT_PRIORITY
+
+    def add(self, url: str, priority: int = None):
+        """
+        Queue url unless its canonical form was added before.
+        Returns: True if the URL was queued
+        """
+        url = urldefrag(url.strip())[0]
+        if not url:
+            return False
+        if priority is None:
+            priority = self.priority_of(url)
+        fingerprint = url_fingerprint(url)
+        domain = host_of(url)
+
+        with self._lock:
+            if fingerprint in self._seen:
+                return False
+            self._seen.add(fingerprint)
+            queue = self._queues.get(domain)
+            if queue is None:
+                queue = self._queues[domain] = []
+                heappush(self._ready, (0.0, next(self._seq), domain))
+            heappush(queue, (-priority, next(self._seq), url))
+            self._pending += 1
+        return True
+
+    def add_many(self, urls, priority: int = None):
+        """Returns: number of URLs queued (duplicates are skipped)"""
+        return sum(self.add(url, priority) for url in urls)
+
+    def add_file(self, file_path: str, priority: int = None):
+        """
+        Queue the URLs of a text file, one per line (blank lines and # comments skipped).
+        Returns: number of URLs queued
+        """
+        with open(file_path, encoding="utf-8") as f:
+            return self.add_many(
+                (line for line in f if line.strip() and not line.lstrip().startswith("#")), priority
+            )
+
+    def add_sitemap(self, source, priority: int = None):
+        """
+        Queue the page URLs of a sitemap file (streamed, see iter_sitemap()).
+        Returns: (URLs queued, list of nested sitemap URLs found in a sitemap index)
+        """
+        added = 0
+        nested = []
+        for kind, loc in iter_sitemap(source):
+            if kind == "url":
+                added += self.add(loc, priority)
+            else:
+                nested.append(loc)
+        return added, nested
+
+    def domains(self):
+        """Returns: {domain: number of queued URLs}"""
+        with self._lock:
+            return {domain: len(queue) for domain, queue in self._queues.items()}
+
+    def pop(self, ready_in=None):
+        """
+        Take the next URL: the best one of the domain that is ready soonest.
+        ready_in: optional callable(domain) -> seconds until that domain may
+                  be fetched again (checked lazily, only for candidate domains)
+        Returns: URL, or None if the frontier is empty
+        """
+        with self._lock:
+            while self._ready:
+                ready_at, _, domain = self._ready[0]
+                wait = ready_in(domain) if ready_in is not None else 0
+                if wait > 0 and monotonic() + wait > ready_at + 0.001:
+                    # Domain has to wait longer than it was ranked for: re-rank it
+                    heapreplace(self._ready, (monotonic() + wait, next(self._seq), domain))
+                    continue
+                heappop(self._ready)
+                queue = self._queues[domain]
+                url = heappop(queue)[2]
+                self._pending -= 1
+                if queue:
+                    heappush(self._ready, (monotonic(), next(self._seq), domain))
+                else:
+                    del self._queues[domain]
+                return url
+        return None
+
+    def drain(self, ready_in=None):
+        """Yields: URLs until the frontier is empty (see pop())"""
+        while True:
+            url = self.pop(ready_in)
+            if url is None:
+                return
+            yield url
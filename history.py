@@ -0,0 +1,240 @@
+"""
+Price history store
+SQLite database (scraped_data/price_history.db) with one observation per
+product per scrape, keyed by a stable product identity (product_code, else
+the normalized product URL). "History of product X" and "everything that
+changed since T" are indexed lookups instead of re-reading every products_*.csv.
+"""
+
+import re
+import os
+import sqlite3
+from contextlib import closing
+from functools import lru_cache
+from datetime import datetime
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import pandas as pd
+
+from dataset import site_of
+from normalize import parse_numbers
+
+HISTORY_DB = os.path.join("scraped_data", "price_history.db")
+
+# Fields compared between scrapes: a difference marks the observation as a change
+TRACKED_FIELDS = ("price", "original_price", "availability", "stock_qty", "stock_status")
+
+# Query parameters that never identify a product (tracking / session noise)
+TRACKING_PARAM_RE = re.compile(
+    r"^(?:utm_\w+|gclid|fbclid|msclkid|_ga|mc_\w+|ref|ref_|tag|sid|sessionid|srsltid|spm)$", re.I
+)
+
+# SQLite's default limit on host parameters per statement is 999 on older builds
+MAX_QUERY_PARAMS = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    product_id   TEXT PRIMARY KEY,
+    site         TEXT,
+    product_code TEXT,
+    product_url  TEXT,
+    product_name TEXT,
+    first_seen   TEXT NOT NULL,
+    last_seen    TEXT NOT NULL,
+    last_state   TEXT
+);
+CREATE TABLE IF NOT EXISTS observations (
+    id             INTEGER PRIMARY KEY,
+    product_id     TEXT NOT NULL,
+    scraped_at     TEXT NOT NULL,
+    source_url     TEXT,
+    price          TEXT,
+    price_value    REAL,
+    original_price TEXT,
+    availability   TEXT,
+    stock_qty      TEXT,
+    stock_status   TEXT,
+    changed        INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_observations_product ON observations (product_id, scraped_at);
+CREATE INDEX IF NOT EXISTS idx_observations_changes ON observations (scraped_at) WHERE changed = 1;
+CREATE INDEX IF NOT EXISTS idx_products_code ON products (product_code);
+"""
+
+
+@lru_cache(maxsize=65536)
+def normalize_url(url: str):
+    """
+    Canonical form of a product URL: lowercase host without www., no scheme,
+    fragment, trailing slash or tracking parameters, remaining query sorted.
+    Cached: the same catalogue URLs come back on every scrape (history + delta).
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not TRACKING_PARAM_RE.match(key)
+    )
+    return urlunsplit(("", host, parts.path.rstrip("/") or "/", urlencode(query), "")).lstrip("/")
+
+
+def product_identity(product, source_url: str = None):
+    """
+    Stable key for one product across scrapes:
+    product_code (per site) > normalized product URL > product name (per site).
+    Returns: identity string, or None if the product has none of them
+    """
+    site = site_of(source_url or product.get("product_url") or "")
+    code = (product.get("product_code") or "").strip()
+    if code:
+        return f"{site}|code|{code}"
+    if product.get("product_url"):
+        return "url|" + normalize_url(product["product_url"])
+    name = (product.get("product_name") or "").strip().lower()
+    if name:
+        return f"{site}|name|{name}"
+    return None
+
+
+class PriceHistory:
+    """
+    SQLite price history (WAL mode, so the dashboard can read while a job writes).
+
+    Usage:
+        history = PriceHistory()
+        history.record(products, source_url)        # after every scrape
+        history.history(product_id)                 # one product over time
+        history.changes_since("2025-12-20")          # price / stock / availability changes
+    """
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or HISTORY_DB
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _last_states(self, conn, product_ids):
+        states = {}
+        for start in range(0, len(product_ids), MAX_QUERY_PARAMS):
+            chunk = product_ids[start:start + MAX_QUERY_PARAMS]
+            placeholders = ",".join("?" * len(chunk))
+            states.update(conn.execute(
+                f"SELECT product_id, last_state FROM products WHERE product_id IN ({placeholders})", chunk
+            ))
+        return states
+
+    def record(self, products, source_url: str = None, scraped_at: str = None):
+        """
+        Add one observation per product (one transaction, batched inserts).
+        An observation is flagged as changed when the product is new or one of
+        TRACKED_FIELDS differs from its previous observation.
+
+        Returns: (recorded, changed) counts
+        """
+        latest = {}
+        for product in products:
+            product_id = product_identity(product, source_url)
+            if product_id is not None:
+                latest[product_id] = product  # duplicates on one page: last one wins
+        if not latest:
+            return 0, 0
+
+        if scraped_at is None:
+            first = next(iter(latest.values()))
+            if first.get("scraped_date") and first.get("scraped_time"):
+                scraped_at = f"{first['scraped_date']} {first['scraped_time']}"
+            else:
+                scraped_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        # All prices of the page parsed in one vectorized pass
+        price_values = parse_numbers([product.get("price") for product in latest.values()])
+        price_values = price_values.to_numpy(dtype=object, na_value=None)
+
+        with closing(self._connect()) as conn, conn:
+            previous = self._last_states(conn, list(latest))
+            observations = []
+            product_rows = []
+            for (product_id, product), price_value in zip(latest.items(), price_values):
+                state = "\x1f".join(str(product.get(field) or "") for field in TRACKED_FIELDS)
+                changed = previous.get(product_id) != state
+                observations.append((
+                    product_id, scraped_at, source_url,
+                    product.get("price"), price_value,
+                    product.get("original_price"), product.get("availability"),
+                    product.get("stock_qty"), product.get("stock_status"), int(changed),
+                ))
+                product_rows.append((
+                    product_id, site_of(source_url or product.get("product_url") or ""),
+                    product.get("product_code"), product.get("product_url"),
+                    product.get("product_name"), scraped_at, scraped_at, state,
+                ))
+
+            conn.executemany(
+                "INSERT INTO observations (product_id, scraped_at, source_url, price, price_value,"
+                " original_price, availability, stock_qty, stock_status, changed)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                observations,
+            )
+            conn.executemany(
+                "INSERT INTO products (product_id, site, product_code, product_url, product_name,"
+                " first_seen, last_seen, last_state) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (product_id) DO UPDATE SET"
+                " product_url = COALESCE(excluded.product_url, product_url),"
+                " product_name = COALESCE(excluded.product_name, product_name),"
+                " last_seen = excluded.last_seen, last_state = excluded.last_state",
+                product_rows,
+            )
+        return len(observations), sum(row[-1] for row in observations)
+
+    def find_products(self, query: str, limit: int = 20):
+        """
+        Products matching a product_id, product_code, product URL or part of the name.
+        Returns: pd.DataFrame (most recently seen first)
+        """
+        query = query.strip()
+        url_id = "url|" + normalize_url(query) if "/" in query else None
+        with closing(self._connect()) as conn:
+            return pd.read_sql_query(
+                "SELECT product_id, product_name, site, product_code, product_url, first_seen, last_seen"
+                " FROM products WHERE product_id IN (?, ?) OR product_code = ? OR product_name LIKE ?"
+                " ORDER BY last_seen DESC LIMIT ?",
+                conn, params=(query, url_id, query, f"%{query}%", limit),
+            )
+
+    def history(self, product_id: str):
+        """
+        All observations of one product, oldest first.
+        Returns: pd.DataFrame
+        """
+        with closing(self._connect()) as conn:
+            return pd.read_sql_query(
+                "SELECT scraped_at, price, price_value, original_price, availability, stock_qty,"
+                " stock_status, changed, source_url FROM observations"
+                " WHERE product_id = ? ORDER BY scraped_at",
+                conn, params=(product_id,),
+            )
+
+    def changes_since(self, since):
+        """
+        Observations flagged as changed at or after `since` (datetime or
+        "YYYY-MM-DD[ HH:MM:SS]"), newest first, with the product name.
+        Returns: pd.DataFrame
+        """
+        if isinstance(since, datetime):
+            since = since.strftime("%Y-%m-%d %H:%M:%S")
+        with closing(self._connect()) as conn:
+            return pd.read_sql_query(
+                "SELECT o.scraped_at, p.product_name, o.price, o.price_value, o.original_price,"
+                " o.availability, o.stock_qty, o.stock_status, p.site, o.product_id"
+                " FROM observations o JOIN products p ON p.product_id = o.product_id"
+                " WHERE o.changed = 1 AND o.scraped_at >= ? ORDER BY o.scraped_at DESC",
+                conn, params=(since,),
+            )
@@ -0,0 +1,277 @@
+"""
+Durable scrape job queue
+Jobs wait in a queue until a worker (worker.py) leases one. A lease expires
+unless the worker keeps sending heartbeats, so jobs of a crashed or killed
+worker go back to the queue. Failed jobs are retried with backoff up to
+max_attempts, and completing a job twice (or after losing its lease) is a no-op.
+
+SQLiteJobQueue is the local backend: any number of worker processes on the
+machine that holds the database file. It runs in WAL mode, which SQLite does
+not support over a network filesystem, so do not share the file between
+machines. Workers on several machines need a networked backend (e.g. Redis)
+that implements the JobQueue methods and registers itself in QUEUE_BACKENDS.
+"""
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+from abc import ABC, abstractmethod
+from contextlib import closing
+from datetime import datetime
+
+import pandas as pd
+
+QUEUE_DB = os.path.join("scraped_data", "job_queue.db")
+
+# Seconds a lease lasts without a heartbeat
+DEFAULT_LEASE_SECONDS = 300
+DEFAULT_MAX_ATTEMPTS = 3
+# Retry n waits RETRY_BACKOFF * 2 ** (n - 1) seconds
+RETRY_BACKOFF = 60
+
+QUEUED, LEASED, DONE, FAILED = "queued", "leased", "done", "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id            INTEGER PRIMARY KEY,
+    job_key       TEXT UNIQUE,
+    url           TEXT NOT NULL,
+    name          TEXT,
+    params        TEXT NOT NULL,
+    status        TEXT NOT NULL,
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    max_attempts  INTEGER NOT NULL,
+    available_at  REAL NOT NULL,
+    lease_owner   TEXT,
+    lease_token   TEXT,
+    lease_expires REAL,
+    result        TEXT,
+    last_error    TEXT,
+    created_at    TEXT NOT NULL,
+    updated_at    TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs (status, available_at);
+"""
+
+
+def _now_text():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+class JobQueue(ABC):
+    """
+    Interface of a job queue backend. A backend must implement every method
+    below (a missing one fails at instantiation) and keep their rules: lease
+    tokens fence out workers whose lease expired, and job keys make enqueue
+    idempotent, so several schedulers and workers can share one queue.
+
+    Usage:
+        queue.enqueue(url, name="Daily Job", params={"max_pages": 5}, job_key="Daily Job|2025-12-26")
+        job = queue.lease("worker-1")                 # dict, or None if nothing is ready
+        queue.heartbeat(job["id"], job["lease_token"])
+        queue.complete(job["id"], job["lease_token"], result)   # or queue.fail(...)
+
+    A job dict has id, url, name, params, attempts, max_attempts and lease_token.
+    """
+
+    @abstractmethod
+    def enqueue(self, url: str, name: str = None, params: dict = None, job_key: str = None,
+                max_attempts: int = DEFAULT_MAX_ATTEMPTS, delay: float = 0):
+        """Add a job due in delay seconds; a known job_key adds nothing. Returns: (job id, created)"""
+
+    @abstractmethod
+    def lease(self, worker_id: str, lease_seconds: float = DEFAULT_LEASE_SECONDS):
+        """Atomically give one due / lease-expired job a new lease_token. Returns: job dict or None"""
+
+    @abstractmethod
+    def heartbeat(self, job_id: int, lease_token: str, lease_seconds: float = DEFAULT_LEASE_SECONDS):
+        """Extend the lease while lease_token still holds it. Returns: False if the lease was lost"""
+
+    @abstractmethod
+    def complete(self, job_id: int, lease_token: str, result=None):
+        """Mark done under the current lease_token (repeats are no-ops). Returns: False if lease lost"""
+
+    @abstractmethod
+    def fail(self, job_id: int, lease_token: str, error: str, retry: bool = True):
+        """Under the current lease_token: retry with backoff or give up. Returns: "queued" / "failed" / None"""
+
+    @abstractmethod
+    def stats(self):
+        """Returns: {status: number of jobs}"""
+
+
+class SQLiteJobQueue(JobQueue):
+    """
+    Job queue in a SQLite database (WAL mode) on a local disk. Leasing runs in
+    an IMMEDIATE transaction, so two workers never lease the same job.
+    """
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or QUEUE_DB
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def enqueue(self, url: str, name: str = None, params: dict = None, job_key: str = None,
+                max_attempts: int = DEFAULT_MAX_ATTEMPTS, delay: float = 0):
+        """
+        Add a job. With a job_key, enqueueing the same key again (e.g. two
+        schedulers queueing the same daily run) adds nothing.
+        Returns: (job id, True if the job was added)
+        """
+        now = _now_text()
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "INSERT INTO jobs (job_key, url, name, params, status, max_attempts, available_at,"
+                " created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (job_key) DO NOTHING",
+                (job_key, url, name, json.dumps(params or {}), QUEUED, max_attempts,
+                 time.time() + delay, now, now),
+            )
+            if cursor.rowcount:
+                return cursor.lastrowid, True
+            row = conn.execute("SELECT id FROM jobs WHERE job_key = ?", (job_key,)).fetchone()
+            return row["id"], False
+
+    def lease(self, worker_id: str, lease_seconds: float = DEFAULT_LEASE_SECONDS):
+        """
+        Take the oldest ready job: queued and due, or leased by a worker whose
+        lease expired. Jobs whose lease expired on their last attempt are failed.
+        Returns: job dict, or None if no job is ready
+        """
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, lease_token = NULL, last_error = ?, updated_at = ?"
+                    " WHERE status = ? AND lease_expires < ? AND attempts >= max_attempts",
+                    (FAILED, "lease expired (worker lost)", _now_text(), LEASED, now),
+                )
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE (status = ? AND available_at <= ?)"
+                    " OR (status = ? AND lease_expires < ?) ORDER BY available_at, id LIMIT 1",
+                    (QUEUED, now, LEASED, now),
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                token = uuid.uuid4().hex
+                conn.execute(
+                    "UPDATE jobs SET status = ?, attempts = attempts + 1, lease_owner = ?,"
+                    " lease_token = ?, lease_expires = ?, updated_at = ? WHERE id = ?",
+                    (LEASED, worker_id, token, now + lease_seconds, _now_text(), row["id"]),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+        return {
+            "id": row["id"],
+            "url": row["url"],
+            "name": row["name"],
+            "params": json.loads(row["params"]),
+            "attempts": row["attempts"] + 1,
+            "max_attempts": row["max_attempts"],
+            "lease_token": token,
+        }
+
+    def heartbeat(self, job_id: int, lease_token: str, lease_seconds: float = DEFAULT_LEASE_SECONDS):
+        """
+        Extend the lease of a running job.
+        Returns: False if the lease was lost (expired and taken by another worker)
+        """
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ?"
+                " WHERE id = ? AND lease_token = ? AND status = ?",
+                (time.time() + lease_seconds, _now_text(), job_id, lease_token, LEASED),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job_id: int, lease_token: str, result=None):
+        """
+        Mark a job done. Completing it again with the same lease is a no-op.
+        Returns: False if the lease was lost (the result is discarded)
+        """
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, lease_expires = NULL, updated_at = ?"
+                " WHERE id = ? AND lease_token = ? AND status = ?",
+                (DONE, json.dumps(result), _now_text(), job_id, lease_token, LEASED),
+            )
+            if cursor.rowcount:
+                return True
+            row = conn.execute(
+                "SELECT 1 FROM jobs WHERE id = ? AND lease_token = ? AND status = ?",
+                (job_id, lease_token, DONE),
+            ).fetchone()
+            return row is not None
+
+    def fail(self, job_id: int, lease_token: str, error: str, retry: bool = True):
+        """
+        Record a failed attempt: the job is queued again after a backoff
+        while attempts remain (and retry is True), else marked failed.
+        Returns: new status ("queued" / "failed"), or None if the lease was lost
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND lease_token = ? AND status = ?",
+                (job_id, lease_token, LEASED),
+            ).fetchone()
+            if row is None:
+                return None
+            if retry and row["attempts"] < row["max_attempts"]:
+                status, available_at = QUEUED, time.time() + RETRY_BACKOFF * 2 ** (row["attempts"] - 1)
+            else:
+                status, available_at = FAILED, time.time()
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, available_at = ?, last_error = ?, lease_token = NULL,"
+                " lease_expires = NULL, updated_at = ? WHERE id = ? AND lease_token = ? AND status = ?",
+                (status, available_at, error, _now_text(), job_id, lease_token, LEASED),
+            )
+            return status if cursor.rowcount else None
+
+    def stats(self):
+        """Returns: {status: number of jobs}"""
+        with closing(self._connect()) as conn:
+            return dict(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+    def list_jobs(self, status: str = None, limit: int = 100):
+        """
+        Most recently updated jobs (optionally only one status).
+        Returns: pd.DataFrame
+        """
+        with closing(self._connect()) as conn:
+            return pd.read_sql_query(
+                "SELECT id, name, url, status, attempts, max_attempts, lease_owner, last_error,"
+                " created_at, updated_at FROM jobs WHERE ? IS NULL OR status = ?"
+                " ORDER BY updated_at DESC, id DESC LIMIT ?",
+                conn, params=(status, status, limit),
+            )
+
+
+# Backend name -> class, for open_job_queue("<backend>:<location>")
+QUEUE_BACKENDS = {"sqlite": SQLiteJobQueue}
+
+
+def open_job_queue(spec: str = None):
+    """
+    Open a queue from a spec such as "sqlite:scraped_data/job_queue.db"
+    (default: the local SQLite queue at QUEUE_DB).
+    Returns: JobQueue
+    """
+    backend, _, location = (spec or f"sqlite:{QUEUE_DB}").partition(":")
+    if backend not in QUEUE_BACKENDS:
+        raise ValueError(f"Unknown job queue backend '{backend}' (known: {', '.join(QUEUE_BACKENDS)})")
+    return QUEUE_BACKENDS[backend](location or None)
@@ -0,0 +1,133 @@
+"""
+Vectorized normalization of scraped text fields
+parse_products() returns prices, ratings, discounts and stock counts as raw
+text ("$1,299.00", "1.299,00 €", "4.5 out of 5", "20% off", "Only 3 left").
+The helpers here parse whole columns at once with pandas string ops, so
+every consumer gets the same numbers without per-row Python.
+"""
+
+import pandas as pd
+
+# Backed by pyarrow when available: the regexes below are RE2-compatible,
+# so pandas runs them in pyarrow's compute kernels instead of Python's re
+try:
+    import pyarrow  # noqa: F401
+    TEXT_DTYPE = "string[pyarrow]"
+except ImportError:
+    TEXT_DTYPE = "string"
+
+NO_BREAK_SPACES = "\u00a0\u202f"
+# First number in the text, with its thousands separators: space-grouped
+# ("1 299,00") or using . , ' ("1,299.00", "1.299,00", "1'299"), or a bare
+# fraction (".99")
+NUMBER_TOKEN_RE = (
+    r"(\d{1,3}(?:[ " + NO_BREAK_SPACES + r"]\d{3})+(?:[.,]\d+)?|\d(?:[\d.,']*\d)?|[.,]\d+)"
+)
+# The last . or , is the decimal separator ("1.299,00", "1,299.5", "0.125",
+# ".99") unless it is followed by exactly 3 digits after a leading group that
+# uses the same separator: "1,299", "1.234.567" and "12,34,567" are whole
+# numbers. Every other separator is a thousands separator
+DECIMAL_PART_RE = r"[.,](\d+)$"
+GROUPED_NUMBER_RE = r"[1-9]\d{0,2}(?:,\d{2,3})*,\d{3}|[1-9]\d{0,2}(?:\.\d{2,3})*\.\d{3}"
+THOUSANDS_SEPARATOR_RE = r"[.,' " + NO_BREAK_SPACES + "]"
+
+CURRENCY_RE = r"(\bUS ?\$|\bCA? ?\$|\bAU? ?\$|\bR\$|\$|₹|\b(?i:Rs)\.?|€|£|¥|₩|\b(?i:USD|EUR|GBP|INR|JPY|CAD|AUD)\b)"
+CURRENCY_CODES = {
+    "$": "USD", "US$": "USD", "C$": "CAD", "CA$": "CAD", "A$": "AUD", "AU$": "AUD",
+    "R$": "BRL", "₹": "INR", "RS": "INR", "RS.": "INR", "€": "EUR", "£": "GBP",
+    "¥": "JPY", "₩": "KRW", "USD": "USD", "EUR": "EUR", "GBP": "GBP", "INR": "INR",
+    "JPY": "JPY", "CAD": "CAD", "AUD": "AUD",
+}
+
+# Raw column -> numeric column added by normalize_products()
+PRICE_COLUMNS = {"price": "price_value", "original_price": "original_price_value"}
+FLOAT_COLUMNS = {
+    "discount_in_percentage": "discount_pct",
+    "rating": "rating_value",
+    "seller_rating": "seller_rating_value",
+}
+INTEGER_COLUMNS = {"stock_qty": "stock_qty_value"}
+
+
+def _each_unique(values, parse):
+    """
+    Run a column parser once per distinct value and broadcast the result back
+    (scraped columns repeat a lot: the same ratings, discounts, currencies).
+    Returns: pd.Series aligned with values
+    """
+    text = pd.Series(values, dtype=TEXT_DTYPE)
+    codes, uniques = pd.factorize(text)
+    parsed = parse(pd.Series(uniques, dtype=TEXT_DTYPE))
+    return pd.Series(parsed.array.take(codes, allow_fill=True), index=text.index)
+
+
+def _number_text(text):
+    token = text.str.extract(NUMBER_TOKEN_RE, expand=False)
+    grouped = token.str.fullmatch(GROUPED_NUMBER_RE).fillna(False).astype(bool)
+    fraction = token.str.extract(DECIMAL_PART_RE, expand=False).where(~grouped)
+    whole = token.where(fraction.isna(), token.str.replace(DECIMAL_PART_RE, "", regex=True))
+    whole = whole.str.replace(THOUSANDS_SEPARATOR_RE, "", regex=True)
+    # ".99" has no whole part
+    whole = whole.str.replace(r"^$", "0", regex=True)
+    return whole.where(fraction.isna(), whole + "." + fraction)
+
+
+def number_text(values):
+    """
+    Canonical text of the first number in each value: thousands separators
+    removed, "." as decimal separator ("₹40,000" -> "40000", "1.299,00 €" ->
+    "1299.00", "4.5 out of 5" -> "4.5").
+    Returns: pd.Series of strings (<NA> where there is no number)
+    """
+    return _each_unique(values, _number_text)
+
+
+def parse_numbers(values):
+    """Returns: Float64 Series of the first number in each value"""
+    return _each_unique(values, lambda text: pd.to_numeric(_number_text(text)).astype("Float64"))
+
+
+def parse_integers(values):
+    """Returns: Int64 Series of the first number in each value (rounded)"""
+    return parse_numbers(values).round().astype("Int64")
+
+
+def _currency(text):
+    symbol = text.str.extract(CURRENCY_RE, expand=False)
+    key = symbol.str.upper().str.replace(" ", "", regex=False)
+    return key.map(CURRENCY_CODES, na_action="ignore").astype("string")
+
+
+def parse_currency(values):
+    """
+    ISO currency code from the symbol / code in each price ("₹40,000" -> "INR",
+    "US $12" -> "USD", "12,00 €" -> "EUR"); a bare "$" counts as USD.
+    Returns: pd.Series of strings (<NA> where no currency is found)
+    """
+    return _each_unique(values, _currency)
+
+
+def normalize_products(df):
+    """
+    Add numeric columns next to the raw text ones:
+    price_value, original_price_value, currency, discount_pct, rating_value,
+    seller_rating_value (Float64) and stock_qty_value (Int64).
+    Columns missing from df are skipped; the raw columns are kept unchanged.
+    Returns: new DataFrame
+    """
+    out = df.copy()
+    for column, target in PRICE_COLUMNS.items():
+        if column in df:
+            out[target] = parse_numbers(df[column])
+    if "price" in df:
+        currency = parse_currency(df["price"])
+        if "original_price" in df:
+            currency = currency.fillna(parse_currency(df["original_price"]))
+        out["currency"] = currency
+    for column, target in FLOAT_COLUMNS.items():
+        if column in df:
+            out[target] = parse_numbers(df[column])
+    for column, target in INTEGER_COLUMNS.items():
+        if column in df:
+            out[target] = parse_integers(df[column])
+    return out
@@ -0,0 +1,220 @@
+"""
+robots.txt rules and sitemap discovery
+RobotsCache fetches robots.txt once per host and keeps the parsed rules for
+ROBOTS_TTL. Allow / Disallow patterns (with * and $ wildcards) are compiled
+to regexes once, so allowed(url) on the fetch path is a dict lookup plus a
+few regex matches. Sitemaps listed in robots.txt (or passed in) are streamed
+into a URLFrontier, following nested sitemap indexes.
+"""
+
+import io
+import re
+import time
+from collections import deque
+from threading import Lock
+from urllib.parse import urlsplit
+
+from frontier import host_of, iter_sitemap
+
+# Re-read robots.txt after this long (RFC 9309: cache for at most 24 hours)
+ROBOTS_TTL = 24 * 60 * 60
+# robots.txt that could not be fetched (5xx, network error) blocks the host for this long
+ROBOTS_ERROR_TTL = 10 * 60
+# robots.txt files larger than this are cut off (RFC 9309 minimum: 500 KiB)
+MAX_ROBOTS_BYTES = 512 * 1024
+# Upper bound on sitemap files read per add_sitemaps() call (nested indexes can be huge)
+MAX_SITEMAPS = 1000
+
+_LINE_RE = re.compile(r"^\s*([A-Za-z-]+)\s*:\s*(.*?)\s*$")
+
+
+def _compile_pattern(pattern: str):
+    # "*" matches any characters, a trailing "$" anchors the end; everything else is literal
+    anchored = pattern.endswith("$")
+    body = ".*".join(re.escape(part) for part in (pattern[:-1] if anchored else pattern).split("*"))
+    return re.compile(body + ("$" if anchored else ""))
+
+
+class RobotsRules:
+    """
+    Rules of one robots.txt for one user agent.
+    RobotsRules() allows everything (no robots.txt); disallow_all=True blocks
+    everything (robots.txt unreachable).
+    """
+
+    def __init__(self, text: str = "", user_agent: str = "*", disallow_all: bool = False):
+        self.disallow_all = disallow_all
+        self.crawl_delay = None
+        self.sitemaps = []
+        # (pattern length, allow, regex): longest match wins, Allow wins a tie
+        self._rules = []
+        if text:
+            self._parse(text, user_agent.split("/")[0].strip().lower())
+
+    def _parse(self, text, agent):
+        groups = []          # [(agents, rules, crawl_delay)]
+        agents, rules, delay = [], [], None
+        in_rules = False
+        for line in text.splitlines():
+            match = _LINE_RE.match(line.split("#", 1)[0])
+            if not match:
+                continue
+            field, value = match.group(1).lower(), match.group(2)
+            if field == "sitemap":
+                if value:
+                    self.sitemaps.append(value)
+            elif field == "user-agent":
+                if in_rules:
+                    groups.append((agents, rules, delay))
+                    agents, rules, delay = [], [], None
+                    in_rules = False
+                agents.append(value.lower())
+            elif field in ("allow", "disallow"):
+                in_rules = True
+                if value:
+                    rules.append((value, field == "allow"))
+            elif field in ("crawl-delay", "request-rate"):
+                in_rules = True
+                try:
+                    if field == "crawl-delay":
+                        delay = float(value)
+                    else:
+                        requests, seconds = value.split("/")
+                        delay = max(delay or 0.0, float(seconds) / float(requests))
+                except (ValueError, ZeroDivisionError):
+                    pass
+        if agents:
+            groups.append((agents, rules, delay))
+
+        # Groups naming our product token; else the "*" groups (all matching groups are merged)
+        chosen = [g for g in groups if agent in g[0]]
+        if not chosen:
+            chosen = [g for g in groups if "*" in g[0]]
+        for _, group_rules, group_delay in chosen:
+            for pattern, allow in group_rules:
+                self._rules.append((len(pattern), allow, _compile_pattern(pattern)))
+            if group_delay is not None:
+                self.crawl_delay = group_delay
+        self._rules.sort(key=lambda rule: (-rule[0], not rule[1]))
+
+    def allowed(self, url: str):
+        """Returns: True if robots.txt lets us fetch url"""
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        if path == "/robots.txt":
+            return True
+        if self.disallow_all:
+            return False
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        for _, allow, regex in self._rules:
+            if regex.match(path):
+                return allow
+        return True
+
+
+class RobotsCache:
+    """
+    Parsed robots.txt per host, refreshed after ROBOTS_TTL.
+
+    Usage:
+        robots = RobotsCache(get_session)      # callable returning a requests.Session
+        robots.allowed(url)                    # before fetching url
+        robots.crawl_delay(url)                # seconds, or None
+        robots.add_sitemaps(frontier, robots.sitemaps(url))
+
+    Thread-safe; each host's robots.txt is fetched by one thread at a time.
+    """
+
+    def __init__(self, session_factory, user_agent: str = "*", ttl: float = ROBOTS_TTL):
+        self.session_factory = session_factory
+        self.user_agent = user_agent
+        self.ttl = ttl
+        self._rules = {}        # host -> (expires_at, RobotsRules)
+        self._lock = Lock()
+        self._host_locks = {}
+
+    def _fetch(self, url: str):
+        parts = urlsplit(url)
+        try:
+            resp = self.session_factory().get(f"{parts.scheme}://{parts.netloc}/robots.txt",
+                                              timeout=10, stream=True)
+            with resp:
+                if 400 <= resp.status_code < 500 and resp.status_code != 429:
+                    return RobotsRules(), self.ttl           # no robots.txt: everything allowed
+                if resp.status_code >= 400:
+                    return RobotsRules(disallow_all=True), ROBOTS_ERROR_TTL
+                body = resp.raw.read(MAX_ROBOTS_BYTES, decode_content=True)
+        except Exception:
+            return RobotsRules(disallow_all=True), ROBOTS_ERROR_TTL
+        text = body.decode("utf-8", errors="replace")
+        return RobotsRules(text, self.user_agent), self.ttl
+
+    def rules(self, url: str):
+        """Returns: RobotsRules for url's host (fetched on first use / after the TTL)"""
+        host = host_of(url)
+        entry = self._rules.get(host)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+
+        with self._lock:
+            host_lock = self._host_locks.setdefault(host, Lock())
+        with host_lock:
+            entry = self._rules.get(host)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+            rules, ttl = self._fetch(url)
+            self._rules[host] = (time.monotonic() + ttl, rules)
+            return rules
+
+    def allowed(self, url: str):
+        """Returns: True if url's robots.txt lets us fetch it"""
+        return self.rules(url).allowed(url)
+
+    def crawl_delay(self, url: str):
+        """Returns: Crawl-delay (seconds) for url's host, or None"""
+        return self.rules(url).crawl_delay
+
+    def sitemaps(self, url: str):
+        """Returns: sitemap URLs listed in url's robots.txt (else the host's /sitemap.xml)"""
+        listed = self.rules(url).sitemaps
+        if listed:
+            return list(listed)
+        parts = urlsplit(url)
+        return [f"{parts.scheme}://{parts.netloc}/sitemap.xml"]
+
+    def add_sitemaps(self, frontier, sitemap_urls, priority: int = None, max_sitemaps: int = MAX_SITEMAPS):
+        """
+        Stream sitemaps (plain or gzipped) into frontier, following nested
+        sitemap indexes breadth-first. Page URLs that robots.txt disallows are skipped.
+        Returns: (page URLs queued, sitemap files read)
+        """
+        pending = deque(sitemap_urls)
+        seen = set(pending)
+        added = files = 0
+        while pending and files < max_sitemaps:
+            sitemap_url = pending.popleft()
+            if not self.allowed(sitemap_url):
+                print(f"🚫 Sitemap blocked by robots.txt: {sitemap_url}")
+                continue
+            try:
+                resp = self.session_factory().get(sitemap_url, timeout=30, stream=True)
+                with resp:
+                    resp.raise_for_status()
+                    resp.raw.decode_content = True
+                    resp.raw.auto_close = False  # let the BufferedReader see EOF instead of a closed file
+                    for kind, loc in iter_sitemap(io.BufferedReader(resp.raw)):
+                        if kind == "sitemap":
+                            if loc not in seen:
+                                seen.add(loc)
+                                pending.append(loc)
+                        elif self.allowed(loc):
+                            added += frontier.add(loc, priority)
+            except Exception as e:
+                print(f"⚠️  Could not read sitemap {sitemap_url}: {str(e)}")
+                continue
+            files += 1
+        if pending:
+            print(f"⚠️  Stopped after {max_sitemaps} sitemaps, {len(pending)} not read")
+        return added, files
+
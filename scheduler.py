@@ -1,12 +1,17 @@
 """
 Automated Scraper Scheduler
 Runs scraping jobs at specified times daily using the 'schedule' library
+Due jobs are handed to worker threads and each one runs in its own process,
+so a slow job never delays the others and a hung one can be stopped
 """
 
 from schedule import *
 from time import *
 from datetime import *
-from scraper import scrape_and_save
+from multiprocessing import Process
+from threading import Thread, Lock, BoundedSemaphore, Event
+from scraper import scrape_and_save, configure_session
+from jobqueue import open_job_queue
 
 # Configuration: Define all your scraping jobs here
 SCRAPE_JOBS = [
@@ -14,7 +19,10 @@ SCRAPE_JOBS = [
         "url": "https://www.web-scraping.dev/products",
         "time": "23:30",  # 11:30 pm daily
         "name": "Web Scraping Daily Job",
-        "enabled": True
+        "enabled": True,
+        "max_pages": 5,  # Follow "next page" links (optional, default 1)
+        "export_format": "dataset",  # Append to scraped_data/dataset (optional, default "dataset")
+        "timeout": 1800  # Stop the job after 30 minutes (optional, default DEFAULT_JOB_TIMEOUT)
     },
     {
         "url": "https://www.flipkart.com/search?q=laptop",
@@ -30,10 +38,39 @@ SCRAPE_JOBS = [
     }
 ]
 
+# HTTP session used by all jobs: scheduled runs can afford to retry longer
+# than interactive ones before giving up on a 429/503
+SESSION_OPTIONS = {
+    "retries": 5,
+    "backoff_factor": 1.0,
+    "max_per_host": 4,
+}
 
-def job_wrapper(url, job_name):
+# Jobs that may run at the same time (each one in its own process)
+MAX_CONCURRENT_JOBS = 4
+
+# Seconds after which a still-running job is stopped (per job: "timeout")
+DEFAULT_JOB_TIMEOUT = 60 * 60
+
+# Longest single sleep of the scheduler loop, so clock changes are noticed
+MAX_IDLE_SECONDS = 300
+
+# Queue spec (e.g. "sqlite:scraped_data/job_queue.db"): when set, due jobs are
+# put on the job queue for worker.py processes instead of being run here
+JOB_QUEUE = None
+
+# Job name -> Process of the jobs currently queued or running
+_running = {}
+_running_lock = Lock()
+_job_slots = BoundedSemaphore(MAX_CONCURRENT_JOBS)
+_stopping = Event()
+
+
+def job_wrapper(url, job_name, max_pages=1, export_format="dataset"):
     """
     Wrapper function to execute scraping job with error handling
+    Scheduled runs append to the partitioned dataset by default, so jobs
+    running on the same day never overwrite each other's output
     """
     try:
         print(f"\n{'='*70}")
@@ -43,7 +80,12 @@ def job_wrapper(url, job_name):
         print(f"🌐 URL: {url}")
         print(f"{'='*70}\n")
         
-        success, message, df, count = scrape_and_save(url)
+        success, message, df, count = scrape_and_save(
+            url,
+            max_pages=max_pages,
+            export_format=export_format,
+            job_name=job_name
+        )
         
         if success:
             print(f"\n✅ Job completed successfully!")
@@ -56,9 +98,103 @@ def job_wrapper(url, job_name):
         print(f"\n❌ Unexpected error in job '{job_name}': {str(e)}\n")
 
 
+def _job_process(url, job_name, max_pages, export_format):
+    """
+    Entry point of a job process: a fresh HTTP session (never one inherited
+    from the scheduler process), then the job itself
+    """
+    configure_session(**SESSION_OPTIONS)
+    job_wrapper(url, job_name, max_pages, export_format)
+
+
+def run_job(job):
+    """
+    Run one job in a child process and wait for it (on its worker thread)
+    Waits for one of the MAX_CONCURRENT_JOBS slots first; a job still
+    running after its timeout is terminated
+    """
+    name = job["name"]
+    timeout = job.get("timeout", DEFAULT_JOB_TIMEOUT)
+    process = Process(
+        target=_job_process,
+        args=(job["url"], name, job.get("max_pages", 1), job.get("export_format", "dataset")),
+        name=name,
+    )
+    try:
+        with _job_slots:
+            if _stopping.is_set():
+                return
+            with _running_lock:
+                _running[name] = process
+            process.start()
+            process.join(timeout)
+
+            if process.is_alive():
+                process.terminate()
+                process.join()
+                print(f"\n⏱️  Job '{name}' timed out after {timeout} seconds and was stopped\n")
+            elif process.exitcode and not _stopping.is_set():
+                print(f"\n❌ Job '{name}' exited with code {process.exitcode}\n")
+    except Exception as e:
+        print(f"\n❌ Could not run job '{name}': {str(e)}\n")
+    finally:
+        with _running_lock:
+            _running.pop(name, None)
+
+
+def enqueue_job(queue, job):
+    """
+    Put one due run of a job on the job queue for worker.py
+    The key is the job name + due minute, so several schedulers feeding the
+    same queue add each run only once
+    """
+    params = {
+        "max_pages": job.get("max_pages", 1),
+        "export_format": job.get("export_format", "dataset"),
+        "timeout": job.get("timeout", DEFAULT_JOB_TIMEOUT),
+    }
+    job_key = f"{job['name']}|{datetime.now().strftime('%Y-%m-%d %H:%M')}"
+    job_id, added = queue.enqueue(job["url"], name=job["name"], params=params, job_key=job_key)
+    if added:
+        print(f"📤 Queued:    {job['name']} (job {job_id})")
+
+
+def dispatch_job(job):
+    """
+    Called by 'schedule' when a job is due: start it on a worker thread and
+    return at once, so the next due times are not pushed back
+    A job whose previous run has not finished yet is skipped
+    """
+    if JOB_QUEUE:
+        enqueue_job(open_job_queue(JOB_QUEUE), job)
+        return
+    with _running_lock:
+        if job["name"] in _running:
+            print(f"⏭️  Skipped:   {job['name']} (previous run still in progress)")
+            return
+        _running[job["name"]] = None
+    # A plain thread rather than a ThreadPoolExecutor: a process forked from an
+    # executor thread exits with code 1 (the executor's atexit hook joins it)
+    Thread(target=run_job, args=(job,), name=f"job-{job['name']}").start()
+
+
+def stop_running_jobs():
+    """
+    Terminate the job processes that are still running (queued jobs are dropped)
+    """
+    _stopping.set()
+    with _running_lock:
+        processes = [process for process in _running.values() if process is not None]
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+            print(f"🛑 Stopped:   {process.name}")
+
+
 def schedule_all_jobs():
     """
     Schedule all enabled jobs at specified times
+    Due jobs are started by dispatch_job()
     """
     print("\n" + "="*70)
     print("🤖 SCHEDULER INITIALIZATION")
@@ -68,11 +204,7 @@ def schedule_all_jobs():
     
     for job in SCRAPE_JOBS:
         if job["enabled"]:
-            every().day.at(job["time"]).do(
-                job_wrapper,
-                url=job["url"],
-                job_name=job["name"]
-            )
+            every().day.at(job["time"]).do(dispatch_job, job)
             print(f"✅ Scheduled: {job['name']:<25} at {job['time']}")
             scheduled_count += 1
         else:
@@ -86,7 +218,8 @@ def schedule_all_jobs():
 def run_scheduler():
     """
     Run the scheduler indefinitely
-    Checks every 60 seconds if any job needs to run
+    Sleeps until the next job is due, then dispatches it (at most
+    MAX_CONCURRENT_JOBS jobs run at the same time)
     """
     schedule_all_jobs()
     
@@ -95,10 +228,13 @@ def run_scheduler():
     try:
         while True:
             run_pending()
-            sleep(60)  # Check every 60 seconds
+            # Seconds until the next due job (None when nothing is scheduled)
+            idle = idle_seconds()
+            sleep(MAX_IDLE_SECONDS if idle is None else min(max(idle, 0), MAX_IDLE_SECONDS))
 
     except KeyboardInterrupt:
         print("\n\n🛑 Scheduler stopped by user")
+        stop_running_jobs()
 
 
 # Run the scheduler
@@ -1,12 +1,69 @@
+import re
+import csv
+from sys import intern
+from collections import OrderedDict
+from collections.abc import MutableMapping
+import asyncio
+import sqlite3
+import io
+import hashlib
+from copy import copy
+from decimal import Decimal
 from time import *
 from random import *
 from requests import *
-from bs4 import BeautifulSoup as BS
+from bs4 import BeautifulSoup as BS, Tag
+import soupsieve as sv
+from urllib.parse import urljoin, urlsplit, urldefrag, parse_qs
+from email.utils import parsedate_to_datetime
+from threading import Lock, Thread, Event
+from queue import Queue
+from html import unescape
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED
+from concurrent.futures import wait as wait_futures
+from concurrent.futures.process import BrokenProcessPool
+from cache import HTTPCache, ResultCache, fingerprint_html
+from dataset import ProductDataset, site_of
+from history import PriceHistory
+from delta import ChangeDetector
+from frontier import URLFrontier
+from robots import RobotsCache
+from normalize import normalize_products, number_text, parse_numbers, parse_integers, parse_currency
 import pandas as pd
 from datetime import *
 from os import *
 from openpyxl import *
 from openpyxl.styles import *
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter
+
+# Optional async HTTP client (AsyncFetcher / async_fetch_page)
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+# Optional columnar export (save_to_columnar: Parquet / Feather)
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+    import pyarrow.feather as feather
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Optional fast parser backend (parse_products(..., parser="lxml"))
+try:
+    import lxml.html
+    from lxml import etree
+    from lxml.cssselect import CSSSelector
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
 
 # --- HEADERS (shared across all scraping calls) ---
 HEADERS = {
@@ -18,399 +75,2100 @@ HEADERS = {
     "Accept-Language": "en-US,en;q=0.9",
 }
 
-DELAY_RANGE = (2, 5)
+# Skip URLs that the site's robots.txt disallows (see get_robots())
+RESPECT_ROBOTS = True
+
+# Adaptive per-host request rates (requests per second), see HostThrottle:
+# every host starts at START_RATE, speeds up toward MAX_RATE while it answers
+# fast and cleanly, and backs off toward MIN_RATE on 429/503 or slow responses
+START_RATE = 0.3            # one request every ~3.3 s (the old fixed 2-5 s delay)
+MAX_RATE = 2.0
+MIN_RATE = 1 / 60
+HOST_MAX_RATES = {}         # Per-host ceilings, e.g. {"www.flipkart.com": 0.5}
+SPEEDUP_STEP = 0.05         # Added to the rate after each healthy response
+BACKOFF_FACTOR = 0.5        # Rate multiplier on 429 / 503
+SLOW_BACKOFF_FACTOR = 0.8   # Rate multiplier on a latency spike
+LATENCY_SPIKE = 2.0         # Response slower than 2x the host's average (and > 1 s) is a spike
+THROTTLE_STATUS_CODES = (429, 503)
+
+
+def extract_with_fallbacks(soup_or_element, selectors, attr=None):
+    """
+    Try a list of CSS selectors (strings or precompiled soupsieve patterns) in order.
+    - If attr is None: return cleaned text.
+    - If attr is provided: return that attribute value.
+    - If nothing matches: return None.
+    """
+    if soup_or_element is None:
+        return None
+
+    for selector in selectors:
+        try:
+            if isinstance(selector, str):
+                el = soup_or_element.select_one(selector)
+            else:
+                # Precompiled soupsieve pattern (see ExtractionPlan)
+                el = selector.select_one(soup_or_element)
+        except Exception:
+            el = None
+
+        if el is None:
+            continue
+
+        if attr is not None:
+            value = el.get(attr)
+            if value:
+                return value.strip()
+        else:
+            text = el.get_text(strip=True)
+            if text:
+                return text
+
+    return None
+
+
+# --- HTTP SESSION (shared connection pool + retry policy) ---
+SESSION_DEFAULTS = {
+    "pool_hosts": 20,           # Number of per-host connection pools kept alive
+    "max_per_host": 10,         # Max connections per host
+    "retries": 3,               # Retries for connection errors and RETRY_STATUS_CODES
+    "backoff_factor": 0.5,      # Exponential backoff: 0.5s, 1s, 2s, ...
+    "backoff_jitter": 0.5,      # + random 0-0.5s so retries don't synchronize
+}
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+def _accept_encoding():
+    """gzip/deflate always; br only when a brotli decoder is installed (urllib3 needs it)."""
+    for module in ("brotli", "brotlicffi"):
+        try:
+            __import__(module)
+            return "gzip, deflate, br"
+        except ImportError:
+            continue
+    return "gzip, deflate"
+
+
+def _retry_after_seconds(value):
+    """Retry-After header (seconds or HTTP date) -> seconds, or None"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, (retry_at - datetime.now(retry_at.tzinfo)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def _rate_feedback(resp, *args, **kwargs):
+    """
+    Session response hook: report status, latency and any 429/503 answers that
+    urllib3 already retried to HOST_THROTTLE, which adapts the host's rate.
+    """
+    retries = getattr(resp.raw, "retries", None)
+    retried = [entry.status for entry in retries.history if entry.status] if retries is not None else ()
+    HOST_THROTTLE.record(resp.url, resp.status_code, resp.elapsed.total_seconds(),
+                         retried, resp.headers.get("Retry-After"))
+
+
+def create_session(pool_hosts: int = None, max_per_host: int = None, retries: int = None,
+                   backoff_factor: float = None, backoff_jitter: float = None):
+    """
+    Build a requests.Session with connection pooling and a retry/backoff policy.
+    - Retries connection errors and 429/5xx responses with exponential backoff + jitter
+    - Honors Retry-After on 429/503
+    - Reports every response to HOST_THROTTLE (adaptive per-host rate)
+    - Sends HEADERS plus gzip/brotli Accept-Encoding
+    Unset options come from SESSION_DEFAULTS.
+    """
+    options = dict(SESSION_DEFAULTS)
+    for key, value in (("pool_hosts", pool_hosts), ("max_per_host", max_per_host),
+                       ("retries", retries), ("backoff_factor", backoff_factor),
+                       ("backoff_jitter", backoff_jitter)):
+        if value is not None:
+            options[key] = value
+
+    retry = Retry(
+        total=options["retries"],
+        backoff_factor=options["backoff_factor"],
+        backoff_jitter=options["backoff_jitter"],
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=options["pool_hosts"],
+        pool_maxsize=options["max_per_host"],
+        max_retries=retry,
+    )
+
+    session = Session()
+    session.headers.update(HEADERS)
+    session.headers["Accept-Encoding"] = _accept_encoding()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.hooks["response"].append(_rate_feedback)
+    return session
+
+
+_session = None
+_session_lock = Lock()
+
+
+def get_session():
+    """Return the shared session used by fetch_page() (created on first use)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def configure_session(**options):
+    """
+    Replace the shared session, e.g. configure_session(retries=5, max_per_host=4).
+    Accepts the same options as create_session().
+    """
+    global _session
+    new_session = create_session(**options)
+    with _session_lock:
+        old_session, _session = _session, new_session
+    if old_session is not None:
+        old_session.close()
+    return new_session
+
+
+def robots_error(url: str):
+    """Returns: error message if robots.txt disallows url (and RESPECT_ROBOTS is on), else None"""
+    if RESPECT_ROBOTS and not get_robots().allowed(url):
+        return f"Blocked by robots.txt: {url}"
+    return None
+
+
+def fetch_page(url: str, session: Session = None):
+    """
+    Fetch page HTML from a URL.
+    Uses the shared pooled session (see get_session()) unless one is given.
+    Returns: (html_string, error_message)
+    """
+    blocked = robots_error(url)
+    if blocked:
+        return None, blocked
+    try:
+        resp = (session or get_session()).get(url, timeout=15)
+        resp.raise_for_status()
+        return resp.text, None
+    except Exception as e:
+        return None, str(e)
+
+
+def fetch_page_conditional(url: str, http_cache: HTTPCache, session: Session = None):
+    """
+    Fetch page HTML, revalidating against the HTTP cache (If-None-Match /
+    If-Modified-Since) when this URL was fetched before.
+    Returns: (html_string, error_message, not_modified, response_headers)
+    """
+    blocked = robots_error(url)
+    if blocked:
+        return None, blocked, False, {}
+    try:
+        resp = (session or get_session()).get(
+            url, headers=http_cache.conditional_headers(url), timeout=15
+        )
+        if resp.status_code == 304:
+            return None, None, True, resp.headers
+        resp.raise_for_status()
+        return resp.text, None, False, resp.headers
+    except Exception as e:
+        return None, str(e), False, {}
+
+
+_http_cache = None
+_result_cache = None
+_robots = None
+
+
+def get_http_cache():
+    """Return the shared on-disk HTTPCache (created on first use)."""
+    global _http_cache
+    if _http_cache is None:
+        _http_cache = HTTPCache()
+    return _http_cache
+
+
+def get_result_cache():
+    """Return the shared on-disk ResultCache (created on first use)."""
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = ResultCache()
+    return _result_cache
+
+
+def get_robots():
+    """Return the shared RobotsCache (robots.txt rules per host, fetched with the shared session)."""
+    global _robots
+    if _robots is None:
+        _robots = RobotsCache(get_session, HEADERS["User-Agent"])
+    return _robots
+
+
+_price_history = None
+
+
+def get_price_history():
+    """Return the shared SQLite PriceHistory (created on first use)."""
+    global _price_history
+    if _price_history is None:
+        _price_history = PriceHistory()
+    return _price_history
+
+
+def record_price_history(products, url: str):
+    """
+    Add this scrape to the price history database.
+    A history failure (locked / read-only database) never fails the scrape.
+    """
+    try:
+        recorded, changed = get_price_history().record(products, url)
+        print(f"🗃️  Price history: {recorded} products recorded, {changed} new or changed")
+    except (sqlite3.Error, OSError) as e:
+        print(f"⚠️  Price history not updated: {e}")
+
+
+_change_detector = None
+
+
+def get_change_detector():
+    """Return the shared ChangeDetector (created on first use)."""
+    global _change_detector
+    if _change_detector is None:
+        _change_detector = ChangeDetector()
+    return _change_detector
+
+
+def record_changes(products, url: str):
+    """
+    Diff this scrape against the previous one of the same URL and write the
+    delta (added / removed / changed products) to scraped_data/deltas/.
+    Returns: ProductDelta, or None if change detection failed
+    """
+    try:
+        delta, delta_path = get_change_detector().detect(url, products)
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Change detection skipped: {e}")
+        return None
+    print(f"🔄 Changes: {delta.describe()}")
+    if delta_path:
+        print(f"   📁 Delta: {delta_path}")
+    return delta
+
+
+# ========== SELECTORS ==========
+
+# FIXED: Product block selectors – ordered by specificity & compatibility
+PRODUCT_BLOCK_SELECTORS = [
+    ".product",                 # web-scraping.dev ✓ WORKS (keep this primary!)
+    ".row.product",             # Alternative pattern
+    ".product-card",            # Generic e-comm
+    ".product-tile",            # Generic e-comm
+    ".product-item",            # Generic e-comm
+    ".product-listing",         # Generic e-comm
+    ".plp-card",                # Generic e-comm
+    # NEW: Flipkart selectors
+    "div._4ddWXP",              # Flipkart product container
+    # NEW: Walmart selectors
+    "div[data-automation-id*='product']",  # Walmart product
+    # NEW: eBay selectors
+    "div.s-item",               # eBay product item
+]
+
+# ===== TITLE SELECTORS =====
+TITLE_SELECTORS = [
+    ".product-name",
+    "h2.product-name",
+    "h3.product-name",
+    "h2.product-title",
+    "h3.product-title",
+    ".product-title",
+    "h2",
+    "h3",
+]
+
+# ===== PRICE SELECTORS =====
+# MERGED: Current + Your new ones (no duplicates)
+PRICE_SELECTORS = [
+    ".product-price",
+    ".price",
+    "span.price",
+    ".sale-price",
+    "[class*='price']",
+    # NEW ADDITIONS:
+    ".current-price",           # Generic current price
+    ".item-price",              # Generic item price
+    # NEW: Flipkart price selectors
+    "div._30jeq3",              # Flipkart primary price
+    "span._16Jk6d",             # Flipkart alternate price
+    # NEW: Walmart price selectors
+    "span[data-automation-id*='price']",  # Walmart price
+    # NEW: eBay price selectors
+    "span.s-item-price",        # eBay item price
+]
+
+# ===== AVAILABILITY SELECTORS =====
+# MERGED: Removed duplicate ".in-stock" (appears only once now)
+AVAILABILITY_SELECTORS = [
+    ".availability",
+    ".stock-status",
+    ".in-stock",                # Covers both generic and Flipkart
+    ".stock",
+    "[class*='availability']",
+    "[class*='stock']",
+    # NEW ADDITIONS:
+    ".stock-info",              # Generic stock info
+    # NEW: eBay availability
+    "span.SECONDARY_INFO",      # eBay secondary info
+]
+
+# ===== LINK SELECTORS =====
+# MERGED: Removed duplicate "a" (only at end), added a[href*='item']
+LINK_SELECTORS = [
+    "a.product-link",
+    "a.product-name",
+    ".product a",
+    "a[href*='product']",
+    # NEW ADDITION:
+    "a[href*='item']",          # Generic item links
+    "a",                        # Fallback (last option)
+]
+
+# ===== NEW: IMAGE/THUMBNAIL SELECTORS =====
+IMAGE_SELECTORS = [
+    "img.product-image",
+    "img.product-thumbnail",
+    "img.product-thumb",
+    ".product-image img",
+    "img[src*='product']",
+    "img[alt*='product']",
+]
+
+# ===== NEW: SELLER/VENDOR SELECTORS =====
+SELLER_SELECTORS = [
+    ".seller-name",
+    ".vendor-name",
+    ".store-name",
+    "[class*='seller']",
+    "[class*='vendor']",
+    "[class*='store']",
+]
+
+# ===== NEW: RATING/REVIEW SELECTORS =====
+RATING_SELECTORS = [
+    ".product-rating",
+    ".rating",
+    ".star-rating",
+    ".review-score",
+    "[class*='rating']",
+    "[class*='stars']",
+]
+
+# ===== NEW: UNITS SOLD / POPULARITY SELECTORS =====
+SOLD_COUNT_SELECTORS = [
+    ".sold-count",
+    ".units-sold",
+    "[class*='sold']",
+    "[class*='purchased']",
+    ".popularity",
+    ".buy-count",
+]
+
+# ===== NEW: CONDITION SELECTORS =====
+CONDITION_SELECTORS = [
+    ".condition",
+    ".product-condition",
+    "[class*='condition']",
+    "[class*='refurbish']",
+]
+
+# ===== NEW: DELIVERY COST SELECTORS =====
+# FIXED: Removed [class*='delivery'] and [class*='shipping']
+# (moved to DELIVERY_INFO_SELECTORS to avoid duplication)
+DELIVERY_SELECTORS = [
+    ".delivery-cost",
+    ".shipping-cost",
+    ".shipping-price",
+]
+
+# ===== NEW: SELLER RATING SELECTORS =====
+SELLER_RATING_SELECTORS = [
+    ".seller-rating",
+    ".seller-score",
+    ".store-rating",
+    "[class*='seller-rating']",
+    "[class*='positive']",
+]
+
+# ===== NEW: ORIGINAL PRICE SELECTORS =====
+ORIGINAL_PRICE_SELECTORS = [
+    ".original-price",
+    ".old-price",
+    ".rrp",
+    ".mrp-price",
+    "[class*='original-price']",
+    "[class*='mrp']",
+]
+
+# ===== NEW: DISCOUNT PERCENTAGE SELECTORS =====
+DISCOUNT_PERCENTAGE_SELECTORS = [
+    ".discount-percentage",
+    ".discount-badge",
+    ".percent-off",
+    ".savings",
+    "[class*='discount-percent']",
+    "[class*='off']",
+]
+
+# ===== NEW: STOCK COUNT SELECTORS =====
+STOCK_COUNT_SELECTORS = [
+    ".stock-count",
+    ".quantity-left",
+    ".inventory-count",
+    ".units-left",
+    "[class*='stock-count']",
+    "[data-stock]",
+]
+
+# ===== NEW: CATEGORY SELECTORS =====
+CATEGORY_SELECTORS = [
+    ".breadcrumb",
+    ".product-category",
+    ".category-tag",
+    "[class*='category']",
+    "[class*='breadcrumb']",
+]
+
+# ===== NEW: MERCHANT SELECTORS =====
+MERCHANT_SELECTORS = [
+    ".seller-info",
+    ".merchant-name",
+    ".store-badge",
+    "[class*='seller-badge']",
+    "[class*='merchant']",
+]
+
+# ===== NEW: DELIVERY INFO SELECTORS =====
+# FIXED: Now includes [class*='delivery'] and [class*='shipping']
+# (removed from DELIVERY_SELECTORS to avoid duplication)
+DELIVERY_INFO_SELECTORS = [
+    ".delivery-info",
+    ".shipping-info",
+    ".delivery-date",
+    "[class*='delivery']",      # Moved here (was in DELIVERY_SELECTORS)
+    "[class*='shipping-date']",
+    "[class*='shipping']",      # Moved here (was in DELIVERY_SELECTORS)
+]
+
+# ===== NEW: STOCK STATUS SELECTORS =====
+STOCK_STATUS_SELECTORS = [
+    ".out-of-stock",
+    ".stock-status",
+    "[data-availability]",
+    "[class*='low-stock']",
+    "[class*='stock-status']",
+]
+
+# ===== NEW: BADGE SELECTORS =====
+BADGE_SELECTORS = [
+    ".badge",
+    ".product-badge",
+    ".hot-deal",
+    ".sale-badge",
+    ".new-product",
+    ".best-seller",
+    "[class*='badge']",
+    "[class*='label']",
+]
+
+# ===== NEW: SKU SELECTORS =====
+SKU_SELECTORS = [
+    ".product-sku",
+    ".sku",
+    "[data-product-id]",
+    "[data-sku]",
+    "[class*='sku']",
+]
+
+# ===== NEW: SPECS SELECTORS =====
+SPECS_SELECTORS = [
+    ".specs",
+    ".highlights",
+    ".product-specs",
+    ".feature-list",
+    "[class*='spec']",
+]
+
+# ===== NEW: WARRANTY SELECTORS =====
+WARRANTY_SELECTORS = [
+    ".warranty",
+    ".guarantee",
+    ".warranty-text",
+    "[class*='warranty']",
+    "[class*='guarantee']",
+]
+
+
+# ========== COMPILED EXTRACTION PLAN ==========
+
+# Output fields in column order: (field name, selectors, attribute to read or None for text)
+# NOTE: WARRANTY_SELECTORS is kept for reference but is not part of the exported columns.
+PRODUCT_FIELDS = [
+    ("product_name", TITLE_SELECTORS, None),
+    ("price", PRICE_SELECTORS, None),
+    ("availability", AVAILABILITY_SELECTORS, None),
+    ("product_url", LINK_SELECTORS, "href"),
+    ("image_url", IMAGE_SELECTORS, "src"),
+    ("seller", SELLER_SELECTORS, None),
+    ("rating", RATING_SELECTORS, None),
+    ("units_sold", SOLD_COUNT_SELECTORS, None),
+    ("condition", CONDITION_SELECTORS, None),
+    ("delivery_cost", DELIVERY_SELECTORS, None),
+    ("seller_rating", SELLER_RATING_SELECTORS, None),
+    ("original_price", ORIGINAL_PRICE_SELECTORS, None),
+    ("discount_in_percentage", DISCOUNT_PERCENTAGE_SELECTORS, None),
+    ("stock_qty", STOCK_COUNT_SELECTORS, None),
+    ("product_category", CATEGORY_SELECTORS, None),
+    ("seller_info", MERCHANT_SELECTORS, None),
+    ("delivery_info", DELIVERY_INFO_SELECTORS, None),
+    ("stock_status", STOCK_STATUS_SELECTORS, None),
+    ("badge", BADGE_SELECTORS, None),
+    ("product_code", SKU_SELECTORS, None),
+    ("specs", SPECS_SELECTORS, None),
+]
+
+
+# Column order of every product row
+PRODUCT_COLUMNS = tuple(name for name, _, _ in PRODUCT_FIELDS) + ("scraped_date", "scraped_time")
+_PRODUCT_SLOTS = frozenset(PRODUCT_COLUMNS)
+
+# Low-cardinality text fields: identical values share one string object across rows
+INTERNED_FIELDS = frozenset((
+    "availability", "seller", "condition", "delivery_cost", "product_category",
+    "seller_info", "delivery_info", "stock_status", "badge", "scraped_date", "scraped_time",
+))
+
+
+_UNSET = object()
+
+
+class Product(MutableMapping):
+    """
+    Compact product record: one slot per column instead of a 23-key dict per row.
+
+    Behaves like a dict for callers: p["price"], p.get("rating"), p["x"] = ...,
+    dict(p), keys()/items(), json.dumps(dict(p)), pd.DataFrame([p, ...]).
+    Keys outside PRODUCT_COLUMNS (custom ExtractionPlan fields) go to a small
+    overflow dict. Unset columns are simply missing keys, like in a dict.
+    """
+
+    __slots__ = PRODUCT_COLUMNS + ("_extra",)
+
+    def __init__(self, *args, **kwargs):
+        self._extra = None
+        if args or kwargs:
+            self.update(*args, **kwargs)
+
+    def __getitem__(self, key):
+        if key in _PRODUCT_SLOTS:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        # Fast path: exporters and the history store call get() per field per row
+        if key in _PRODUCT_SLOTS:
+            return getattr(self, key, default)
+        if self._extra is not None:
+            return self._extra.get(key, default)
+        return default
+
+    def __setitem__(self, key, value):
+        if key in INTERNED_FIELDS and type(value) is str:
+            value = intern(value)
+        if key in _PRODUCT_SLOTS:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in _PRODUCT_SLOTS:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        elif self._extra is not None and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def __iter__(self):
+        for name in PRODUCT_COLUMNS:
+            if getattr(self, name, _UNSET) is not _UNSET:
+                yield name
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"Product({self.to_dict()!r})"
+
+    @classmethod
+    def from_row(cls, columns, row):
+        """Build a Product from a tuple of values for `columns` (see _parse_worker())"""
+        product = cls()
+        for name, value in zip(columns, row):
+            product[name] = value
+        return product
+
+    def to_dict(self):
+        # Same as dict(self), in one pass over the slots
+        result = {}
+        for name in PRODUCT_COLUMNS:
+            value = getattr(self, name, _UNSET)
+            if value is not _UNSET:
+                result[name] = value
+        if self._extra:
+            result.update(self._extra)
+        return result
+
+
+def products_to_dataframe(products):
+    """
+    Build a DataFrame from Product records (or dicts) without converting each
+    row to a temporary dict. Column order follows the products' keys.
+    """
+    products = products if isinstance(products, list) else list(products)
+    columns = list(dict.fromkeys(key for product in products for key in product))
+    return pd.DataFrame.from_records(
+        [tuple(product.get(column) for column in columns) for product in products],
+        columns=columns,
+    )
+
+
+def compile_selectors(selectors):
+    """
+    Compile CSS selectors with soupsieve, keeping their order.
+    Invalid selectors are skipped (same as extract_with_fallbacks ignoring them).
+    Returns: list of (selector_string, compiled_pattern)
+    """
+    compiled = []
+    for selector in selectors:
+        try:
+            compiled.append((selector, sv.compile(selector)))
+        except Exception as e:
+            print(f"[WARN] Skipping invalid selector {selector!r}: {e}")
+    return compiled
+
+
+# Compound selectors of the form tag / .class.chain / [attr] / [attr*='value'] (or a
+# combination), optionally chained with descendant combinators (".product a"), are
+# tested directly by the block walker; anything else goes through soupsieve/cssselect.
+SIMPLE_COMPOUND_RE = re.compile(
+    r"""(?P<tag>[a-zA-Z][\w-]*)?"""
+    r"""(?P<classes>(?:\.[\w-]+)*)"""
+    r"""(?:\[(?P<attr>[\w-]+)(?:\*=(?P<quote>['"])(?P<value>.*?)(?P=quote))?\])?"""
+)
+
+# Strings directly inside these tags are skipped by BeautifulSoup's get_text()
+NON_TEXT_TAGS = ("script", "style", "template")
+
+
+def parse_simple_selector(selector):
+    """
+    Split a selector into compound steps (tag, classes, attr, value), left to right.
+    Returns None if the selector uses anything beyond the simple grammar.
+    """
+    steps = []
+    pos = 0
+    selector = selector.strip()
+    while pos < len(selector):
+        m = SIMPLE_COMPOUND_RE.match(selector, pos)
+        if not m or m.end() == pos:
+            return None
+        tag, classes, attr, value = m.group("tag", "classes", "attr", "value")
+        steps.append((
+            tag.lower() if tag else None,
+            tuple(c for c in classes.split(".") if c),
+            attr.lower() if attr else None,
+            value,
+        ))
+        pos = m.end()
+        if pos < len(selector):
+            if not selector[pos].isspace():
+                return None
+            while pos < len(selector) and selector[pos].isspace():
+                pos += 1
+    return steps or None
+
+
+def compound_matches(step, name, attrs, class_list, class_text):
+    """Test one compound step against an element's name / attributes / classes."""
+    tag, classes, attr, value = step
+    if tag is not None and name != tag:
+        return False
+    for c in classes:
+        if c not in class_list:
+            return False
+    if attr is not None:
+        if attr == "class":
+            found = class_text
+        else:
+            found = attrs.get(attr)
+            if isinstance(found, list):
+                found = " ".join(found)
+        if found is None:
+            return False
+        # Same as soupsieve: [attr*=''] never matches
+        if value is not None and (not value or value not in found):
+            return False
+    return True
+
+
+class SelectorRule:
+    """
+    One compiled selector that can be tested against a single element.
+
+    Simple selectors (see SIMPLE_COMPOUND_RE) are matched with plain attribute
+    checks, with soupsieve's HTML semantics (case-sensitive classes, `*=` never
+    matches an empty value, ancestors may lie outside the block). Everything
+    else is delegated to the document tree (soupsieve or cssselect).
+    """
+
+    __slots__ = ("selector", "compiled", "steps")
+
+    def __init__(self, selector, compiled):
+        self.selector = selector
+        self.compiled = compiled
+        self.steps = parse_simple_selector(selector)
+
+    def index_key(self):
+        """Bucket used by the walker to find candidate rules for an element."""
+        if self.steps is None:
+            return ("*", None)
+        tag, classes, attr, _ = self.steps[-1]
+        if classes:
+            return ("class", classes[0])
+        if attr:
+            return ("attr", attr)
+        if tag:
+            return ("tag", tag)
+        return ("*", None)
+
+    def matches(self, el, name, attrs, class_list, class_text, tree):
+        if self.steps is None:
+            return tree.complex_match(self, el)
+
+        steps = self.steps
+        if not compound_matches(steps[-1], name, attrs, class_list, class_text):
+            return False
+
+        # Descendant combinators: match remaining steps right-to-left on ancestors
+        i = len(steps) - 2
+        node = tree.parent(el)
+        while i >= 0 and node is not None:
+            if compound_matches(steps[i], *tree.info(node)):
+                i -= 1
+            node = tree.parent(node)
+        return i < 0
+
+
+class SoupTree:
+    """Element access for BeautifulSoup documents (the reference html.parser path)."""
+
+    def parent(self, el):
+        parent = el.parent
+        return parent if isinstance(parent, Tag) and not isinstance(parent, BS) else None
+
+    def info(self, el):
+        attrs = el.attrs
+        class_value = attrs.get("class")
+        if class_value is None:
+            return el.name, attrs, (), None
+        if isinstance(class_value, str):
+            return el.name, attrs, class_value.split(), class_value
+        return el.name, attrs, class_value, " ".join(class_value)
+
+    def iter_elements(self, block):
+        for el in block.descendants:
+            if isinstance(el, Tag):
+                yield el
+
+    def complex_match(self, rule, el):
+        return rule.compiled.match(el)
+
+    def text(self, el):
+        return el.get_text(strip=True)
+
+    def serialize(self, el):
+        return str(el)
+
+    def base_href(self, doc):
+        base = doc.find("base", href=True)
+        return base["href"].strip() if base else None
+
+
+class LxmlTree:
+    """Element access for lxml.html documents (fast parser mode)."""
+
+    def __init__(self, root):
+        self.root = root
+        self._complex_matches = {}
+
+    def parent(self, el):
+        return el.getparent()
+
+    def info(self, el):
+        attrs = el.attrib
+        class_value = attrs.get("class")
+        if class_value is None:
+            return el.tag, attrs, (), None
+        class_list = class_value.split()
+        return el.tag, attrs, class_list, " ".join(class_list)
+
+    def iter_elements(self, block):
+        for el in block.iterdescendants():
+            # Skip comments / processing instructions
+            if isinstance(el.tag, str):
+                yield el
+
+    def complex_match(self, rule, el):
+        # Evaluate the selector once over the whole document, then test membership
+        matched = self._complex_matches.get(rule.selector)
+        if matched is None:
+            matched = set(CSSSelector(rule.selector)(self.root))
+            self._complex_matches[rule.selector] = matched
+        return el in matched
+
+    def text(self, el):
+        # Mirror BeautifulSoup's get_text(strip=True): stripped strings joined,
+        # comments and script/style/template contents left out
+        parts = []
+
+        def collect(node, include_own_text):
+            if include_own_text and node.text:
+                parts.append(node.text)
+            for child in node:
+                if isinstance(child.tag, str):
+                    collect(child, child.tag not in NON_TEXT_TAGS)
+                if child.tail:
+                    parts.append(child.tail)
+
+        collect(el, True)
+        return "".join(s.strip() for s in parts if s.strip())
+
+    def serialize(self, el):
+        return lxml.html.tostring(el, encoding="unicode")
+
+    def base_href(self, doc):
+        for base in doc.iter("base"):
+            href = base.get("href")
+            if href:
+                return href.strip()
+        return None
+
+
+MAX_CACHED_LAYOUTS = 1024
+
+
+def _required_tokens(rule, skip_key: bool = False):
+    """
+    Class / attribute names a simple rule cannot match without, as
+    ("class" | "attr", name) pairs (none for selectors beyond the simple grammar).
+    skip_key leaves out the rule's index key: the walker only tests the rule
+    on elements that have it, so checking the page for it saves nothing.
+    """
+    if rule.steps is None:
+        return ()
+    tokens = []
+    for _, classes, attr, _ in rule.steps:
+        tokens.extend(("class", c) for c in classes)
+        if attr is not None and attr != "class":
+            tokens.append(("attr", attr))
+    if skip_key and rule.index_key() in tokens:
+        tokens.remove(rule.index_key())
+    return tuple(dict.fromkeys(tokens))
+
+
+def layout_signature(html: str, base_url: str, plan):
+    """
+    Key of a page layout: site, first path segment ("search", "browse", ...)
+    and which of the plan's page tokens occur in the raw HTML (classes are
+    case-sensitive, attribute names are not).
+    Returns: tuple, or None without a base_url (no site to key the layout on)
+    """
+    if not base_url:
+        return None
+    section = urlsplit(base_url).path.strip("/").split("/", 1)[0]
+    lowered = html.lower()
+    present = tuple((name in html) if kind == "class" else (name in lowered) for kind, name in plan.page_tokens)
+    return site_of(base_url), section, present
+
+
+class Layout:
+    """
+    Block selectors and field rules to run on the pages of one layout: the
+    block selector that won, after the ones ranked before it that could still
+    match, and a plan without the field rules that need a class / attribute
+    name missing from the page. Nothing left out can match, so the products
+    are the same as with full detection.
+    """
+
+    def __init__(self, plan, selector, signature):
+        present = {token for token, found in zip(plan.page_tokens, signature[-1]) if found}
+        winner = plan.block_index[selector]
+        self.selector = selector
+        self.block_candidates = [
+            index for index, tokens in enumerate(plan.block_tokens[:winner]) if present.issuperset(tokens)
+        ] + [winner]
+        self.plan = plan.narrowed(
+            {slot for slot, tokens in enumerate(plan.slot_tokens) if present.issuperset(tokens)}
+        )
+
+
+class LayoutCache:
+    """
+    Layout per layout_signature() (least recently used dropped after
+    max_layouts), so later pages from the same store skip full detection.
+    Thread-safe; process-local (parse-pool workers each learn their own).
+    """
+
+    def __init__(self, max_layouts: int = MAX_CACHED_LAYOUTS):
+        self.max_layouts = max_layouts
+        self._layouts = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, signature):
+        """Returns: the cached Layout, or None"""
+        with self._lock:
+            layout = self._layouts.get(signature)
+            if layout is not None:
+                self._layouts.move_to_end(signature)
+            return layout
+
+    def store(self, signature, layout):
+        with self._lock:
+            self._layouts[signature] = layout
+            self._layouts.move_to_end(signature)
+            if len(self._layouts) > self.max_layouts:
+                self._layouts.popitem(last=False)
+
+    def forget(self, signature):
+        with self._lock:
+            self._layouts.pop(signature, None)
+
+    def clear(self):
+        with self._lock:
+            self._layouts.clear()
+
+
+class ExtractionPlan:
+    """
+    Product block + field selectors, compiled once and reused for every page.
+
+    Build a plan once (at import for the default one) and pass it around;
+    parse_products() and the scheduler share DEFAULT_PLAN.
+
+    extract() walks each product block once and tests every element against
+    all field rules at the same time, instead of running one select_one()
+    per field per fallback selector. The same rules run on BeautifulSoup and
+    lxml trees.
+    """
+
+    def __init__(self, block_selectors=None, fields=None):
+        if block_selectors is None:
+            block_selectors = PRODUCT_BLOCK_SELECTORS
+        if fields is None:
+            fields = PRODUCT_FIELDS
+
+        self.block_selectors = compile_selectors(block_selectors)
+        self.block_rules = [SelectorRule(sel, compiled) for sel, compiled in self.block_selectors]
+        self._lxml_block_selectors = None
+        self.fields = []
+        self.field_names = []
+
+        # Every (field, fallback selector) pair gets a slot; slots of one field are
+        # contiguous and in fallback order, so resolving a field is a left-to-right scan.
+        self._slot_count = 0
+        self._rules_by_class = {}
+        self._rules_by_attr = {}
+        self._rules_by_tag = {}
+        self._complex_rules = []
+        self.slot_tokens = []
+
+        for name, selectors, attr in fields:
+            rules = [SelectorRule(sel, compiled) for sel, compiled in compile_selectors(selectors)]
+            first_slot = self._slot_count
+            for rule in rules:
+                kind, key = rule.index_key()
+                entry = (self._slot_count, rule)
+                if kind == "class":
+                    self._rules_by_class.setdefault(key, []).append(entry)
+                elif kind == "attr":
+                    self._rules_by_attr.setdefault(key, []).append(entry)
+                elif kind == "tag":
+                    self._rules_by_tag.setdefault(key, []).append(entry)
+                else:
+                    self._complex_rules.append(entry)
+                self.slot_tokens.append(_required_tokens(rule, skip_key=True))
+                self._slot_count += 1
+            self.fields.append((name, range(first_slot, self._slot_count), attr))
+            self.field_names.append(name)
+
+        # iter_products() can parse incrementally only if no rule needs the whole document
+        self.streamable = (
+            all(rule.steps is not None for rule in self.block_rules) and not self._complex_rules
+        )
+
+        # Changes whenever the selectors change (see parse_version())
+        self.version = hashlib.sha256(repr((block_selectors, fields)).encode("utf-8")).hexdigest()[:16]
+
+        # Layouts learned by parse_products() (see Layout): the page tokens are the
+        # names whose absence rules out a block selector or a field rule
+        self.block_index = {selector: index for index, (selector, _) in enumerate(self.block_selectors)}
+        self.block_tokens = [_required_tokens(rule) for rule in self.block_rules]
+        self.page_tokens = tuple(dict.fromkeys(
+            token for tokens in self.block_tokens + self.slot_tokens for token in tokens
+        ))
+        self.layouts = LayoutCache()
+
+    def find_blocks(self, soup, only=None):
+        """
+        Return (selector, blocks) for the first block selector that matches
+        (only the selectors at the indexes in `only` when given).
+        Returns (None, []) when no selector matches.
+        """
+        selectors = self.block_selectors if only is None else [self.block_selectors[i] for i in only]
+        for selector, compiled in selectors:
+            found = compiled.select(soup)
+            if found:
+                return selector, found
+        return None, []
+
+    def find_blocks_lxml(self, root, only=None):
+        """Same as find_blocks() for an lxml.html document (cssselect → XPath)."""
+        if self._lxml_block_selectors is None:
+            self._lxml_block_selectors = [
+                (selector, CSSSelector(selector)) for selector, _ in self.block_selectors
+            ]
+        selectors = self._lxml_block_selectors if only is None else [self._lxml_block_selectors[i] for i in only]
+        for selector, xpath in selectors:
+            found = xpath(root)
+            if found:
+                return selector, found
+        return None, []
+
+    def narrowed(self, slots):
+        """
+        Copy of this plan that only evaluates the given rule slots (see Layout).
+        Each field keeps its fallback order among its remaining slots.
+        """
+        if len(slots) == self._slot_count:
+            return self
+
+        def keep(entries):
+            return [entry for entry in entries if entry[0] in slots]
+
+        plan = copy(self)
+        plan._rules_by_class = {key: kept for key, kept in
+                                ((key, keep(entries)) for key, entries in self._rules_by_class.items()) if kept}
+        plan._rules_by_attr = {key: kept for key, kept in
+                               ((key, keep(entries)) for key, entries in self._rules_by_attr.items()) if kept}
+        plan._rules_by_tag = {key: kept for key, kept in
+                              ((key, keep(entries)) for key, entries in self._rules_by_tag.items()) if kept}
+        plan._complex_rules = keep(self._complex_rules)
+        return plan
+
+    def _first_matches(self, block, tree):
+        """
+        Single pass over the block's descendants.
+        Returns: list indexed by slot holding the first matching element (document
+        order), i.e. what select_one() would have returned for that selector.
+        """
+        slots = [None] * self._slot_count
+        by_class = self._rules_by_class
+        by_attr = self._rules_by_attr
+        by_tag = self._rules_by_tag
+        complex_rules = self._complex_rules
+        info = tree.info
+
+        for el in tree.iter_elements(block):
+            name, attrs, class_list, class_text = info(el)
+
+            candidates = []
+            for c in class_list:
+                rules = by_class.get(c)
+                if rules:
+                    candidates.extend(rules)
+            for a in attrs:
+                rules = by_attr.get(a)
+                if rules:
+                    candidates.extend(rules)
+            rules = by_tag.get(name)
+            if rules:
+                candidates.extend(rules)
+            candidates.extend(complex_rules)
+
+            for slot, rule in candidates:
+                if slots[slot] is None and rule.matches(el, name, attrs, class_list, class_text, tree):
+                    slots[slot] = el
+
+        return slots
+
+    def extract(self, block, tree=None):
+        """
+        Resolve every field of one product block.
+        Same result as extract_with_fallbacks() per field: the first selector (in
+        fallback order) whose first match has non-empty text / attribute wins.
+        Returns: Product of field name -> value (or None)
+        """
+        if tree is None:
+            tree = SOUP_TREE
+        slots = self._first_matches(block, tree)
+        result = Product()
+        for name, slot_range, attr in self.fields:
+            value = None
+            for slot in slot_range:
+                el = slots[slot]
+                if el is None:
+                    continue
+                if attr is not None:
+                    found = el.get(attr)
+                    if found:
+                        value = found.strip()
+                        break
+                else:
+                    text = tree.text(el)
+                    if text:
+                        value = text
+                        break
+            result[name] = value
+        return result
+
+
+SOUP_TREE = SoupTree()
+DEFAULT_PLAN = ExtractionPlan()
+
+
+def parse_version(parser: str = "html.parser", plan: ExtractionPlan = None):
+    """
+    What the parsed products depend on besides the page: selectors and parser.
+    Stored with cached products, so editing selectors or switching parser= re-parses.
+    """
+    return f"{(plan or DEFAULT_PLAN).version}:{parser}"
+
+# Parser backends for parse_products(): "html.parser" is the BeautifulSoup
+# reference path, "lxml" parses with lxml.html and runs the same plan on it.
+PARSER_BACKENDS = ("html.parser", "lxml")
+
+
+def _parse_document(html, parser):
+    """
+    Build the document tree for the chosen backend.
+    Returns: (tree_adapter, find_blocks_root, parser_used)
+    """
+    if parser == "lxml":
+        if LXML_AVAILABLE:
+            if not html or not html.strip():
+                return None, None, parser
+            root = lxml.html.document_fromstring(html)
+            return LxmlTree(root), root, parser
+        print("[WARN] lxml is not installed, falling back to html.parser")
+    elif parser != "html.parser":
+        raise ValueError(f"Unknown parser {parser!r}, expected one of {PARSER_BACKENDS}")
+
+    return SOUP_TREE, BS(html, "html.parser"), "html.parser"
+
+
+def resolve_url(link, base_url):
+    """
+    Make a product/image link absolute against the page URL (urljoin semantics:
+    handles "/path", "//host/path", "../path" and "path"; absolute links are kept).
+    """
+    if not link or not base_url:
+        return link
+    return urljoin(base_url, link)
+
+
+def _guess_base_url(block_html):
+    """
+    Legacy fallback when the page URL is unknown: sniff a known store domain
+    from the block markup.
+    """
+    if "web-scraping.dev" in block_html:
+        return "https://www.web-scraping.dev"
+    block_html = block_html.lower()
+    if "flipkart" in block_html:
+        return "https://www.flipkart.com"
+    if "walmart" in block_html:
+        return "https://www.walmart.com"
+    if "ebay" in block_html:
+        return "https://www.ebay.com"
+    return None
+
+
+class _HostRate:
+    """Token bucket + health of one host (see HostThrottle)"""
+    __slots__ = ("rate", "ceiling", "tokens", "updated", "latency", "paused_until")
+
+    def __init__(self, rate, ceiling):
+        self.rate = rate
+        self.ceiling = ceiling
+        self.tokens = 1.0
+        self.updated = monotonic()
+        self.latency = None
+        self.paused_until = 0.0
+
+    def available(self, now):
+        # Tokens refill at `rate` per second; the bucket holds one request
+        return min(1.0, self.tokens + (now - self.updated) * self.rate)
+
+
+class HostThrottle:
+    """
+    Adaptive per-host politeness: one token bucket per host, so requests to the
+    same host are spaced by 1 / rate while different hosts never wait on each other.
+
+    - Starts at START_RATE; never faster than robots.txt's Crawl-delay / Request-rate
+      (see get_robots(); read only when respect_crawl_delay, by default RESPECT_ROBOTS),
+      HOST_MAX_RATES or MAX_RATE
+    - Speeds up by SPEEDUP_STEP after every healthy response
+    - Halves the rate on 429 / 503 (pausing for Retry-After) and slows down on latency spikes
+    Thread-safe, so one instance can be shared by concurrent fetchers.
+    Responses reach it through the shared session (see _rate_feedback()).
+    """
+
+    def __init__(self, start_rate: float = START_RATE, max_rate: float = MAX_RATE,
+                 min_rate: float = MIN_RATE, respect_crawl_delay: bool = None):
+        self.start_rate = start_rate
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.respect_crawl_delay = respect_crawl_delay  # None: follow RESPECT_ROBOTS
+        self._lock = Lock()
+        self._hosts = {}
+
+    def _host_rate(self, url: str, host: str):
+        state = self._hosts.get(host)
+        if state is None:
+            # robots.txt is read outside the lock; two threads racing on a new
+            # host may both read it, the first one to finish wins
+            ceiling = HOST_MAX_RATES.get(host, self.max_rate)
+            respect = RESPECT_ROBOTS if self.respect_crawl_delay is None else self.respect_crawl_delay
+            delay = get_robots().crawl_delay(url) if respect else None
+            if delay:
+                ceiling = min(ceiling, 1.0 / delay)
+            ceiling = max(ceiling, self.min_rate)
+            with self._lock:
+                state = self._hosts.setdefault(host, _HostRate(min(self.start_rate, ceiling), ceiling))
+        return state
+
+    def reserve(self, url: str):
+        """
+        Reserve the next request slot for url's host without sleeping.
+        Returns: seconds the caller must wait before sending the request
+        """
+        host = urlsplit(url).netloc.lower()
+        state = self._host_rate(url, host)
+        with self._lock:
+            now = monotonic()
+            state.tokens = state.available(now)
+            state.updated = now
+            delay = max(0.0, (1.0 - state.tokens) / state.rate, state.paused_until - now)
+            state.tokens -= 1.0  # may go negative: later callers queue behind this one
+        # A little jitter (never shorter) so requests don't look machine-timed
+        return delay * uniform(1.0, 1.2)
+
+    def ready_in(self, host: str):
+        """
+        Returns: seconds until the next request slot of host (as in
+        urlsplit(url).netloc.lower()) is free, 0 if it is free now
+        """
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                return 0.0
+            now = monotonic()
+            return max(0.0, (1.0 - state.available(now)) / state.rate, state.paused_until - now)
+
+    def record(self, url: str, status: int, latency: float = None, retried_statuses=(),
+               retry_after=None):
+        """
+        Adapt url's host rate to one response.
+        status: final HTTP status; retried_statuses: statuses of attempts that
+        were retried before it; retry_after: Retry-After header value
+        """
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                return
+            if status in THROTTLE_STATUS_CODES or any(s in THROTTLE_STATUS_CODES for s in retried_statuses):
+                state.rate = max(self.min_rate, state.rate * BACKOFF_FACTOR)
+                pause = _retry_after_seconds(retry_after)
+                if pause:
+                    state.paused_until = max(state.paused_until, monotonic() + pause)
+            elif (latency is not None and state.latency is not None
+                  and latency > 1.0 and latency > LATENCY_SPIKE * state.latency):
+                state.rate = max(self.min_rate, state.rate * SLOW_BACKOFF_FACTOR)
+            elif status < 400:
+                state.rate = min(state.ceiling, state.rate + SPEEDUP_STEP)
+
+            if latency is not None:
+                state.latency = latency if state.latency is None else 0.8 * state.latency + 0.2 * latency
+
+    def rates(self):
+        """Returns: {host: current requests per second}"""
+        with self._lock:
+            return {host: state.rate for host, state in self._hosts.items()}
+
+    def wait(self, url: str):
+        """
+        Block until a request to url's host is allowed, and reserve the next slot.
+        Returns: seconds waited
+        """
+        delay = self.reserve(url)
+        if delay > 0:
+            sleep(delay)
+        return delay
+
+
+# Shared by scrape_and_save() and scrape_many() so politeness holds across calls
+HOST_THROTTLE = HostThrottle()
+
+
+class AsyncFetcher:
+    """
+    Pooled asyncio HTTP client (httpx) for keeping many pages in flight.
+
+    - One connection pool with HTTP keep-alive (optionally HTTP/2 if `h2` is installed)
+    - At most max_per_host requests in flight per host
+    - Same politeness as the blocking path (HOST_THROTTLE) unless polite=False
+    - fetch() keeps fetch_page()'s (html, error) contract
+
+    Usage:
+        async with AsyncFetcher(max_per_host=4) as fetcher:
+            html, error = await fetcher.fetch(url)
+    """
+
+    def __init__(self, max_connections: int = 100, max_per_host: int = 6, http2: bool = False,
+                 timeout: float = 15, polite: bool = True, throttle: HostThrottle = None):
+        if not HTTPX_AVAILABLE:
+            raise ImportError("AsyncFetcher requires httpx (pip install httpx)")
+
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                print("[WARN] HTTP/2 requested but 'h2' is not installed, using HTTP/1.1")
+                http2 = False
+
+        self.max_per_host = max_per_host
+        self.throttle = (throttle or HOST_THROTTLE) if polite else None
+        self._host_slots = {}
+        self._client = httpx.AsyncClient(
+            headers=HEADERS,
+            timeout=timeout,
+            http2=http2,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=30,
+            ),
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    def _slot(self, host):
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = asyncio.Semaphore(self.max_per_host)
+            self._host_slots[host] = slot
+        return slot
+
+    async def fetch(self, url: str):
+        """
+        Fetch page HTML from a URL.
+        Returns: (html_string, error_message)
+        """
+        async with self._slot(urlsplit(url).netloc.lower()):
+            # In a thread: the first request to a host reads its robots.txt
+            loop = asyncio.get_running_loop()
+            blocked = await loop.run_in_executor(None, robots_error, url)
+            if blocked:
+                return None, blocked
+            if self.throttle is not None:
+                delay = await loop.run_in_executor(None, self.throttle.reserve, url)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            try:
+                resp = await self._client.get(url)
+                if self.throttle is not None:
+                    self.throttle.record(url, resp.status_code, resp.elapsed.total_seconds(),
+                                         retry_after=resp.headers.get("Retry-After"))
+                resp.raise_for_status()
+                return resp.text, None
+            except Exception as e:
+                return None, str(e)
+
+    async def fetch_all(self, urls):
+        """
+        Fetch many URLs concurrently.
+        Returns: dict url -> (html_string, error_message)
+        """
+        urls = list(dict.fromkeys(urls))
+        results = await asyncio.gather(*(self.fetch(url) for url in urls))
+        return dict(zip(urls, results))
+
+
+async def async_fetch_page(url: str, fetcher: AsyncFetcher = None):
+    """
+    Async counterpart of fetch_page().
+    Pass a shared AsyncFetcher to reuse its connection pool; without one a
+    short-lived client is created for this single request.
+    Returns: (html_string, error_message)
+    """
+    if fetcher is not None:
+        return await fetcher.fetch(url)
+    try:
+        async with AsyncFetcher() as own_fetcher:
+            return await own_fetcher.fetch(url)
+    except ImportError as e:
+        return None, str(e)
+
+
+def stamp_products(products):
+    """Set scraped_date / scraped_time on products to now (e.g. when reusing cached rows)."""
+    scraped_date, scraped_time = _scrape_stamp()
+    for product in products:
+        product["scraped_date"] = scraped_date
+        product["scraped_time"] = scraped_time
+    return products
+
+
+def _scrape_stamp():
+    """Returns: (scraped_date, scraped_time) for now, shared by all rows of one parse"""
+    now = datetime.now()
+    return intern(now.strftime("%Y-%m-%d")), intern(now.strftime("%H:%M:%S"))
+
+
+def _finish_product(fields, block, tree, base_url, stamp):
+    """Resolve relative links and add scrape timestamps to one extracted product."""
+    product_link = fields.get("product_url")
+    image_url = fields.get("image_url")
+
+    if base_url:
+        product_link = resolve_url(product_link, base_url)
+        image_url = resolve_url(image_url, base_url)
+    elif (product_link and product_link.startswith("/")) or (image_url and image_url.startswith("/")):
+        # No page URL: detect the store domain from the block (serialized once)
+        guessed = _guess_base_url(tree.serialize(block))
+        if guessed:
+            if product_link and product_link.startswith("/"):
+                product_link = guessed + product_link
+            if image_url and image_url.startswith("/"):
+                image_url = guessed + image_url
+
+    fields["product_url"] = product_link
+    fields["image_url"] = image_url
+    fields["scraped_date"], fields["scraped_time"] = stamp
+    return fields
+
+
+def parse_products(html: str, plan: ExtractionPlan = None, parser: str = "html.parser",
+                   base_url: str = None):
+    """
+    Parse e-commerce products from HTML.
+    Uses DEFAULT_PLAN unless a custom ExtractionPlan is given.
+    parser: "html.parser" (BeautifulSoup, reference) or "lxml" (faster, same output;
+            falls back to html.parser if lxml is not installed)
+    base_url: URL the HTML was fetched from; relative product/image links are
+              resolved against it (and against a <base href> in the page).
+    Returns: list of Product records (dict-like) with product data
+    """
+    if plan is None:
+        plan = DEFAULT_PLAN
+
+    tree, doc, parser = _parse_document(html, parser)
+    if doc is None:
+        return []
+    find_blocks = plan.find_blocks_lxml if parser == "lxml" else plan.find_blocks
+
+    # Known layout of this store: skip the block selectors and field rules that cannot match
+    signature = layout_signature(html, base_url, plan)
+    layout = plan.layouts.get(signature) if signature is not None else None
+    selector, product_blocks = None, []
+    if layout is not None:
+        selector, product_blocks = find_blocks(doc, layout.block_candidates)
+        if selector != layout.selector:
+            # Layout changed: detect (and learn) it again
+            plan.layouts.forget(signature)
+            layout = None
+    if not product_blocks:
+        selector, product_blocks = find_blocks(doc)
+    if product_blocks:
+        print(f"[DEBUG] Found {len(product_blocks)} products with selector: {selector}")
+
+    # Document base: <base href> resolved against the page URL
+    base_href = tree.base_href(doc)
+    if base_href:
+        base_url = urljoin(base_url, base_href) if base_url else base_href
+
+    # ===== EXTRACT PRODUCTS =====
+    stamp = _scrape_stamp()
+    if layout is None and signature is not None and product_blocks:
+        # Full detection: remember the winner for the next page of this layout
+        layout = Layout(plan, selector, signature)
+        plan.layouts.store(signature, layout)
+    extract_plan = layout.plan if layout is not None else plan
+    return [
+        _finish_product(extract_plan.extract(block, tree), block, tree, base_url, stamp)
+        for block in product_blocks
+    ]
+
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _iter_chunks(source, chunk_size):
+    """Yield str/bytes chunks from a string, bytes, file-like object or iterable of chunks."""
+    if isinstance(source, (str, bytes)):
+        for start in range(0, len(source), chunk_size):
+            yield source[start:start + chunk_size]
+    elif hasattr(source, "read"):
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    else:
+        for chunk in source:
+            if chunk:
+                yield chunk
+
 
+META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?([\w-]+)""", re.I)
 
-def extract_with_fallbacks(soup_or_element, selectors, attr=None):
+
+def _sniff_encoding(first_chunk: bytes):
+    m = META_CHARSET_RE.search(first_chunk[:4096])
+    return m.group(1).decode("ascii") if m else "utf-8"
+
+
+def _read_all(source):
+    chunks = list(_iter_chunks(source, STREAM_CHUNK_SIZE))
+    if not chunks:
+        return ""
+    if isinstance(chunks[0], bytes):
+        data = b"".join(chunks)
+        return data.decode(_sniff_encoding(data), errors="replace")
+    return "".join(chunks)
+
+
+def iter_products(source, plan: ExtractionPlan = None, parser: str = "lxml", base_url: str = None,
+                  chunk_size: int = STREAM_CHUNK_SIZE):
     """
-    Try a list of CSS selectors in order.
-    - If attr is None: return cleaned text.
-    - If attr is provided: return that attribute value.
-    - If nothing matches: return None.
+    Generator version of parse_products(): yields Product records one at a time.
+
+    source: HTML as str/bytes, a file-like object (e.g. response.raw, open file)
+            or an iterable of chunks (e.g. response.iter_content()).
+
+    With the lxml backend the page is parsed incrementally (HTMLPullParser):
+    each product block is extracted as soon as its closing tag arrives and
+    finished parts of the tree are freed, so the whole DOM is never held in
+    memory. Products are the same, in the same order, as parse_products().
+    With html.parser (or if lxml is missing / the plan needs full-document
+    selectors) the page is parsed in one go and products are yielded lazily.
     """
-    if soup_or_element is None:
+    if plan is None:
+        plan = DEFAULT_PLAN
+
+    if parser != "lxml" or not LXML_AVAILABLE or not plan.streamable:
+        yield from parse_products(_read_all(source), plan=plan, parser=parser, base_url=base_url)
+        return
+
+    yield from _stream_lxml_products(source, plan, base_url, chunk_size)
+
+
+def _stream_lxml_products(source, plan, base_url, chunk_size):
+    """
+    Incremental lxml parse for iter_products().
+
+    parse_products() picks the first block selector (in priority order) that
+    matches anywhere in the page. While streaming we track the best-priority
+    selector seen so far: products of the top-priority selector are yielded as
+    soon as they complete, others are buffered (as dicts, not DOM) until the
+    end of the page decides which selector wins.
+    """
+    tree = LxmlTree(None)
+    pull = None
+    block_rules = plan.block_rules
+    stamp = _scrape_stamp()
+
+    state = {"best": None, "base": None}
+    pending = []        # [selector index, product or None] for the best selector, in document order
+    open_blocks = {}    # Open candidate block element -> its pending entry
+    ready = []
+
+    def handle(events):
+        for event, el in events:
+            if not isinstance(el.tag, str):
+                continue
+
+            if event == "start":
+                if el.tag == "base" and state["base"] is None and el.get("href"):
+                    href = el.get("href").strip()
+                    state["base"] = urljoin(base_url, href) if base_url else href
+
+                best = state["best"]
+                name, attrs, class_list, class_text = tree.info(el)
+                for index, rule in enumerate(block_rules):
+                    if best is not None and index > best:
+                        break
+                    if rule.matches(el, name, attrs, class_list, class_text, tree):
+                        if best is None or index < best:
+                            state["best"] = index
+                            pending.clear()
+                        entry = [index, None]
+                        pending.append(entry)
+                        open_blocks[el] = entry
+                        break
+                continue
+
+            # event == "end"
+            entry = open_blocks.pop(el, None)
+            if entry is not None and entry[0] == state["best"]:
+                fields = plan.extract(el, tree)
+                entry[1] = _finish_product(fields, el, tree, state["base"] or base_url, stamp)
+                # Only the top-priority selector can never be overridden by a later match
+                while state["best"] == 0 and pending and pending[0][1] is not None:
+                    ready.append(pending.pop(0)[1])
+
+            if not open_blocks:
+                # No open block needs this subtree any more: free it and earlier siblings
+                el.clear(keep_tail=True)
+                parent = el.getparent()
+                if parent is not None:
+                    while el.getprevious() is not None:
+                        del parent[0]
+
+    count = 0
+    for chunk in _iter_chunks(source, chunk_size):
+        if pull is None:
+            # Bytes: honour <meta charset> if present in the first chunk, else UTF-8
+            encoding = _sniff_encoding(chunk) if isinstance(chunk, bytes) else None
+            pull = etree.HTMLPullParser(events=("start", "end"), encoding=encoding)
+        pull.feed(chunk)
+        handle(pull.read_events())
+        count += len(ready)
+        yield from ready
+        ready.clear()
+    if pull is None:
+        return
+    pull.close()
+    handle(pull.read_events())
+
+    ready.extend(product for _, product in pending if product is not None)
+    count += len(ready)
+    yield from ready
+    if count:
+        print(f"[DEBUG] Found {count} products with selector: {plan.block_selectors[state['best']][0]}")
+
+# ========== PROCESS-POOL PARSING ==========
+
+# Parsing is pure-Python and CPU bound; with parse_workers > 0, pages are
+# parsed in worker processes so several pages (or jobs) use several cores
+_parse_pool = None
+_parse_pool_workers = 0
+_parse_pool_lock = Lock()
+
+
+def get_parse_pool(workers: int = None):
+    """
+    Return the shared parse ProcessPoolExecutor (created on first use, and
+    recreated when a different number of workers is asked for).
+    workers: number of processes (default: all CPU cores)
+    """
+    global _parse_pool, _parse_pool_workers
+    workers = workers or cpu_count() or 1
+    with _parse_pool_lock:
+        if _parse_pool is None or _parse_pool_workers != workers:
+            if _parse_pool is not None:
+                _parse_pool.shutdown(wait=False)
+            _parse_pool = ProcessPoolExecutor(max_workers=workers)
+            _parse_pool_workers = workers
+        return _parse_pool
+
+
+def shutdown_parse_pool():
+    """Stop the parse worker processes (they are started again on next use)."""
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is not None:
+            _parse_pool.shutdown()
+            _parse_pool = None
+
+
+def _parse_worker(html_bytes: bytes, parser: str, base_url: str):
+    """
+    Runs in a parse-pool process. DEFAULT_PLAN was compiled once when the
+    worker imported this module and is reused for every page it parses.
+    Raw UTF-8 bytes come in; rows go back as plain tuples in PRODUCT_COLUMNS
+    order, which pickle far smaller than one Product / dict per row.
+    Returns: (columns, rows)
+    """
+    products = parse_products(html_bytes.decode("utf-8"), parser=parser, base_url=base_url)
+    return PRODUCT_COLUMNS, [tuple(product.get(column) for column in PRODUCT_COLUMNS) for product in products]
+
+
+def submit_parse(html: str, parser: str = "html.parser", base_url: str = None, workers: int = None):
+    """
+    Queue parse_products(html) on the parse pool.
+    Returns: Future; pass it to parse_result() for the Product list
+    """
+    pool = get_parse_pool(workers)
+    future = pool.submit(_parse_worker, html.encode("utf-8"), parser, base_url)
+    future.parse_pool = pool
+    return future
+
+
+def parse_result(future, html: str = None, parser: str = "html.parser", base_url: str = None):
+    """
+    Products from a submit_parse() future. If the worker process died, the
+    pool is reset and the page is parsed in this process instead (or, when
+    html is None, BrokenProcessPool is raised for the caller to retry).
+    Returns: list of Product records
+    """
+    global _parse_pool
+    try:
+        columns, rows = future.result()
+    except BrokenProcessPool:
+        with _parse_pool_lock:
+            # Only the pool that broke (a new one may already be running)
+            if _parse_pool is future.parse_pool:
+                _parse_pool = None
+        if html is None:
+            raise
+        print("⚠️  Parse worker crashed, parsing in the main process")
+        return parse_products(html, parser=parser, base_url=base_url)
+    return [Product.from_row(columns, row) for row in rows]
+
+
+def parse_products_pooled(html: str, parser: str = "html.parser", base_url: str = None, workers: int = None):
+    """
+    parse_products() in a worker process of the shared parse pool (the calling
+    thread waits without holding the GIL, so other threads keep running).
+    Returns: list of Product records
+    """
+    return parse_result(submit_parse(html, parser, base_url, workers), html, parser, base_url)
+
+
+# ========== PAGINATION ==========
+
+# Cheap regex scan of <a>/<link> tags (no DOM build) so the fetcher can queue
+# the next page while the current one is still being parsed
+LINK_TAG_RE = re.compile(r"<(a|link)\b([^>]*)>(?:(.{0,200}?)</a\s*>)?", re.I | re.S)
+LINK_ATTR_RE = re.compile(r"""([\w:-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""")
+TAG_RE = re.compile(r"<[^>]+>")
+
+# Query parameters used for page numbers (web-scraping.dev, Walmart, Flipkart: page; eBay: _pgn)
+PAGE_PARAMS = ("page", "_pgn", "p", "pg", "pagenumber", "page_number")
+NEXT_LINK_HINTS = ("next", "pagination__next", "›", "»", ">")
+# Words of class / aria-label / data-testid / title values: "pagination__next",
+# "NextPage" and "Next page" all contain the word "next", "Nextbase" does not
+LABEL_WORD_RE = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+")
+# Path-style page numbers (/page/2)
+PATH_PAGE_RE = re.compile(r"/page/\d+/?$", re.I)
+
+
+def _link_candidates(html):
+    for m in LINK_TAG_RE.finditer(html):
+        tag = m.group(1).lower()
+        attrs = {}
+        for am in LINK_ATTR_RE.finditer(m.group(2)):
+            value = am.group(2) if am.group(2) is not None else am.group(3) if am.group(3) is not None else am.group(4)
+            attrs[am.group(1).lower()] = unescape(value)
+        text = unescape(TAG_RE.sub("", m.group(3) or "")).strip()
+        if attrs.get("href"):
+            yield tag, attrs, text
+
+
+def _page_number(url):
+    """Returns: (param_name, page_number) from the URL's query, or (None, None)"""
+    query = parse_qs(urlsplit(url).query)
+    for key, values in query.items():
+        if key.lower() in PAGE_PARAMS and values and values[0].isdigit():
+            return key, int(values[0])
+    return None, None
+
+
+def find_next_page(html: str, current_url: str):
+    """
+    Find the URL of the next listing page.
+    Tries, in order: rel="next" links, anchors labelled "next" (text, or the
+    word "next" in class / aria-label / data-testid / title) that carry a page
+    number, an anchor pointing at ?page=N+1 (or _pgn, p, ...), then "next"
+    anchors on the listing's own path (or a /page/N path). Other "next" links
+    (product titles, image carousels) are ignored.
+    Returns: absolute URL or None
+    """
+    if not html:
         return None
 
-    for selector in selectors:
-        try:
-            el = soup_or_element.select_one(selector)
-        except Exception:
-            el = None
+    candidates = list(_link_candidates(html))
+    current = urlsplit(current_url)
 
-        if el is None:
+    def absolute(href):
+        url = urljoin(current_url, href)
+        return None if urlsplit(url)._replace(fragment="") == current._replace(fragment="") else url
+
+    # 1. rel="next"
+    for tag, attrs, _ in candidates:
+        if "next" in attrs.get("rel", "").lower().split():
+            url = absolute(attrs["href"])
+            if url:
+                return url
+
+    # 2. Anchors that say "next" and carry a page number
+    labelled = []
+    for tag, attrs, text in candidates:
+        if tag != "a":
             continue
+        words = LABEL_WORD_RE.findall(
+            " ".join(attrs.get(name, "") for name in ("class", "aria-label", "data-testid", "title"))
+        )
+        if (text.lower() in NEXT_LINK_HINTS or "next" in text.lower().split()
+                or "next" in (word.lower() for word in words)):
+            url = absolute(attrs["href"])
+            if url:
+                labelled.append(url)
+    for url in labelled:
+        if _page_number(url)[1] is not None:
+            return url
 
-        if attr is not None:
-            value = el.get(attr)
-            if value:
-                return value.strip()
-        else:
-            text = el.get_text(strip=True)
-            if text:
-                return text
+    # 3. ?page=N+1 style links
+    param, number = _page_number(current_url)
+    wanted = (number or 1) + 1
+    for tag, attrs, _ in candidates:
+        url = urljoin(current_url, attrs["href"])
+        link_param, link_number = _page_number(url)
+        if link_number == wanted and (param is None or link_param == param):
+            return url
+
+    # 4. "next" anchors that stay on the listing
+    for url in labelled:
+        path = urlsplit(url).path
+        if path == current.path or PATH_PAGE_RE.search(path):
+            return url
 
     return None
 
 
-def fetch_page(url: str):
+def _fetch_pages(start_url, max_pages, pages, stop):
     """
-    Fetch page HTML from a URL.
-    Returns: (html_string, error_message)
+    Producer: fetch listing pages one after another, following next links,
+    and hand (url, html, error) to the parser through the bounded queue.
     """
+    url = start_url
+    seen = set()
     try:
-        resp = get(url, headers=HEADERS, timeout=15)
-        resp.raise_for_status()
-        return resp.text, None
-    except Exception as e:
-        return None, str(e)
+        for _ in range(max_pages):
+            if stop.is_set() or url in seen:
+                break
+            seen.add(url)
+            HOST_THROTTLE.wait(url)
+            html, error = fetch_page(url)
+            pages.put((url, html, error))
+            if error:
+                break
+            url = find_next_page(html, url)
+            if not url:
+                break
+    finally:
+        pages.put(None)
 
 
-def parse_products(html: str):
+def crawl_listing(url: str, max_pages: int = 10, max_products: int = None, parser: str = "html.parser",
+                  parse_workers: int = 0):
     """
-    Parse e-commerce products from HTML.
-    Returns: list of dicts with product data
-    """
-    soup = BS(html, "html.parser")
-
-    # FIXED: Product block selectors – ordered by specificity & compatibility
-    product_block_selectors = [
-        ".product",                 # web-scraping.dev ✓ WORKS (keep this primary!)
-        ".row.product",             # Alternative pattern
-        ".product-card",            # Generic e-comm
-        ".product-tile",            # Generic e-comm
-        ".product-item",            # Generic e-comm
-        ".product-listing",         # Generic e-comm
-        ".plp-card",                # Generic e-comm
-        # NEW: Flipkart selectors
-        "div._4ddWXP",              # Flipkart product container
-        # NEW: Walmart selectors
-        "div[data-automation-id*='product']",  # Walmart product
-        # NEW: eBay selectors
-        "div.s-item",               # eBay product item
-    ]
+    Scrape a paginated listing: page N+1 is fetched while page N is being parsed
+    (producer thread + bounded queue), following next links until max_pages,
+    max_products or the last page.
+    parse_workers > 0 parses the pages in the process pool (see parse_products_pooled()).
 
-    product_blocks = []
-    for sel in product_block_selectors:
-        found = soup.select(sel)
-        if found:
-            product_blocks = found
-            print(f"[DEBUG] Found {len(found)} products with selector: {sel}")
-            break
+    Returns: (products: list, pages_scraped: int, error_message or None)
+    """
+    pages = Queue(maxsize=2)
+    stop = Event()
+    producer = Thread(target=_fetch_pages, args=(url, max_pages, pages, stop), daemon=True)
+    producer.start()
 
     products = []
+    pages_scraped = 0
+    error = None
+    while True:
+        item = pages.get()
+        if item is None:
+            break
+        if stop.is_set():
+            continue  # Drain pages fetched before the producer saw the stop flag
 
-    # ===== TITLE SELECTORS =====
-    TITLE_SELECTORS = [
-        ".product-name",
-        "h2.product-name",
-        "h3.product-name",
-        "h2.product-title",
-        "h3.product-title",
-        ".product-title",
-        "h2",
-        "h3",
-    ]
-
-    # ===== PRICE SELECTORS =====
-    # MERGED: Current + Your new ones (no duplicates)
-    PRICE_SELECTORS = [
-        ".product-price",
-        ".price",
-        "span.price",
-        ".sale-price",
-        "[class*='price']",
-        # NEW ADDITIONS:
-        ".current-price",           # Generic current price
-        ".item-price",              # Generic item price
-        # NEW: Flipkart price selectors
-        "div._30jeq3",              # Flipkart primary price
-        "span._16Jk6d",             # Flipkart alternate price
-        # NEW: Walmart price selectors
-        "span[data-automation-id*='price']",  # Walmart price
-        # NEW: eBay price selectors
-        "span.s-item-price",        # eBay item price
-    ]
+        page_url, html, fetch_error = item
+        if fetch_error:
+            error = f"{page_url}: {fetch_error}"
+            print(f"❌ Failed to fetch page {pages_scraped + 1}: {fetch_error}")
+            continue
 
-    # ===== AVAILABILITY SELECTORS =====
-    # MERGED: Removed duplicate ".in-stock" (appears only once now)
-    AVAILABILITY_SELECTORS = [
-        ".availability",
-        ".stock-status",
-        ".in-stock",                # Covers both generic and Flipkart
-        ".stock",
-        "[class*='availability']",
-        "[class*='stock']",
-        # NEW ADDITIONS:
-        ".stock-info",              # Generic stock info
-        # NEW: eBay availability
-        "span.SECONDARY_INFO",      # eBay secondary info
-    ]
+        if parse_workers:
+            page_products = parse_products_pooled(html, parser, page_url, parse_workers)
+        else:
+            page_products = parse_products(html, parser=parser, base_url=page_url)
+        pages_scraped += 1
+        print(f"📄 Page {pages_scraped}: {len(page_products)} products ({page_url})")
+        if not page_products:
+            stop.set()
+            continue
 
-    # ===== LINK SELECTORS =====
-    # MERGED: Removed duplicate "a" (only at end), added a[href*='item']
-    LINK_SELECTORS = [
-        "a.product-link",
-        "a.product-name",
-        ".product a",
-        "a[href*='product']",
-        # NEW ADDITION:
-        "a[href*='item']",          # Generic item links
-        "a",                        # Fallback (last option)
-    ]
+        products.extend(page_products)
+        if max_products is not None and len(products) >= max_products:
+            del products[max_products:]
+            stop.set()
 
-    # ===== NEW: IMAGE/THUMBNAIL SELECTORS =====
-    IMAGE_SELECTORS = [
-        "img.product-image",
-        "img.product-thumbnail",
-        "img.product-thumb",
-        ".product-image img",
-        "img[src*='product']",
-        "img[alt*='product']",
-    ]
+    producer.join()
+    return products, pages_scraped, error
 
-    # ===== NEW: SELLER/VENDOR SELECTORS =====
-    SELLER_SELECTORS = [
-        ".seller-name",
-        ".vendor-name",
-        ".store-name",
-        "[class*='seller']",
-        "[class*='vendor']",
-        "[class*='store']",
-    ]
 
-    # ===== NEW: RATING/REVIEW SELECTORS =====
-    RATING_SELECTORS = [
-        ".product-rating",
-        ".rating",
-        ".star-rating",
-        ".review-score",
-        "[class*='rating']",
-        "[class*='stars']",
-    ]
+# ========== NEW: EXCEL & CSV EXPORT FUNCTIONS ==========
 
-    # ===== NEW: UNITS SOLD / POPULARITY SELECTORS =====
-    SOLD_COUNT_SELECTORS = [
-        ".sold-count",
-        ".units-sold",
-        "[class*='sold']",
-        "[class*='purchased']",
-        ".popularity",
-        ".buy-count",
-    ]
+def output_paths(csv_filename: str = None, excel_filename: str = None):
+    """
+    Resolve the CSV / Excel output paths, defaulting to today's date-based names.
+    Returns: (csv_path, excel_path)
+    """
+    today_date = datetime.now().strftime("%Y%m%d")  # Format: 20251225
 
-    # ===== NEW: CONDITION SELECTORS =====
-    CONDITION_SELECTORS = [
-        ".condition",
-        ".product-condition",
-        "[class*='condition']",
-        "[class*='refurbish']",
-    ]
+    if csv_filename is None:
+        csv_filename = f"products_{today_date}.csv"
+    if excel_filename is None:
+        excel_filename = f"products_{today_date}.xlsx"
 
-    # ===== NEW: DELIVERY COST SELECTORS =====
-    # FIXED: Removed [class*='delivery'] and [class*='shipping']
-    # (moved to DELIVERY_INFO_SELECTORS to avoid duplication)
-    DELIVERY_SELECTORS = [
-        ".delivery-cost",
-        ".shipping-cost",
-        ".shipping-price",
-    ]
+    return path.join('scraped_data', csv_filename), path.join('scraped_data', excel_filename)
 
-    # ===== NEW: SELLER RATING SELECTORS =====
-    SELLER_RATING_SELECTORS = [
-        ".seller-rating",
-        ".seller-score",
-        ".store-rating",
-        "[class*='seller-rating']",
-        "[class*='positive']",
-    ]
 
-    # ===== NEW: ORIGINAL PRICE SELECTORS =====
-    ORIGINAL_PRICE_SELECTORS = [
-        ".original-price",
-        ".old-price",
-        ".rrp",
-        ".mrp-price",
-        "[class*='original-price']",
-        "[class*='mrp']",
-    ]
+def write_products_csv(products, csv_path: str):
+    """
+    Write products to CSV one row at a time (works with lists and with
+    generators such as iter_products(), so large pages never sit in memory).
+    Columns come from the first product. Same format as DataFrame.to_csv().
+    Returns: number of rows written
+    """
+    rows = iter(products)
+    first = next(rows, None)
+    count = 0
+    with io.open(csv_path, "w", encoding="utf-8", newline="") as f:
+        if first is None:
+            return 0
+        writer = csv.DictWriter(f, fieldnames=list(first.keys()), lineterminator=linesep,
+                                extrasaction="ignore")
+        writer.writeheader()
+        writer.writerow(first)
+        count = 1
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
 
-    # ===== NEW: DISCOUNT PERCENTAGE SELECTORS =====
-    DISCOUNT_PERCENTAGE_SELECTORS = [
-        ".discount-percentage",
-        ".discount-badge",
-        ".percent-off",
-        ".savings",
-        "[class*='discount-percent']",
-        "[class*='off']",
-    ]
 
-    # ===== NEW: STOCK COUNT SELECTORS =====
-    STOCK_COUNT_SELECTORS = [
-        ".stock-count",
-        ".quantity-left",
-        ".inventory-count",
-        ".units-left",
-        "[class*='stock-count']",
-        "[data-stock]",
-    ]
+def _excel_styles():
+    """Header / data cell formatting as named styles, registered once per workbook."""
+    border_style = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+    header = NamedStyle(name="product_header")
+    header.fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+    header.font = Font(bold=True, color="FFFFFF", size=11)
+    header.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+    header.border = border_style
 
-    # ===== NEW: CATEGORY SELECTORS =====
-    CATEGORY_SELECTORS = [
-        ".breadcrumb",
-        ".product-category",
-        ".category-tag",
-        "[class*='category']",
-        "[class*='breadcrumb']",
-    ]
+    cell = NamedStyle(name="product_cell")
+    cell.font = copy(DEFAULT_FONT)
+    cell.alignment = Alignment(horizontal="left", vertical="center", wrap_text=True)
+    cell.border = border_style
+    return header, cell
 
-    # ===== NEW: MERCHANT SELECTORS =====
-    MERCHANT_SELECTORS = [
-        ".seller-info",
-        ".merchant-name",
-        ".store-badge",
-        "[class*='seller-badge']",
-        "[class*='merchant']",
-    ]
 
-    # ===== NEW: DELIVERY INFO SELECTORS =====
-    # FIXED: Now includes [class*='delivery'] and [class*='shipping']
-    # (removed from DELIVERY_SELECTORS to avoid duplication)
-    DELIVERY_INFO_SELECTORS = [
-        ".delivery-info",
-        ".shipping-info",
-        ".delivery-date",
-        "[class*='delivery']",      # Moved here (was in DELIVERY_SELECTORS)
-        "[class*='shipping-date']",
-        "[class*='shipping']",      # Moved here (was in DELIVERY_SELECTORS)
-    ]
+def write_products_excel(products, excel_path: str):
+    """
+    Write products to a formatted Excel sheet with a write-only (streaming) workbook.
 
-    # ===== NEW: STOCK STATUS SELECTORS =====
-    STOCK_STATUS_SELECTORS = [
-        ".out-of-stock",
-        ".stock-status",
-        "[data-availability]",
-        "[class*='low-stock']",
-        "[class*='stock-status']",
-    ]
+    Rows go straight to the file instead of building every cell in memory.
+    Formatting is two named styles shared by all cells. Column widths
+    (longest value + 2, capped at 50) are measured in one pass before
+    writing, because a streaming sheet writes its column sizes first.
+    Returns: number of rows written
+    """
+    products = products if isinstance(products, list) else list(products)
+    headers = list(dict.fromkeys(key for product in products for key in product))
 
-    # ===== NEW: BADGE SELECTORS =====
-    BADGE_SELECTORS = [
-        ".badge",
-        ".product-badge",
-        ".hot-deal",
-        ".sale-badge",
-        ".new-product",
-        ".best-seller",
-        "[class*='badge']",
-        "[class*='label']",
-    ]
+    widths = []
+    for header in headers:
+        longest = max((len(str(product.get(header))) for product in products), default=0)
+        widths.append(min(max(longest, len(header)) + 2, 50))  # Cap at 50 characters
 
-    # ===== NEW: SKU SELECTORS =====
-    SKU_SELECTORS = [
-        ".product-sku",
-        ".sku",
-        "[data-product-id]",
-        "[data-sku]",
-        "[class*='sku']",
-    ]
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Products")
+    header_style, cell_style = _excel_styles()
+    wb.add_named_style(header_style)
+    wb.add_named_style(cell_style)
 
-    # ===== NEW: SPECS SELECTORS =====
-    SPECS_SELECTORS = [
-        ".specs",
-        ".highlights",
-        ".product-specs",
-        ".feature-list",
-        "[class*='spec']",
-    ]
+    for col_idx, width in enumerate(widths, 1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = width
+    ws.freeze_panes = "A2"
 
-    # ===== NEW: WARRANTY SELECTORS =====
-    WARRANTY_SELECTORS = [
-        ".warranty",
-        ".guarantee",
-        ".warranty-text",
-        "[class*='warranty']",
-        "[class*='guarantee']",
-    ]
+    def styled(value, style):
+        cell = WriteOnlyCell(ws, value=value)
+        cell.style = style  # registered named style (see _excel_styles())
+        return cell
 
-    # ===== EXTRACT PRODUCTS =====
-    for block in product_blocks:
-        title = extract_with_fallbacks(block, TITLE_SELECTORS)
-        price = extract_with_fallbacks(block, PRICE_SELECTORS)
-        availability = extract_with_fallbacks(block, AVAILABILITY_SELECTORS)
-        product_link = extract_with_fallbacks(block, LINK_SELECTORS, attr="href")
-        image_url = extract_with_fallbacks(block, IMAGE_SELECTORS, attr="src")
-        seller = extract_with_fallbacks(block, SELLER_SELECTORS)
-        rating = extract_with_fallbacks(block, RATING_SELECTORS)
-        sold_count = extract_with_fallbacks(block, SOLD_COUNT_SELECTORS)
-        condition = extract_with_fallbacks(block, CONDITION_SELECTORS)
-        delivery_cost = extract_with_fallbacks(block, DELIVERY_SELECTORS)
-        seller_rating = extract_with_fallbacks(block, SELLER_RATING_SELECTORS)
-        original_price = extract_with_fallbacks(block, ORIGINAL_PRICE_SELECTORS)
-        discount_in_percentage = extract_with_fallbacks(block, DISCOUNT_PERCENTAGE_SELECTORS)
-        stock_qty = extract_with_fallbacks(block, STOCK_COUNT_SELECTORS)
-        product_category = extract_with_fallbacks(block, CATEGORY_SELECTORS)
-        seller_info = extract_with_fallbacks(block, MERCHANT_SELECTORS)
-        delivery_info = extract_with_fallbacks(block, DELIVERY_INFO_SELECTORS)
-        stock_status = extract_with_fallbacks(block, STOCK_STATUS_SELECTORS)
-        badge = extract_with_fallbacks(block, BADGE_SELECTORS)
-        product_code = extract_with_fallbacks(block, SKU_SELECTORS)
-        specs = extract_with_fallbacks(block, SPECS_SELECTORS)
-        warranty = extract_with_fallbacks(block, WARRANTY_SELECTORS)
-
-        # Make relative links absolute
-        if product_link and product_link.startswith("/"):
-            # Detect domain from context
-            if "web-scraping.dev" in str(block):
-                product_link = "https://www.web-scraping.dev" + product_link
-            elif "flipkart" in str(block).lower():
-                product_link = "https://www.flipkart.com" + product_link
-            elif "walmart" in str(block).lower():
-                product_link = "https://www.walmart.com" + product_link
-            elif "ebay" in str(block).lower():
-                product_link = "https://www.ebay.com" + product_link
-
-        if image_url and image_url.startswith("/"):
-            # Similar domain detection for images
-            if "web-scraping.dev" in str(block):
-                image_url = "https://www.web-scraping.dev" + image_url
-            elif "flipkart" in str(block).lower():
-                image_url = "https://www.flipkart.com" + image_url
-            elif "walmart" in str(block).lower():
-                image_url = "https://www.walmart.com" + image_url
-            elif "ebay" in str(block).lower():
-                image_url = "https://www.ebay.com" + image_url
-
-        products.append(
-            {
-                "product_name": title,
-                "price": price,
-                "availability": availability,
-                "product_url": product_link,
-                "image_url": image_url,
-                "seller": seller,
-                "rating": rating,
-                "units_sold": sold_count,
-                "condition": condition,
-                "delivery_cost": delivery_cost,
-                "seller_rating": seller_rating,
-                "original_price": original_price,
-                "discount_in_percentage": discount_in_percentage,
-                "stock_qty": stock_qty,
-                "product_category": product_category,
-                "seller_info": seller_info,
-                "delivery_info": delivery_info,
-                "stock_status": stock_status,
-                "badge": badge,
-                "product_code": product_code,
-                "specs": specs,
-                "scraped_date": datetime.now().strftime("%Y-%m-%d"),
-                "scraped_time": datetime.now().strftime("%H:%M:%S"),
-            }
-        )
+    ws.append([styled(header, "product_header") for header in headers])
+    for product in products:
+        ws.append([styled(product.get(header), "product_cell") for header in headers])
 
-    return products
+    wb.save(excel_path)
+    return len(products)
 
-# ========== NEW: EXCEL & CSV EXPORT FUNCTIONS ==========
 
 def save_to_csv_and_excel(products, csv_filename: str = None, excel_filename: str = None):
     """
@@ -423,13 +2181,15 @@ def save_to_csv_and_excel(products, csv_filename: str = None, excel_filename: st
     - Creates 'scraped_data' directory if it doesn't exist
     
     Args:
-        products (list): List of product dictionaries
+        products (list or iterable): Product records, e.g. a list or iter_products()
         csv_filename (str): Optional custom CSV filename (default: auto-generated)
         excel_filename (str): Optional custom Excel filename (default: auto-generated)
     
     Returns:
         (success: bool, csv_path: str or None, excel_path: str or None, message: str)
     """
+    # CSV and Excel both read every row: materialize a generator (iter_products()) once
+    products = products if isinstance(products, list) else list(products)
     if not products:
         return False, None, None, "❌ No products to save."
 
@@ -438,75 +2198,17 @@ def save_to_csv_and_excel(products, csv_filename: str = None, excel_filename: st
         makedirs('scraped_data', exist_ok=True)
         
         # Generate date-based filenames if not provided
-        today_date = datetime.now().strftime("%Y%m%d")  # Format: 20251225
-        
-        if csv_filename is None:
-            csv_filename = f"products_{today_date}.csv"
-        if excel_filename is None:
-            excel_filename = f"products_{today_date}.xlsx"
-        
-        csv_path = path.join('scraped_data', csv_filename)
-        excel_path = path.join('scraped_data', excel_filename)
+        csv_path, excel_path = output_paths(csv_filename, excel_filename)
         
         # ===== SAVE TO CSV =====
-        df = pd.DataFrame(products)
-        df.to_csv(csv_path, index=False, encoding="utf-8")
+        write_products_csv(products, csv_path)
         print(f"✅ CSV saved: {csv_path}")
         
         # ===== SAVE TO EXCEL WITH FORMATTING =====
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Products"
-        
-        # Define styling
-        header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF", size=11)
-        header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-        
-        border_style = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-        
-        # Add headers
-        headers = df.columns.tolist()
-        for col_idx, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col_idx, value=header)
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = header_alignment
-            cell.border = border_style
-        
-        # Add data rows
-        for row_idx, row in enumerate(df.values, 2):
-            for col_idx, value in enumerate(row, 1):
-                cell = ws.cell(row=row_idx, column=col_idx, value=value)
-                cell.border = border_style
-                cell.alignment = Alignment(horizontal="left", vertical="center", wrap_text=True)
-        
-        # Auto-adjust column widths
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)  # Cap at 50 characters
-            ws.column_dimensions[column_letter].width = adjusted_width
-        
-        # Freeze header row
-        ws.freeze_panes = "A2"
-        
-        # Save Excel file
-        wb.save(excel_path)
+        write_products_excel(products, excel_path)
         print(f"✅ Excel saved: {excel_path}")
         
-        return True, csv_path, excel_path, f"✅ Saved {len(df)} products to both CSV and Excel"
+        return True, csv_path, excel_path, f"✅ Saved {len(products)} products to both CSV and Excel"
     
     except Exception as e:
         return False, None, None, f"❌ Error saving files: {str(e)}"
@@ -521,11 +2223,222 @@ def save_to_csv(products, filename: str):
     return success, message
 
 
+# ========== COLUMNAR EXPORT (PARQUET / FEATHER) ==========
+
+# "excel" writes CSV + Excel, "parquet" / "feather" one typed, compressed file,
+# "dataset" appends a segment to the partitioned dataset (see save_to_dataset())
+EXPORT_FORMATS = ("excel", "parquet", "feather", "dataset")
+COLUMNAR_EXTENSIONS = {"parquet": "parquet", "feather": "feather"}
+
+# Column types in the columnar files; columns not listed stay text
+DECIMAL_COLUMNS = ("price", "original_price")
+FLOAT_COLUMNS = ("rating", "seller_rating", "discount_in_percentage")
+INTEGER_COLUMNS = ("stock_qty",)
+DICTIONARY_COLUMNS = ("seller", "product_category", "availability", "condition", "stock_status", "badge")
+PRICE_TYPE = (18, 2)  # decimal precision, scale
+
+
+def decimal_array(numbers, precision=PRICE_TYPE[0], scale=PRICE_TYPE[1]):
+    """
+    Arrow decimal array from canonical number text (normalize.number_text()).
+    Fractions are rounded half-up to `scale` digits; values that do not fit
+    decimal(precision, scale) (e.g. a 20-digit model number picked up as the
+    price) become null instead of failing the whole export.
+    Returns: pyarrow.Array of decimal128(precision, scale)
+    """
+    numbers = pd.Series(numbers, dtype="string")
+    # One extra fraction digit is enough to round half-up
+    text = numbers.str.replace(r"(\.\d{%d})\d+$" % (scale + 1), r"\1", regex=True)
+    fits = text.str.fullmatch(r"\d{1,%d}(?:\.\d+)?" % (precision - scale)).fillna(False).astype(bool)
+    # Two spare digits: rounding keeps the wider scale and may carry (9.995 -> 10.000)
+    wide = pa.Array.from_pandas(text.where(fits), type=pa.string()).cast(pa.decimal128(precision + 2, scale + 1))
+    rounded = pc.round(wide, ndigits=scale, round_mode="half_up")
+    in_range = pc.less(rounded, pa.scalar(Decimal(10 ** (precision - scale)), rounded.type))
+    return pc.if_else(in_range, rounded, None).cast(pa.decimal128(precision, scale))
+
+
+def products_to_arrow(products):
+    """
+    Build a typed Arrow table from products.
+
+    price / original_price -> decimal(18, 2) plus a currency column, rating /
+    seller_rating / discount -> float64, stock_qty -> int64, scraped_date +
+    scraped_time -> one scraped_at timestamp, seller / category / other
+    repeated labels -> dictionary-encoded strings, everything else -> string.
+    Numbers are parsed with the normalize.py column parsers.
+    Returns: pyarrow.Table
+    """
+    products = products if isinstance(products, list) else list(products)
+    columns = list(dict.fromkeys(key for product in products for key in product))
+
+    arrays = {}
+    for column in columns:
+        if column in ("scraped_date", "scraped_time"):
+            continue
+        values = [product.get(column) for product in products]
+        if column in DECIMAL_COLUMNS:
+            arrays[column] = decimal_array(number_text(values))
+        elif column in FLOAT_COLUMNS:
+            arrays[column] = pa.Array.from_pandas(parse_numbers(values), type=pa.float64())
+        elif column in INTEGER_COLUMNS:
+            arrays[column] = pa.Array.from_pandas(parse_integers(values), type=pa.int64())
+        else:
+            text = pa.Array.from_pandas(pd.Series(values, dtype="string"), type=pa.string())
+            arrays[column] = text.dictionary_encode() if column in DICTIONARY_COLUMNS else text
+
+    if "price" in columns:
+        currency = parse_currency([product.get("price") for product in products])
+        arrays["currency"] = pa.Array.from_pandas(currency, type=pa.string()).dictionary_encode()
+
+    if "scraped_date" in columns:
+        stamps = pd.to_datetime(
+            pd.Series([product.get("scraped_date") for product in products], dtype="string") + " " +
+            pd.Series([product.get("scraped_time") for product in products], dtype="string"),
+            format="%Y-%m-%d %H:%M:%S", errors="coerce",
+        )
+        arrays["scraped_at"] = pa.Array.from_pandas(stamps, type=pa.timestamp("s"))
+
+    return pa.table(arrays)
+
+
+def columnar_path(filename: str = None, file_format: str = "parquet"):
+    """
+    Resolve the Parquet / Feather output path, defaulting to today's date-based name.
+    Returns: path under scraped_data/
+    """
+    if filename is None:
+        today_date = datetime.now().strftime("%Y%m%d")
+        filename = f"products_{today_date}.{COLUMNAR_EXTENSIONS[file_format]}"
+    return path.join('scraped_data', filename)
+
+
+def save_to_columnar(products, filename: str = None, file_format: str = "parquet"):
+    """
+    Save products to a typed, zstd-compressed Parquet or Feather (Arrow IPC) file.
+
+    Columnar files keep numeric types (see products_to_arrow()) and reload
+    much faster than CSV for analytics (pd.read_parquet / pd.read_feather).
+
+    Args:
+        products (list or iterable): Product records, e.g. a list or iter_products()
+        filename (str): Optional custom filename (default: products_yyyyMMdd.<format>)
+        file_format (str): "parquet" (default) or "feather"
+
+    Returns:
+        (success: bool, file_path: str or None, message: str)
+    """
+    products = products if isinstance(products, list) else list(products)
+    if not products:
+        return False, None, "❌ No products to save."
+    if file_format not in COLUMNAR_EXTENSIONS:
+        return False, None, f"❌ Unknown export format: {file_format}"
+    if not PYARROW_AVAILABLE:
+        return False, None, "❌ pyarrow is not installed (pip install pyarrow)"
+
+    try:
+        makedirs('scraped_data', exist_ok=True)
+        file_path = columnar_path(filename, file_format)
+        table = products_to_arrow(products)
+        if file_format == "parquet":
+            pq.write_table(table, file_path, compression="zstd")
+        else:
+            feather.write_feather(table, file_path, compression="zstd")
+        print(f"✅ {file_format.capitalize()} saved: {file_path}")
+        return True, file_path, f"✅ Saved {table.num_rows} products to {file_format.capitalize()}"
+    except Exception as e:
+        return False, None, f"❌ Error saving files: {str(e)}"
+
+
+_dataset = None
+
+
+def get_dataset():
+    """Return the shared append-only ProductDataset (created on first use)."""
+    global _dataset
+    if _dataset is None:
+        _dataset = ProductDataset()
+    return _dataset
+
+
+def save_to_dataset(products, url: str, job_name: str = None):
+    """
+    Append products as a new segment of the partitioned dataset
+    (scraped_data/dataset/date=.../site=.../job=.../part-....parquet).
+
+    Nothing is overwritten: every run adds its own segment, written to a temp
+    file and renamed into place, then recorded in the dataset manifest.
+    Segments are typed Parquet (like save_to_columnar()) when pyarrow is
+    installed, CSV otherwise.
+
+    Args:
+        products (list or iterable): Product records, e.g. a list or iter_products()
+        url (str): Scraped URL (its host is the site partition)
+        job_name (str): Job partition (default: "manual")
+
+    Returns:
+        (success: bool, file_path: str or None, message: str)
+    """
+    products = products if isinstance(products, list) else list(products)
+    if not products:
+        return False, None, "❌ No products to save."
+
+    try:
+        if PYARROW_AVAILABLE:
+            table = products_to_arrow(products)
+            extension = "parquet"
+
+            def write(file_path):
+                pq.write_table(table, file_path, compression="zstd")
+        else:
+            extension = "csv"
+
+            def write(file_path):
+                write_products_csv(products, file_path)
+
+        file_path = get_dataset().append(write, len(products), site_of(url), job_name, extension, url)
+        print(f"✅ Dataset segment saved: {file_path}")
+        return True, file_path, f"✅ Appended {len(products)} products to the dataset"
+    except Exception as e:
+        return False, None, f"❌ Error saving files: {str(e)}"
+
+
+def export_products(products, export_format: str = "excel", csv_filename: str = None,
+                    excel_filename: str = None, data_filename: str = None,
+                    url: str = None, job_name: str = None):
+    """
+    Save products in the chosen export format.
+    Returns: (success: bool, saved_files: dict of label -> path, message: str)
+    """
+    if export_format == "dataset":
+        success, file_path, message = save_to_dataset(products, url, job_name)
+        return success, {"Dataset": file_path} if success else {}, message
+    if export_format == "excel":
+        success, csv_path, excel_path, message = save_to_csv_and_excel(products, csv_filename, excel_filename)
+        return success, {"CSV": csv_path, "Excel": excel_path} if success else {}, message
+    success, file_path, message = save_to_columnar(products, data_filename, export_format)
+    return success, {export_format.capitalize(): file_path} if success else {}, message
+
+
+def export_paths(export_format: str = "excel", csv_filename: str = None,
+                 excel_filename: str = None, data_filename: str = None):
+    """Returns: tuple of the paths export_products() would write (empty for the append-only dataset)"""
+    if export_format == "dataset":
+        return ()
+    if export_format == "excel":
+        return output_paths(csv_filename, excel_filename)
+    return (columnar_path(data_filename, export_format),)
+
+
 # ========== MAIN SCRAPING FUNCTION ==========
 
-def scrape_and_save(url: str, custom_csv_filename: str = None, custom_excel_filename: str = None):
+def scrape_and_save(url: str, custom_csv_filename: str = None, custom_excel_filename: str = None,
+                    parser: str = "html.parser", use_http_cache: bool = True,
+                    use_result_cache: bool = True, max_pages: int = 1, max_products: int = None,
+                    export_format: str = "excel", custom_data_filename: str = None,
+                    job_name: str = None, use_price_history: bool = True,
+                    track_changes: bool = True, parse_workers: int = 0):
     """
-    Main function: fetch -> parse -> save to CSV & Excel.
+    Main function: fetch -> parse -> save to CSV & Excel (or Parquet / Feather).
     
     Automatically generates filenames with today's date (yyyyMMdd format).
     
@@ -533,50 +2446,147 @@ def scrape_and_save(url: str, custom_csv_filename: str = None, custom_excel_file
         url (str): URL to scrape
         custom_csv_filename (str): Optional custom CSV filename
         custom_excel_filename (str): Optional custom Excel filename
+        parser (str): "html.parser" (default) or "lxml" for the faster lxml backend
+        use_http_cache (bool): Send conditional requests and reuse cached products on 304
+        use_result_cache (bool): Skip parse and export when the page content is unchanged
+        max_pages (int): Follow "next page" links up to this many pages (1 = first page only)
+        max_products (int): Stop crawling pages once this many products were scraped
+        export_format (str): "excel" (CSV + Excel, default), "parquet", "feather"
+                             or "dataset" (append to the partitioned dataset)
+        custom_data_filename (str): Optional custom Parquet / Feather filename
+        job_name (str): Job partition for export_format="dataset"
+        use_price_history (bool): Record the products in the SQLite price history
+        track_changes (bool): Write a delta of added / removed / changed products
+                              against the previous scrape of this URL
+        parse_workers (int): Parse in a pool of this many processes (0 = in this process)
     
     Returns:
         (success: bool, message: str, dataframe: pd.DataFrame or None, product_count: int)
+        The DataFrame has the raw columns plus numeric ones from normalize_products()
+        (price_value, currency, rating_value, discount_pct, stock_qty_value, ...).
     """
     print(f"\n{'='*60}")
     print(f"🚀 Starting scrape for: {url}")
     print(f"{'='*60}\n")
     
-    # Step 1: Fetch
-    html, fetch_error = fetch_page(url)
-    if fetch_error:
-        error_msg = f"❌ Failed to fetch: {fetch_error}"
-        print(error_msg)
-        return False, error_msg, None, 0
+    if max_pages > 1:
+        # Paginated listing: fetch/parse pipeline, no per-page caching
+        print(f"📚 Crawling up to {max_pages} pages...")
+        products, pages_scraped, crawl_error = crawl_listing(url, max_pages, max_products, parser, parse_workers)
+        if not products:
+            error_msg = f"❌ Failed to fetch: {crawl_error}" if crawl_error else "❌ No products found on the page."
+            print(error_msg)
+            return False, error_msg, None, 0
+        result_cache = None
+        if use_price_history:
+            record_price_history(products, url)
+        delta = record_changes(products, url) if track_changes else None
+    else:
+        # Step 1: Polite delay (only if this host was hit recently)
+        delay = HOST_THROTTLE.wait(url)
+        if delay > 0:
+            print(f"⏳ Polite delay: {delay:.2f} seconds")
+
+        # Step 2: Fetch (conditional request if this URL is in the HTTP cache)
+        http_cache = get_http_cache() if use_http_cache else None
+        not_modified = False
+        if http_cache is not None:
+            html, fetch_error, not_modified, resp_headers = fetch_page_conditional(url, http_cache)
+        else:
+            html, fetch_error = fetch_page(url)
+        if fetch_error:
+            error_msg = f"❌ Failed to fetch: {fetch_error}"
+            print(error_msg)
+            return False, error_msg, None, 0
+
+        # Step 3: Parse (skipped when the page is unchanged: 304, or same content fingerprint)
+        result_cache = get_result_cache() if use_result_cache else None
+        version = parse_version(parser)
+        fingerprint = None
+        products = None
+        reused = from_http_cache = False
+        if not_modified:
+            products = http_cache.load_products(url, version)
+            if products is not None:
+                products = [Product(p) for p in products]
+            if products is None:
+                html = http_cache.load_body(url)
+            else:
+                print(f"♻️  Not modified (304), reusing {len(products)} cached products")
+                reused = from_http_cache = True
 
-    # Step 2: Polite delay
-    delay = uniform(*DELAY_RANGE)
-    print(f"⏳ Polite delay: {delay:.2f} seconds")
-    sleep(delay)
+        if result_cache is not None and html is not None:
+            fingerprint = fingerprint_html(html)
+            record = result_cache.lookup(url, fingerprint, version)
+            if record is not None:
+                products = [Product(p) for p in record["products"]]
+                print(f"♻️  Content unchanged since {record['stored_at']}, reusing {len(products)} products")
+                reused = True
 
-    # Step 3: Parse
-    print("🔍 Parsing products...")
-    products = parse_products(html)
+        if products is None:
+            print("🔍 Parsing products...")
+            if parse_workers:
+                products = parse_products_pooled(html or "", parser, url, parse_workers)
+            else:
+                products = parse_products(html or "", parser=parser, base_url=url)
+        else:
+            stamp_products(products)
+
+        # New validators are kept even when the products were reused (result cache
+        # hit), and a 304 whose cached products were stale stores the current ones
+        if http_cache is not None and products and html is not None and not from_http_cache:
+            http_cache.store(url, html, resp_headers, products, version, revalidated=not_modified)
     
-    if not products:
-        error_msg = "❌ No products found on the page."
-        print(error_msg)
-        return False, error_msg, None, 0
+        if not products:
+            error_msg = "❌ No products found on the page."
+            print(error_msg)
+            return False, error_msg, None, 0
+
+        if use_price_history:
+            record_price_history(products, url)
+        delta = record_changes(products, url) if track_changes else None
+
+        # Unchanged page whose files from the last run are still intact: nothing to rewrite
+        if reused and result_cache is not None:
+            record = result_cache.lookup(url, version=version)
+            expected_paths = export_paths(export_format, custom_csv_filename,
+                                          custom_excel_filename, custom_data_filename)
+            if expected_paths and record is not None and result_cache.files_current(record, expected_paths):
+                message = f"✅ Page unchanged, {len(products)} products already saved"
+                if delta is not None:
+                    message += f" | 🔄 {delta.describe()}"
+                print(message)
+                for file_path in expected_paths:
+                    print(f"   📁 {file_path}")
+                print(f"{'='*60}\n")
+                return True, message, normalize_products(products_to_dataframe(products)), len(products)
 
     print(f"✅ Found {len(products)} products\n")
 
-    # Step 4: Save to CSV and Excel
+    # Step 4: Save to CSV and Excel (or the chosen columnar format)
     print("💾 Saving data...")
-    success, csv_path, excel_path, save_msg = save_to_csv_and_excel(
-        products, 
-        custom_csv_filename, 
-        custom_excel_filename
+    success, saved_files, save_msg = export_products(
+        products,
+        export_format,
+        custom_csv_filename,
+        custom_excel_filename,
+        custom_data_filename,
+        url,
+        job_name
     )
     
     if success:
-        df = pd.DataFrame(products)
+        if delta is not None:
+            save_msg += f" | 🔄 {delta.describe()}"
+        if result_cache is not None:
+            if fingerprint is None:
+                body = html if html is not None else http_cache.load_body(url) if not_modified else None
+                fingerprint = fingerprint_html(body) if body else None
+            result_cache.store(url, fingerprint, products, tuple(saved_files.values()), version)
+        df = normalize_products(products_to_dataframe(products))
         print(f"\n{save_msg}")
-        print(f"   📁 CSV: {csv_path}")
-        print(f"   📁 Excel: {excel_path}")
+        for label, file_path in saved_files.items():
+            print(f"   📁 {label}: {file_path}")
         print(f"   📊 Total records: {len(df)}")
         print(f"{'='*60}\n")
         return True, save_msg, df, len(products)
@@ -584,6 +2594,165 @@ def scrape_and_save(url: str, custom_csv_filename: str = None, custom_excel_file
         print(f"\n{save_msg}")
         return False, save_msg, None, 0
 
+
+def _throttled_fetch(url: str):
+    HOST_THROTTLE.wait(url)
+    return fetch_page(url)
+
+
+def scrape_many(urls, concurrency: int = 4, custom_csv_filename: str = None,
+                custom_excel_filename: str = None, parser: str = "html.parser",
+                export_format: str = "excel", custom_data_filename: str = None,
+                job_name: str = None, use_price_history: bool = True,
+                track_changes: bool = True, parse_workers: int = 0):
+    """
+    Batch version of scrape_and_save(): fetch many pages concurrently, parse each
+    page as soon as it arrives (while other fetches are still in flight), then
+    save all products to one CSV & Excel file.
+
+    Politeness (HostThrottle's adaptive rate) is enforced per host, so different
+    stores are fetched in parallel while each single store still sees spaced requests.
+    URLs are taken from a URLFrontier, always from the host whose delay ends first.
+
+    Args:
+        urls (list or URLFrontier): URLs to scrape (duplicates, also with other
+                                    tracking parameters or fragments, are skipped)
+        concurrency (int): Maximum number of fetches in flight
+        custom_csv_filename (str): Optional custom CSV filename
+        custom_excel_filename (str): Optional custom Excel filename
+        parser (str): "html.parser" (default) or "lxml"
+        export_format (str): "excel" (CSV + Excel, default), "parquet", "feather"
+                             or "dataset" (one segment per URL, partitioned by site)
+        custom_data_filename (str): Optional custom Parquet / Feather filename
+        job_name (str): Job partition for export_format="dataset"
+        use_price_history (bool): Record the products in the SQLite price history
+        track_changes (bool): Write a delta per URL against its previous scrape
+        parse_workers (int): Parse pages in a pool of this many processes, several
+                             pages at once (0 = one after another in this process).
+                             At most 2 pages per worker wait for a parser; fetching
+                             pauses while they do.
+
+    Returns:
+        (success: bool, message: str, dataframe: pd.DataFrame or None, product_count: int)
+    """
+    if isinstance(urls, URLFrontier):
+        frontier = urls
+    else:
+        urls = list(urls)
+        frontier = URLFrontier.from_urls(urls)
+    total = len(frontier)
+    concurrency = max(1, concurrency)
+
+    print(f"\n{'='*60}")
+    print(f"🚀 Starting batch scrape: {total} URLs, concurrency={concurrency}")
+    print(f"{'='*60}\n")
+
+    results = {}
+    errors = {}
+
+    def add_result(url, products):
+        if not products:
+            errors[url] = "No products found on the page."
+            print(f"❌ No products found: {url}")
+            return
+        results[url] = products
+        print(f"✅ {len(products):>4} products from {url}")
+        if use_price_history:
+            record_price_history(products, url)
+        if track_changes:
+            record_changes(products, url)
+
+    parsing = {}        # parse future -> url (the page's HTML lives only in the worker)
+    max_parsing = 2 * parse_workers
+    refetched = set()
+    fetched = []
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        in_flight = {}
+        while frontier or in_flight or parsing:
+            # Keep the pool fed from the frontier (at most 2x concurrency queued),
+            # taking each URL from the host whose politeness delay ends first;
+            # paused while the parse pool is behind, so pages do not pile up in memory
+            while len(in_flight) < 2 * concurrency and (not parse_workers or len(parsing) < max_parsing):
+                url = frontier.pop(HOST_THROTTLE.ready_in)
+                if url is None:
+                    break
+                in_flight[pool.submit(_throttled_fetch, url)] = url
+                fetched.append(url)
+            if not in_flight and not parsing:
+                break
+
+            # Parse as pages complete, and record pages as their parse finishes;
+            # the pool keeps fetching meanwhile
+            done, _ = wait_futures(list(in_flight) + list(parsing), return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in parsing:
+                    url = parsing.pop(future)
+                    try:
+                        add_result(url, parse_result(future, None, parser, url))
+                    except BrokenProcessPool:
+                        if url in refetched:
+                            errors[url] = "Parse worker crashed"
+                            print(f"❌ Parse worker crashed on {url}")
+                        else:
+                            # The page was not kept: fetch it again for the new pool
+                            print(f"⚠️  Parse worker crashed, fetching {url} again")
+                            refetched.add(url)
+                            in_flight[pool.submit(_throttled_fetch, url)] = url
+                    continue
+
+                url = in_flight.pop(future)
+                html, fetch_error = future.result()
+                if fetch_error:
+                    errors[url] = fetch_error
+                    print(f"❌ Failed to fetch {url}: {fetch_error}")
+                elif parse_workers:
+                    # Hand the page to a parse process and go back to waiting
+                    parsing[submit_parse(html, parser, url, parse_workers)] = url
+                else:
+                    add_result(url, parse_products(html, parser=parser, base_url=url))
+
+    # Keep the caller's URL order in the output (fetch order for a URLFrontier)
+    order = fetched if isinstance(urls, URLFrontier) else [urldefrag(url.strip())[0] for url in urls]
+    order = [url for url in dict.fromkeys(order) if url in results]
+    products = [p for url in order for p in results[url]]
+    if not products:
+        error_msg = f"❌ No products scraped from {total} URLs."
+        print(error_msg)
+        return False, error_msg, None, 0
+
+    print("\n💾 Saving data...")
+    if export_format == "dataset":
+        # One segment per page, so every store lands in its own site partition
+        saved = [(url, save_to_dataset(results[url], url, job_name)) for url in order]
+        failed = [msg for _, (ok, _, msg) in saved if not ok]
+        success = not failed
+        saved_files = {url: file_path for url, (ok, file_path, _) in saved if ok}
+        save_msg = failed[0] if failed else f"✅ Appended {len(products)} products to the dataset"
+    else:
+        success, saved_files, save_msg = export_products(
+            products,
+            export_format,
+            custom_csv_filename,
+            custom_excel_filename,
+            custom_data_filename
+        )
+
+    if not success:
+        print(f"\n{save_msg}")
+        return False, save_msg, None, 0
+
+    message = f"{save_msg} ({len(results)}/{total} URLs succeeded)"
+    if errors:
+        message += " | Failed: " + "; ".join(f"{url}: {err}" for url, err in errors.items())
+
+    df = normalize_products(products_to_dataframe(products))
+    print(f"\n{message}")
+    for label, file_path in saved_files.items():
+        print(f"   📁 {label}: {file_path}")
+    print(f"{'='*60}\n")
+    return True, message, df, len(products)
+
+
 # --- CLI mode (if running scraper.py directly) ---
 if __name__ == "__main__":
     URL = "https://www.web-scraping.dev/products"
@@ -0,0 +1,86 @@
+import os
+import sys
+import hashlib
+from threading import Thread
+from urllib.parse import urlsplit
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+# The scraper modules live at the repository root (no package)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+ROBOTS_TXT = b"User-agent: *\nDisallow: /private/\n"
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Serves tests/fixtures/<name> with an ETag (revalidated with If-None-Match) and a robots.txt."""
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        self.server.requests.append(path)
+        if path == "/robots.txt":
+            return self._send(200, ROBOTS_TXT, "text/plain")
+        file_path = os.path.join(FIXTURES, os.path.basename(path))
+        if not os.path.isfile(file_path):
+            return self._send(404, b"not found", "text/plain")
+        with open(file_path, "rb") as f:
+            body = f.read()
+        etag = f'"{hashlib.sha1(body).hexdigest()[:12]}-{self.server.etag_version}"'
+        if self.headers.get("If-None-Match") == etag:
+            return self._send(304, b"", None, etag)
+        self._send(200, body, "text/html; charset=utf-8", etag)
+
+    def _send(self, status, body, content_type, etag=None):
+        self.send_response(status)
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.statuses.append(status)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def fixture_server():
+    """Local stand-in site on 127.0.0.1 (random port); server.url is its base URL."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    server.url = f"http://127.0.0.1:{server.server_port}"
+    server.etag_version = 1
+    server.requests = []
+    server.statuses = []
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def fast_throttle(monkeypatch):
+    """No politeness delay between requests to the local server."""
+    import scraper
+    monkeypatch.setattr(scraper, "HOST_THROTTLE", scraper.HostThrottle(start_rate=1000, max_rate=1000))
+
+
+@pytest.fixture
+def scrape_dir(tmp_path, monkeypatch):
+    """Run scrapes in a temporary directory with fresh caches."""
+    import scraper
+    from cache import HTTPCache, ResultCache
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(scraper, "_http_cache", HTTPCache(str(tmp_path / "cache")))
+    monkeypatch.setattr(scraper, "_result_cache", ResultCache(str(tmp_path / "cache")))
+    return tmp_path
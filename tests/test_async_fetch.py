@@ -0,0 +1,56 @@
+"""AsyncFetcher / async_fetch_page against a local http.server: the (html, error) contract."""
+import asyncio
+
+import pytest
+
+import scraper
+from conftest import read_fixture
+from robots import RobotsCache
+from scraper import AsyncFetcher, async_fetch_page
+
+pytestmark = pytest.mark.skipif(not scraper.HTTPX_AVAILABLE, reason="AsyncFetcher requires httpx")
+
+
+@pytest.fixture(autouse=True)
+def fresh_robots(monkeypatch):
+    monkeypatch.setattr(scraper, "_robots", RobotsCache(scraper.get_session, scraper.HEADERS["User-Agent"]))
+
+
+def test_async_fetch_page_ok(fixture_server, fast_throttle):
+    html, error = asyncio.run(async_fetch_page(f"{fixture_server.url}/ebay.html"))
+    assert error is None
+    assert html == read_fixture("ebay.html")
+
+
+def test_async_fetch_page_not_found(fixture_server, fast_throttle):
+    html, error = asyncio.run(async_fetch_page(f"{fixture_server.url}/missing.html"))
+    assert html is None
+    assert "404" in error
+
+
+def test_async_fetch_page_blocked_by_robots(fixture_server, fast_throttle):
+    html, error = asyncio.run(async_fetch_page(f"{fixture_server.url}/private/ebay.html"))
+    assert html is None
+    assert error.startswith("Blocked by robots.txt")
+    assert "/private/ebay.html" not in fixture_server.requests
+
+
+def test_fetch_all(fixture_server, fast_throttle):
+    ok, missing, blocked = (f"{fixture_server.url}/{path}" for path in
+                            ("walmart.html", "missing.html", "private/walmart.html"))
+
+    async def fetch():
+        async with AsyncFetcher(max_per_host=2) as fetcher:
+            # Duplicates are fetched once; a shared fetcher also serves async_fetch_page()
+            results = await fetcher.fetch_all([ok, missing, blocked, ok])
+            again = await async_fetch_page(ok, fetcher)
+        return results, again
+
+    results, again = asyncio.run(fetch())
+    assert list(results) == [ok, missing, blocked]
+    assert results[ok] == (read_fixture("walmart.html"), None)
+    assert results[missing][0] is None and "404" in results[missing][1]
+    assert results[blocked][0] is None and results[blocked][1].startswith("Blocked by robots.txt")
+    assert again == results[ok]
+    assert fixture_server.requests.count("/walmart.html") == 2
+    assert "/private/walmart.html" not in fixture_server.requests
@@ -0,0 +1,109 @@
+"""Result / HTTP caches: unchanged pages are reused, but never across parse versions."""
+
+import scraper
+from cache import ResultCache, fingerprint_html
+from scraper import ExtractionPlan, PRODUCT_FIELDS, parse_version
+
+
+def scrape(url, **kwargs):
+    kwargs.setdefault("export_format", "parquet")
+    return scraper.scrape_and_save(url, use_price_history=False, track_changes=False, **kwargs)
+
+
+def test_fingerprint_ignores_volatile_parts():
+    page = "<div class='product'>Box</div><script>var nonce='{}';</script><!-- {} -->"
+    assert fingerprint_html(page.format("a", 1)) == fingerprint_html(page.format("b", 2))
+    assert fingerprint_html(page.format("a", 1)) != fingerprint_html(page.replace("Box", "Bag").format("a", 1))
+
+
+def test_parse_version_changes_with_selectors_and_parser():
+    edited = ExtractionPlan(fields=[
+        (name, selectors[1:] if name == "price" else selectors, attr) for name, selectors, attr in PRODUCT_FIELDS
+    ])
+    assert ExtractionPlan().version == scraper.DEFAULT_PLAN.version
+    assert edited.version != scraper.DEFAULT_PLAN.version
+    assert parse_version("lxml") != parse_version("html.parser")
+
+
+def test_result_cache_lookup_checks_version(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    cache.store("https://shop.example/", "fp", [{"price": "$1"}], version="v1")
+    assert cache.lookup("https://shop.example/", "fp", "v1")["products"] == [{"price": "$1"}]
+    assert cache.lookup("https://shop.example/", "fp", "v2") is None
+    assert cache.lookup("https://shop.example/", "other", "v1") is None
+
+
+def test_selector_edit_reparses_unchanged_page(fixture_server, fast_throttle, scrape_dir, monkeypatch, capsys):
+    url = fixture_server.url + "/web-scraping-dev.html"
+    success, _, df, _ = scrape(url, use_http_cache=False)
+    assert success and df["price"].notna().all()
+
+    scrape(url, use_http_cache=False)
+    assert "Content unchanged" in capsys.readouterr().out
+
+    # Someone edits the selectors: the same page must be parsed (and saved) again
+    monkeypatch.setattr(scraper, "DEFAULT_PLAN", ExtractionPlan(fields=[
+        (name, [".no-such-price"] if name == "price" else selectors, attr)
+        for name, selectors, attr in PRODUCT_FIELDS
+    ]))
+    success, _, df, _ = scrape(url, use_http_cache=False)
+    out = capsys.readouterr().out
+    assert success and "Content unchanged" not in out and "Parsing products" in out
+    assert df["price"].isna().all()
+
+
+def test_parser_switch_reparses_unchanged_page(fixture_server, fast_throttle, scrape_dir, capsys):
+    url = fixture_server.url + "/web-scraping-dev.html"
+    scrape(url, use_http_cache=False)
+    capsys.readouterr()
+    scrape(url, use_http_cache=False, parser="lxml")
+    assert "Parsing products" in capsys.readouterr().out
+    scrape(url, use_http_cache=False, parser="lxml")
+    assert "Content unchanged" in capsys.readouterr().out
+
+
+def test_http_cache_load_products_checks_version(tmp_path):
+    from cache import HTTPCache
+    cache = HTTPCache(str(tmp_path))
+    assert cache.store("https://shop.example/", "<html></html>", {"ETag": '"a"'}, [{"price": "$1"}], "v1")
+    assert cache.load_products("https://shop.example/", "v1") == [{"price": "$1"}]
+    assert cache.load_products("https://shop.example/", "v2") is None
+
+    # A 304 without validators keeps the ones already cached
+    assert cache.store("https://shop.example/", "<html></html>", {}, [{"price": "$2"}], "v2", revalidated=True)
+    assert cache.conditional_headers("https://shop.example/") == {"If-None-Match": '"a"'}
+
+
+def test_304_with_stale_products_reparses_cached_body(fixture_server, fast_throttle, scrape_dir,
+                                                      monkeypatch, capsys):
+    url = fixture_server.url + "/web-scraping-dev.html"
+    scrape(url, use_result_cache=False)
+    scrape(url, use_result_cache=False)
+    assert fixture_server.statuses[-1] == 304
+    assert "Not modified (304), reusing" in capsys.readouterr().out
+
+    monkeypatch.setattr(scraper, "DEFAULT_PLAN", ExtractionPlan(fields=[
+        (name, [".no-such-price"] if name == "price" else selectors, attr)
+        for name, selectors, attr in PRODUCT_FIELDS
+    ]))
+    success, _, df, _ = scrape(url, use_result_cache=False)
+    assert fixture_server.statuses[-1] == 304
+    assert success and "Parsing products" in capsys.readouterr().out
+    assert df["price"].isna().all()
+
+    # The re-parsed products replaced the stale ones
+    scrape(url, use_result_cache=False)
+    assert "Not modified (304), reusing" in capsys.readouterr().out
+
+
+def test_new_validators_saved_on_result_cache_hit(fixture_server, fast_throttle, scrape_dir, capsys):
+    url = fixture_server.url + "/web-scraping-dev.html"
+    scrape(url)
+    fixture_server.etag_version = 2      # same content, new ETag: answered with 200
+    scrape(url)
+    assert fixture_server.statuses[-1] == 200
+    assert "Content unchanged" in capsys.readouterr().out
+    assert scraper.get_http_cache().lookup(url)["etag"].endswith('-2"')
+
+    scrape(url)
+    assert fixture_server.statuses[-1] == 304
@@ -0,0 +1,53 @@
+"""Change detection: diff_products against the previous snapshot of a URL."""
+from delta import diff_products
+from scraper import Product
+
+URL = "https://example.com/laptops"
+
+
+def product(code, price, **fields):
+    return {"product_code": code, "product_name": f"Laptop {code}", "price": price, **fields}
+
+
+def test_first_snapshot_is_all_added():
+    delta, snapshot = diff_products({}, [product("A1", "$999"), product("B2", "$499")], URL)
+    assert [entry["product"]["product_code"] for entry in delta.added] == ["A1", "B2"]
+    assert delta.describe() == "first snapshot, 2 products"
+    assert set(snapshot) == {"example.com|code|A1", "example.com|code|B2"}
+
+
+def test_added_removed_changed_unchanged():
+    _, previous = diff_products({}, [
+        product("A1", "$999", availability="In stock"),
+        product("B2", "$499"),
+        product("C3", "$199"),
+    ], URL)
+    delta, snapshot = diff_products(previous, [
+        product("A1", "$899", availability="In stock"),   # price drop
+        product("B2", "$499", rating="4.5"),               # untracked field only
+        product("D4", "$59"),
+    ], URL, previous_at="2025-12-25 09:00:00")
+
+    assert delta
+    assert delta.summary() == {"added": 1, "removed": 1, "changed": 1, "unchanged": 1}
+    assert delta.changed[0]["product_id"] == "example.com|code|A1"
+    assert delta.changed[0]["changes"] == {"price": ["$999", "$899"]}
+    assert delta.added[0]["product"]["product_code"] == "D4"
+    assert delta.removed[0]["product"]["product_code"] == "C3"
+    assert delta.describe() == "1 added, 1 removed, 1 changed, 1 unchanged"
+    assert delta.to_dict()["previous_at"] == "2025-12-25 09:00:00"
+    assert "example.com|code|C3" not in snapshot
+
+
+def test_no_changes_and_products_without_identity():
+    _, previous = diff_products({}, [product("A1", "$999")], URL)
+    delta, _ = diff_products(previous, [product("A1", "$999"), {"price": "$5"}], URL, "2025-12-25")
+    assert not delta
+    assert delta.summary() == {"added": 0, "removed": 0, "changed": 0, "unchanged": 1}
+
+
+def test_product_records_and_dicts_diff_the_same():
+    rows = [product("A1", "$999", availability="In stock")]
+    _, from_dicts = diff_products({}, rows, URL)
+    _, from_products = diff_products({}, [Product(row) for row in rows], URL)
+    assert from_products == from_dicts
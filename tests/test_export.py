@@ -0,0 +1,74 @@
+"""Typed columnar export: decimal prices that do not fit are nulled instead of failing the export."""
+from decimal import Decimal
+
+import scraper
+from dataset import ProductDataset
+from scraper import decimal_array, products_to_arrow, save_to_dataset
+
+PRODUCTS = [
+    {"product_name": "Dash cam", "price": "$1,299.00", "original_price": "$1,499.995"},
+    {"product_name": "Model 12345678901234567890", "price": "Model 12345678901234567890", "original_price": None},
+    {"product_name": "Sticker", "price": "$.99", "original_price": "0.125"},
+]
+
+
+def test_decimal_array_rounds_and_nulls_overflow():
+    values = decimal_array(["1299.00", "0.125", "9.995", "12345678901234567890", "9999999999999999.995", None])
+    assert values.to_pylist() == [
+        Decimal("1299.00"), Decimal("0.13"), Decimal("10.00"), None, None, None,
+    ]
+    assert str(values.type) == "decimal128(18, 2)"
+
+
+def test_products_to_arrow_keeps_rows_with_oversized_prices():
+    table = products_to_arrow(PRODUCTS)
+    assert table.column("price").to_pylist() == [Decimal("1299.00"), None, Decimal("0.99")]
+    assert table.column("original_price").to_pylist() == [Decimal("1500.00"), None, Decimal("0.13")]
+    assert table.column("product_name").to_pylist()[1] == "Model 12345678901234567890"
+
+
+def test_dataset_export_with_oversized_price(tmp_path, monkeypatch):
+    monkeypatch.setattr(scraper, "_dataset", ProductDataset(str(tmp_path / "dataset")))
+    success, file_path, message = save_to_dataset(PRODUCTS, "https://example.com/products", "test")
+    assert success, message
+    df = scraper.get_dataset().read(site="example.com")
+    assert len(df) == 3
+    assert df["price"].isna().tolist() == [False, True, False]
+
+
+def test_write_products_excel_uses_named_styles(tmp_path):
+    from openpyxl import load_workbook
+    from scraper import write_products_excel
+
+    path = str(tmp_path / "products.xlsx")
+    assert write_products_excel(PRODUCTS, path) == 3
+    ws = load_workbook(path)["Products"]
+    assert [cell.value for cell in ws[1]] == ["product_name", "price", "original_price"]
+    assert {cell.style for cell in ws[1]} == {"product_header"}
+    assert {cell.style for row in ws.iter_rows(min_row=2) for cell in row} == {"product_cell"}
+    assert ws["A1"].font.bold
+    assert ws["B2"].value == "$1,299.00"
+    assert ws.freeze_panes == "A2"
+
+
+def test_save_to_csv_and_excel_accepts_iter_products(tmp_path, monkeypatch):
+    import pandas as pd
+    from openpyxl import load_workbook
+    from conftest import read_fixture
+    from scraper import iter_products, parse_products, save_to_csv_and_excel
+
+    monkeypatch.chdir(tmp_path)
+    html = read_fixture("ebay.html")
+    expected = len(parse_products(html))
+    success, csv_path, excel_path, message = save_to_csv_and_excel(iter_products(html), "items.csv", "items.xlsx")
+    assert success, message
+    assert message == f"✅ Saved {expected} products to both CSV and Excel"
+    assert len(pd.read_csv(csv_path)) == expected
+    assert load_workbook(excel_path)["Products"].max_row == expected + 1
+
+
+def test_save_to_csv_and_excel_empty_generator(tmp_path, monkeypatch):
+    from scraper import save_to_csv_and_excel
+
+    monkeypatch.chdir(tmp_path)
+    assert save_to_csv_and_excel(iter([])) == (False, None, None, "❌ No products to save.")
@@ -0,0 +1,135 @@
+"""URL frontier: dedup, per-domain priority queues, pop order and sitemap streaming."""
+import gc
+import gzip
+import io
+import tracemalloc
+import warnings
+
+from frontier import URLFrontier, iter_sitemap
+
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+
+def sitemap_xml(urls):
+    entries = "".join(f"<url><loc>{url}</loc><lastmod>2025-12-26</lastmod></url>" for url in urls)
+    return f'<?xml version="1.0" encoding="UTF-8"?><urlset xmlns="{SITEMAP_NS}">{entries}</urlset>'.encode()
+
+
+def test_iter_sitemap_plain_and_gzipped(tmp_path):
+    urls = [f"https://example.com/p/{i}" for i in range(5)]
+    plain = tmp_path / "sitemap.xml"
+    plain.write_bytes(sitemap_xml(urls))
+    gzipped = tmp_path / "sitemap.xml.gz"
+    gzipped.write_bytes(gzip.compress(sitemap_xml(urls)))
+
+    expected = [("url", url) for url in urls]
+    assert list(iter_sitemap(str(plain))) == expected
+    assert list(iter_sitemap(str(gzipped))) == expected
+
+
+def test_iter_sitemap_index():
+    index = (
+        f'<sitemapindex xmlns="{SITEMAP_NS}">'
+        "<sitemap><loc> https://example.com/sitemap-1.xml.gz </loc></sitemap>"
+        "<sitemap><loc></loc></sitemap>"
+        "</sitemapindex>"
+    ).encode()
+    assert list(iter_sitemap(io.BytesIO(index))) == [("sitemap", "https://example.com/sitemap-1.xml.gz")]
+
+
+def test_gzipped_path_is_closed(tmp_path):
+    path = tmp_path / "sitemap.xml.gz"
+    path.write_bytes(gzip.compress(sitemap_xml(["https://example.com/a"])))
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", ResourceWarning)
+        assert len(list(iter_sitemap(str(path)))) == 1
+        # Stopping early closes the files too
+        entries = iter_sitemap(str(path))
+        next(entries)
+        entries.close()
+        gc.collect()
+
+
+def test_file_object_is_left_open():
+    f = io.BytesIO(sitemap_xml(["https://example.com/a"]))
+    list(iter_sitemap(f))
+    assert not f.closed
+
+
+def test_finished_entries_are_released(tmp_path):
+    path = tmp_path / "sitemap.xml.gz"
+    path.write_bytes(gzip.compress(sitemap_xml(f"https://example.com/p/{i}" for i in range(50_000))))
+    tracemalloc.start()
+    try:
+        count = sum(1 for _ in iter_sitemap(str(path)))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert count == 50_000
+    # Kept attached to the root, 50k cleared <url> elements alone take several MB
+    assert peak < 2_000_000
+
+
+def test_dedup_on_canonical_url():
+    frontier = URLFrontier()
+    assert frontier.add("https://www.example.com/p/1?utm_source=mail#reviews")
+    assert not frontier.add("http://example.com/p/1/")
+    assert not frontier.add("https://example.com/p/1?utm_campaign=x")
+    assert frontier.add("https://example.com/p/1?color=red")
+    assert not frontier.add("   ")
+    assert len(frontier) == 2
+    assert "https://example.com/p/1" in frontier
+    # A popped URL is still known: it is not queued again
+    frontier.pop()
+    assert not frontier.add("https://example.com/p/1")
+
+
+def test_priority_within_a_domain():
+    frontier = URLFrontier(priority_rules=[(r"/laptops", 10), (r"/sale", 5)])
+    frontier.add_many([
+        "https://example.com/misc/1",
+        "https://example.com/sale/1",
+        "https://example.com/laptops/1",
+        "https://example.com/misc/2",
+    ])
+    frontier.add("https://example.com/urgent", priority=20)
+    assert list(frontier.drain()) == [
+        "https://example.com/urgent",
+        "https://example.com/laptops/1",
+        "https://example.com/sale/1",
+        "https://example.com/misc/1",
+        "https://example.com/misc/2",
+    ]
+    assert len(frontier) == 0
+    assert frontier.pop() is None
+
+
+def test_domains_take_turns():
+    frontier = URLFrontier.from_urls([
+        "https://a.com/1", "https://a.com/2", "https://a.com/3", "https://b.com/1", "https://b.com/2",
+    ])
+    assert frontier.domains() == {"a.com": 3, "b.com": 2}
+    assert [frontier.pop() for _ in range(5)] == [
+        "https://a.com/1", "https://b.com/1", "https://a.com/2", "https://b.com/2", "https://a.com/3",
+    ]
+    assert frontier.domains() == {}
+
+
+def test_pop_prefers_the_domain_that_is_ready():
+    frontier = URLFrontier.from_urls(["https://slow.com/1", "https://fast.com/1"])
+    waits = {"slow.com": 30, "fast.com": 0}
+    assert frontier.pop(lambda domain: waits[domain]) == "https://fast.com/1"
+    # Only a waiting domain is left: it is still returned (the caller waits for it)
+    assert frontier.pop(lambda domain: waits[domain]) == "https://slow.com/1"
+
+
+def test_add_file_and_sitemap(tmp_path):
+    urls_file = tmp_path / "urls.txt"
+    urls_file.write_text("# comment\nhttps://example.com/a\n\nhttps://example.com/a#top\nhttps://example.com/b\n")
+    sitemap = tmp_path / "sitemap.xml"
+    sitemap.write_bytes(sitemap_xml(["https://example.com/b", "https://example.com/c"]))
+
+    frontier = URLFrontier()
+    assert frontier.add_file(str(urls_file)) == 2
+    assert frontier.add_sitemap(str(sitemap)) == (1, [])
+    assert len(frontier) == 3
@@ -0,0 +1,74 @@
+"""SQLite job queue: leases, expiry and fencing of stale workers."""
+import pytest
+
+from jobqueue import JobQueue, SQLiteJobQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return SQLiteJobQueue(str(tmp_path / "jobs.db"))
+
+
+def test_enqueue_is_idempotent_per_job_key(queue):
+    job_id, created = queue.enqueue("https://example.com/a", name="A", job_key="A|2025-12-26 09:00")
+    assert created
+    assert queue.enqueue("https://example.com/a", name="A", job_key="A|2025-12-26 09:00") == (job_id, False)
+    assert queue.stats() == {"queued": 1}
+
+
+def test_a_leased_job_is_not_leased_twice(queue):
+    queue.enqueue("https://example.com/a", params={"max_pages": 2})
+    job = queue.lease("worker-1")
+    assert job["params"] == {"max_pages": 2}
+    assert job["attempts"] == 1
+    assert queue.lease("worker-2") is None
+    assert queue.heartbeat(job["id"], job["lease_token"])
+
+
+def test_expired_lease_fences_the_old_worker(queue):
+    queue.enqueue("https://example.com/a")
+    stale = queue.lease("worker-1", lease_seconds=-1)   # lease already expired
+    job = queue.lease("worker-2")
+    assert job["id"] == stale["id"]
+    assert job["attempts"] == 2
+    assert job["lease_token"] != stale["lease_token"]
+
+    # The worker that lost its lease can no longer touch the job
+    assert not queue.heartbeat(stale["id"], stale["lease_token"])
+    assert not queue.complete(stale["id"], stale["lease_token"], {"count": 1})
+    assert queue.fail(stale["id"], stale["lease_token"], "boom") is None
+
+    assert queue.complete(job["id"], job["lease_token"], {"count": 5})
+    # Completing again with the same lease is a no-op that still reports success
+    assert queue.complete(job["id"], job["lease_token"], {"count": 5})
+    assert not queue.complete(stale["id"], stale["lease_token"], {"count": 1})
+    assert queue.stats() == {"done": 1}
+
+
+def test_fail_retries_with_backoff_then_gives_up(queue):
+    queue.enqueue("https://example.com/a", max_attempts=2)
+    job = queue.lease("worker-1")
+    assert queue.fail(job["id"], job["lease_token"], "timeout") == "queued"
+    assert queue.lease("worker-1") is None   # waiting out its backoff
+    assert queue.stats() == {"queued": 1}
+
+    queue.enqueue("https://example.com/b", max_attempts=1)
+    job = queue.lease("worker-1")
+    assert job["url"] == "https://example.com/b"
+    assert queue.fail(job["id"], job["lease_token"], "timeout") == "failed"
+
+
+def test_lease_expired_on_last_attempt_fails_the_job(queue):
+    queue.enqueue("https://example.com/a", max_attempts=1)
+    queue.lease("worker-1", lease_seconds=-1)
+    assert queue.lease("worker-2") is None
+    assert queue.stats() == {"failed": 1}
+
+
+def test_incomplete_backend_fails_at_instantiation():
+    class PartialQueue(JobQueue):
+        def enqueue(self, url, name=None, params=None, job_key=None, max_attempts=3, delay=0):
+            return 1, True
+
+    with pytest.raises(TypeError):
+        PartialQueue()
@@ -0,0 +1,60 @@
+"""
+A layout learned on one page must never change what later pages of the same
+store extract: parse_products() with a warm plan == full detection.
+"""
+
+import pytest
+
+from conftest import read_fixture
+from scraper import ExtractionPlan, parse_products
+from test_parser_parity import FIXTURE_PAGES, comparable
+
+BASE_URL = "https://web-scraping.dev/products?page={}"
+
+
+@pytest.mark.parametrize("name", FIXTURE_PAGES)
+@pytest.mark.parametrize("parser", ["html.parser", "lxml"])
+def test_cached_layout_matches_full_detection(name, parser):
+    html = read_fixture(name)
+    plan = ExtractionPlan()
+    first = parse_products(html, plan=plan, parser=parser, base_url=BASE_URL.format(1))
+    assert len(plan.layouts._layouts) == 1
+    again = parse_products(html, plan=plan, parser=parser, base_url=BASE_URL.format(1))
+    assert comparable(again) == comparable(first)
+
+
+def test_new_field_selector_on_later_page_is_used():
+    page_1 = read_fixture("web-scraping-dev.html")
+    title = '<h3><a href="https://www.web-scraping.dev/product/3">Box of Chocolate Candy 3</a></h3>'
+    assert title in page_1
+    page_2 = page_1.replace(
+        title,
+        '<h3 class="product-name"><a href="https://www.web-scraping.dev/product/3">Special</a></h3>'
+        '<span class="product-price">$1</span>',
+    )
+
+    plan = ExtractionPlan()
+    parse_products(page_1, plan=plan, base_url=BASE_URL.format(1))
+    cached = parse_products(page_2, plan=plan, base_url=BASE_URL.format(2))
+    full = parse_products(page_2, plan=ExtractionPlan(), base_url=BASE_URL.format(2))
+
+    assert (cached[2]["product_name"], cached[2]["price"]) == ("Special", "$1")
+    assert comparable(cached) == comparable(full)
+
+
+def test_block_selector_change_is_detected():
+    plan = ExtractionPlan()
+    # The "product-card" token is on both pages, so they share one signature
+    page_1 = read_fixture("walmart.html").replace("<main>", "<main><!-- product-card -->")
+    parse_products(page_1, plan=plan, base_url=BASE_URL.format(1))
+    (layout,) = plan.layouts._layouts.values()
+    assert layout.selector == "div[data-automation-id*='product']"
+
+    # An earlier block selector (.product-card) matches on page 2
+    page_2 = page_1.replace('class="mb1 ph1"', 'class="mb1 ph1 product-card"')
+    cached = parse_products(page_2, plan=plan, base_url=BASE_URL.format(2))
+    full = parse_products(page_2, plan=ExtractionPlan(), base_url=BASE_URL.format(2))
+    assert comparable(cached) == comparable(full)
+    assert len(cached) == 5
+    (layout,) = plan.layouts._layouts.values()
+    assert layout.selector == ".product-card"
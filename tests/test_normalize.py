@@ -0,0 +1,71 @@
+"""Number parsing in normalize.py: decimal vs thousands separators across locales."""
+import pandas as pd
+import pytest
+
+from normalize import number_text, parse_numbers, parse_currency, normalize_products
+
+
+@pytest.mark.parametrize("text, expected", [
+    # Bare fraction and 3-digit decimals without a leading group
+    ("$.99", 0.99),
+    (",5 €", 0.5),
+    ("0.125", 0.125),
+    ("0,125 kg", 0.125),
+    ("1234.567", 1234.567),
+    # US / UK
+    ("$1,299.00", 1299.0),
+    ("1,299", 1299.0),
+    ("1,299.5", 1299.5),
+    ("$12.99", 12.99),
+    # Indian grouping
+    ("₹40,000", 40000.0),
+    ("₹1,23,456", 123456.0),
+    ("Rs. 12,34,567.50", 1234567.5),
+    # EU
+    ("1.299,00 €", 1299.0),
+    ("1.234.567", 1234567.0),
+    ("0,99 €", 0.99),
+    # Space and apostrophe grouping
+    ("1 299,50 €", 1299.5),
+    ("1 234 567", 1234567.0),
+    ("CHF 1'299.90", 1299.9),
+    # Other fields
+    ("4.5 out of 5", 4.5),
+    ("20% off", 20.0),
+    ("Only 3 left", 3.0),
+])
+def test_parse_numbers(text, expected):
+    assert parse_numbers([text])[0] == pytest.approx(expected)
+
+
+def test_missing_numbers_are_na():
+    parsed = parse_numbers(["no price", None, ""])
+    assert parsed.isna().all()
+
+
+def test_number_text_is_canonical():
+    assert list(number_text(["$.99", "1.299,00 €", "₹1,23,456"])) == ["0.99", "1299.00", "123456"]
+
+
+def test_parse_currency():
+    assert list(parse_currency(["₹40,000", "US $12", "12,00 €", "$5", "Rs. 99", "1299"])) == [
+        "INR", "USD", "EUR", "USD", "INR", pd.NA,
+    ]
+
+
+def test_normalize_products_adds_numeric_columns():
+    df = pd.DataFrame({
+        "price": ["$1,299.00", "$.99"],
+        "original_price": ["$1,499.00", None],
+        "rating": ["4.5 out of 5", None],
+        "stock_qty": ["Only 3 left", "In stock"],
+    })
+    out = normalize_products(df)
+    assert list(out["price_value"]) == [1299.0, 0.99]
+    assert out["original_price_value"][0] == 1499.0
+    assert list(out["currency"]) == ["USD", "USD"]
+    assert out["rating_value"][0] == 4.5
+    assert out["stock_qty_value"][0] == 3
+    assert out["stock_qty_value"].isna()[1]
+    # Raw text columns are kept unchanged
+    assert list(out["price"]) == ["$1,299.00", "$.99"]
@@ -0,0 +1,49 @@
+"""find_next_page(): the next listing page, never a product page that says "next"."""
+
+import pytest
+
+from conftest import read_fixture
+from scraper import find_next_page
+
+LISTING = "https://shop.example/search?q=dashcam"
+
+
+@pytest.mark.parametrize("name, url, expected", [
+    ("ebay.html", "https://www.ebay.com/sch/i.html?_nkw=laptop",
+     "https://www.ebay.com/sch/i.html?_nkw=laptop&_pgn=2"),
+    ("flipkart.html", "https://www.flipkart.com/search?q=laptop",
+     "https://www.flipkart.com/search?q=laptop&page=2"),
+    ("walmart.html", "https://www.walmart.com/search?q=laptop",
+     "https://www.walmart.com/search?q=laptop&page=2"),
+    ("web-scraping-dev.html", "https://www.web-scraping.dev/products",
+     "https://www.web-scraping.dev/products?page=2"),
+])
+def test_fixture_next_links(name, url, expected):
+    assert find_next_page(read_fixture(name), url) == expected
+
+
+@pytest.mark.parametrize("product_link", [
+    '<a title="Nextbase 622GW" href="/p/nextbase-dashcam">Nextbase 622GW</a>',
+    '<a aria-label="Next image" href="/p/1">›</a>',
+])
+def test_product_links_mentioning_next_are_skipped(product_link):
+    html = product_link + '<a href="/search?q=dashcam&page=2">2</a>'
+    assert find_next_page(html, LISTING) == "https://shop.example/search?q=dashcam&page=2"
+    assert find_next_page(product_link, LISTING) is None
+
+
+@pytest.mark.parametrize("html, expected", [
+    ('<link rel="next" href="/search?q=dashcam&page=2">', "https://shop.example/search?q=dashcam&page=2"),
+    ('<a data-testid="NextPage" href="/search?q=dashcam&amp;page=2">›</a>',
+     "https://shop.example/search?q=dashcam&page=2"),
+    ('<a class="s-pagination-next" href="/search?q=dashcam&_pgn=2">›</a>',
+     "https://shop.example/search?q=dashcam&_pgn=2"),
+    ('<a class="next page-numbers" href="/search/page/2/">→</a>', "https://shop.example/search/page/2/"),
+])
+def test_next_link_styles(html, expected):
+    assert find_next_page(html, LISTING) == expected
+
+
+def test_last_page_has_no_next():
+    html = '<a href="/search?q=dashcam&page=1">1</a><a href="/search?q=dashcam">Back</a>'
+    assert find_next_page(html, LISTING + "&page=2") is None
@@ -0,0 +1,45 @@
+"""
+parse_products() with html.parser is the reference: the lxml backend and the
+streaming iter_products() must give the same products on every layout.
+"""
+
+import pytest
+
+from conftest import read_fixture
+from scraper import parse_products, iter_products
+
+FIXTURE_PAGES = ["web-scraping-dev.html", "flipkart.html", "walmart.html", "ebay.html"]
+
+
+def comparable(products):
+    # Scrape date / time differ between two parses of the same page
+    return [
+        {key: value for key, value in dict(product).items() if key not in ("scraped_date", "scraped_time")}
+        for product in products
+    ]
+
+
+@pytest.fixture(params=FIXTURE_PAGES)
+def page(request):
+    return read_fixture(request.param)
+
+
+def test_fixture_pages_have_products(page):
+    products = parse_products(page)
+    assert len(products) >= 5
+    assert all(product["price"] for product in products)
+
+
+def test_lxml_matches_html_parser(page):
+    assert comparable(parse_products(page, parser="lxml")) == comparable(parse_products(page))
+
+
+def test_iter_products_matches_parse_products(page):
+    assert comparable(iter_products(page)) == comparable(parse_products(page))
+
+
+def test_parity_with_base_url(page):
+    base_url = "https://www.example.com/search?q=laptop"
+    reference = comparable(parse_products(page, base_url=base_url))
+    assert comparable(parse_products(page, parser="lxml", base_url=base_url)) == reference
+    assert comparable(iter_products(page, base_url=base_url)) == reference
@@ -0,0 +1,62 @@
+"""Product records behave like the dicts they replaced."""
+import copy
+import json
+import pickle
+
+import pandas as pd
+import pytest
+
+from scraper import PRODUCT_COLUMNS, Product, products_to_dataframe
+
+ROW = {"product_name": "Dash cam", "price": "$99.00", "availability": "In stock", "scraped_date": "2025-12-26"}
+
+
+def test_mapping_behaviour():
+    p = Product(ROW)
+    assert dict(p) == ROW
+    assert p == ROW
+    assert list(p) == [key for key in PRODUCT_COLUMNS if key in ROW]
+    assert len(p) == 4
+    assert p["price"] == "$99.00"
+    assert p.get("rating") is None and p.get("rating", "n/a") == "n/a"
+    assert "rating" not in p
+    p["rating"] = "4.5"
+    del p["availability"]
+    assert "availability" not in p and p["rating"] == "4.5"
+    assert json.loads(json.dumps(dict(p))) == p.to_dict()
+
+
+def test_extra_fields():
+    p = Product(ROW, warranty="2 years")
+    assert p["warranty"] == "2 years"
+    assert list(p)[-1] == "warranty"
+    assert dict(p) == {**ROW, "warranty": "2 years"}
+    del p["warranty"]
+    assert "warranty" not in p
+
+
+def test_missing_keys_raise_key_error():
+    p = Product()
+    with pytest.raises(KeyError):
+        p["price"]
+    with pytest.raises(KeyError):
+        p["unknown"]
+    with pytest.raises(KeyError):
+        del p["price"]
+
+
+def test_pickle_and_copy():
+    p = Product(ROW, warranty="2 years")
+    for clone in (pickle.loads(pickle.dumps(p)), copy.deepcopy(p), copy.copy(p)):
+        assert type(clone) is Product
+        assert clone.to_dict() == p.to_dict()
+
+
+def test_dataframe():
+    products = [Product(ROW), Product(ROW, warranty="2 years")]
+    df = pd.DataFrame([products[0]])
+    assert df.to_dict("records") == [ROW]
+    # Same frame as from the equivalent dicts
+    expected = pd.DataFrame([dict(p) for p in products])
+    pd.testing.assert_frame_equal(pd.DataFrame(products), expected)
+    pd.testing.assert_frame_equal(products_to_dataframe(products), expected)
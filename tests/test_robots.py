@@ -0,0 +1,65 @@
+"""robots.txt rules: agent groups, wildcards and longest-match precedence."""
+import pytest
+
+from robots import RobotsRules
+
+ROBOTS_TXT = """
+# Comments and unknown fields are ignored
+User-agent: *
+Disallow: /private/
+Disallow: /*.pdf$
+Disallow: /search?*sort=
+Allow: /private/public-
+Crawl-delay: 2
+
+User-agent: ProductScraper
+User-agent: OtherBot
+Disallow: /checkout
+Allow: /checkout/help
+Request-rate: 1/5
+
+Sitemap: https://example.com/sitemap.xml
+"""
+
+
+@pytest.mark.parametrize("path, allowed", [
+    ("/", True),
+    ("/products/laptops", True),
+    ("/private/orders", False),
+    ("/private/public-catalog", True),      # longer Allow beats the shorter Disallow
+    ("/files/manual.pdf", False),           # "*" and "$" wildcards
+    ("/files/manual.pdf?download=1", True), # "$" anchors the end of path + query
+    ("/search?q=tv&sort=price", False),
+    ("/search?q=tv", True),
+    ("/robots.txt", True),
+])
+def test_wildcard_and_longest_match(path, allowed):
+    rules = RobotsRules(ROBOTS_TXT, user_agent="Mozilla/5.0")
+    assert rules.allowed(f"https://example.com{path}") is allowed
+    assert rules.crawl_delay == 2
+
+
+def test_named_agent_group_replaces_star_group():
+    rules = RobotsRules(ROBOTS_TXT, user_agent="ProductScraper/1.0")
+    assert rules.allowed("https://example.com/private/orders")
+    assert not rules.allowed("https://example.com/checkout/cart")
+    assert rules.allowed("https://example.com/checkout/help")
+    assert rules.crawl_delay == 5
+    assert rules.sitemaps == ["https://example.com/sitemap.xml"]
+
+
+def test_allow_wins_a_tie():
+    rules = RobotsRules("User-agent: *\nDisallow: /page\nAllow: /page\n")
+    assert rules.allowed("https://example.com/page")
+
+
+def test_empty_disallow_allows_everything():
+    rules = RobotsRules("User-agent: *\nDisallow:\n")
+    assert rules.allowed("https://example.com/anything")
+
+
+def test_no_robots_and_unreachable_robots():
+    assert RobotsRules().allowed("https://example.com/private/")
+    blocked = RobotsRules(disallow_all=True)
+    assert not blocked.allowed("https://example.com/")
+    assert blocked.allowed("https://example.com/robots.txt")
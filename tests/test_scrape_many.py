@@ -0,0 +1,71 @@
+"""scrape_many() against the local fixture server, in this process and with a parse pool."""
+
+import os
+
+import pytest
+
+import scraper
+from test_parser_parity import FIXTURE_PAGES, comparable
+
+CRASH_MARKER = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".crashed-once")
+
+
+_parse_worker = scraper._parse_worker
+
+
+def crashing_parse_worker(html_bytes, parser, base_url):
+    # Kills the worker process on "crash" pages (only the first time for "crash-once")
+    if "crash-always" in base_url or ("crash-once" in base_url and not os.path.exists(CRASH_MARKER)):
+        open(CRASH_MARKER, "w").close()
+        os._exit(1)
+    return _parse_worker(html_bytes, parser, base_url)
+
+
+@pytest.fixture
+def fresh_parse_pool():
+    scraper.shutdown_parse_pool()
+    yield
+    scraper.shutdown_parse_pool()
+    if os.path.exists(CRASH_MARKER):
+        os.remove(CRASH_MARKER)
+
+
+def scrape_many(urls, **kwargs):
+    return scraper.scrape_many(urls, export_format="parquet", use_price_history=False,
+                               track_changes=False, **kwargs)
+
+
+def test_parse_pool_matches_in_process(fixture_server, fast_throttle, scrape_dir, fresh_parse_pool):
+    urls = [f"{fixture_server.url}/{name}" for name in FIXTURE_PAGES]
+    success, _, df, count = scrape_many(urls)
+    pooled_success, _, pooled_df, pooled_count = scrape_many(urls, parse_workers=2)
+    assert success and pooled_success and count == pooled_count
+    drop = ["scraped_date", "scraped_time"]
+    assert comparable(pooled_df.drop(columns=drop).to_dict("records")) == \
+        comparable(df.drop(columns=drop).to_dict("records"))
+
+
+def test_failed_fetches_are_reported(fixture_server, fast_throttle, scrape_dir, fresh_parse_pool):
+    urls = [f"{fixture_server.url}/ebay.html", f"{fixture_server.url}/missing.html",
+            f"{fixture_server.url}/private/ebay.html"]
+    success, message, df, count = scrape_many(urls, parse_workers=1)
+    assert success and count == 5
+    assert "missing.html: 404" in message and "robots.txt" in message
+
+
+def test_crashed_parse_is_fetched_again_once(fixture_server, fast_throttle, scrape_dir, fresh_parse_pool,
+                                             monkeypatch):
+    monkeypatch.setattr(scraper, "_parse_worker", crashing_parse_worker)
+    urls = [f"{fixture_server.url}/ebay.html?crash-once", f"{fixture_server.url}/flipkart.html"]
+    success, message, _, count = scrape_many(urls, parse_workers=1)
+    assert success and count == 10 and "Failed" not in message
+    assert fixture_server.requests.count("/ebay.html") == 2
+
+
+def test_page_crashing_every_parse_fails(fixture_server, fast_throttle, scrape_dir, fresh_parse_pool,
+                                         monkeypatch, capsys):
+    monkeypatch.setattr(scraper, "_parse_worker", crashing_parse_worker)
+    success, _, _, _ = scrape_many([f"{fixture_server.url}/ebay.html?crash-always"], parse_workers=1)
+    assert not success
+    assert "Parse worker crashed on" in capsys.readouterr().out
+    assert fixture_server.requests.count("/ebay.html") == 2
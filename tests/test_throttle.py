@@ -0,0 +1,34 @@
+"""HostThrottle reads robots.txt (for Crawl-delay) only when robots rules are respected."""
+import pytest
+
+import scraper
+from robots import RobotsCache
+from scraper import HostThrottle, fetch_page
+
+
+@pytest.fixture(autouse=True)
+def fresh_robots(monkeypatch):
+    monkeypatch.setattr(scraper, "_robots", RobotsCache(scraper.get_session, scraper.HEADERS["User-Agent"]))
+
+
+def test_robots_not_fetched_when_robots_are_ignored(fixture_server, monkeypatch):
+    monkeypatch.setattr(scraper, "RESPECT_ROBOTS", False)
+    monkeypatch.setattr(scraper, "HOST_THROTTLE", HostThrottle(start_rate=1000, max_rate=1000))
+
+    assert scraper.HOST_THROTTLE.reserve(f"{fixture_server.url}/ebay.html") >= 0
+    html, error = fetch_page(f"{fixture_server.url}/private/ebay.html")
+    assert error is None
+    assert "/robots.txt" not in fixture_server.requests
+    assert "/private/ebay.html" in fixture_server.requests
+
+
+def test_crawl_delay_read_when_robots_are_respected(fixture_server, monkeypatch):
+    monkeypatch.setattr(scraper, "RESPECT_ROBOTS", True)
+    HostThrottle(start_rate=1000, max_rate=1000).reserve(f"{fixture_server.url}/ebay.html")
+    assert fixture_server.requests == ["/robots.txt"]
+
+
+def test_explicit_setting_overrides_respect_robots(fixture_server, monkeypatch):
+    monkeypatch.setattr(scraper, "RESPECT_ROBOTS", True)
+    HostThrottle(start_rate=1000, max_rate=1000, respect_crawl_delay=False).reserve(f"{fixture_server.url}/ebay.html")
+    assert fixture_server.requests == []
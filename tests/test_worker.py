@@ -0,0 +1,65 @@
+"""Worker job timeouts: a hung job is stopped and failed instead of holding its lease."""
+import sqlite3
+import time
+
+import worker
+from jobqueue import SQLiteJobQueue
+
+
+def job_row(db_path, job_id):
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        return conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    finally:
+        conn.close()
+
+
+def leased_job(tmp_path, params):
+    db_path = str(tmp_path / "jobs.db")
+    queue = SQLiteJobQueue(db_path)
+    queue.enqueue("https://example.com/products", name="Test", params=params)
+    return db_path, queue, queue.lease("worker-1", lease_seconds=30)
+
+
+def test_job_that_finishes_is_completed(tmp_path, monkeypatch):
+    monkeypatch.setattr(worker, "configure_session", lambda **kwargs: None)
+    monkeypatch.setattr(worker, "scrape_and_save", lambda url, job_name=None, **params: (True, "ok", None, 3))
+    db_path, queue, job = leased_job(tmp_path, {"max_pages": 1, "timeout": 30})
+
+    assert worker.run_job(queue, job, lease_seconds=30) is True
+    assert job_row(db_path, job["id"])["status"] == "done"
+
+
+def test_hung_job_is_stopped_and_failed(tmp_path, monkeypatch):
+    def hang(url, job_name=None, **params):
+        time.sleep(60)
+        return True, "ok", None, 1
+
+    monkeypatch.setattr(worker, "configure_session", lambda **kwargs: None)
+    monkeypatch.setattr(worker, "scrape_and_save", hang)
+    db_path, queue, job = leased_job(tmp_path, {"max_pages": 1, "timeout": 1})
+
+    started = time.time()
+    assert worker.run_job(queue, job, lease_seconds=30) is False
+    assert time.time() - started < 10
+
+    row = job_row(db_path, job["id"])
+    assert row["status"] == "queued"
+    assert row["lease_token"] is None
+    assert "Timed out" in row["last_error"]
+    # The stopped job's heartbeats are over: its old lease can no longer be renewed
+    assert queue.heartbeat(job["id"], job["lease_token"]) is False
+
+
+def test_crashed_job_process_is_failed(tmp_path, monkeypatch):
+    def crash(url, job_name=None, **params):
+        import os
+        os._exit(3)
+
+    monkeypatch.setattr(worker, "configure_session", lambda **kwargs: None)
+    monkeypatch.setattr(worker, "scrape_and_save", crash)
+    db_path, queue, job = leased_job(tmp_path, {"timeout": 30})
+
+    assert worker.run_job(queue, job, lease_seconds=30) is False
+    assert "exited with code 3" in job_row(db_path, job["id"])["last_error"]
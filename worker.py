@@ -0,0 +1,139 @@
+"""
+Scrape worker
+Pulls jobs from the job queue (jobqueue.py) and runs scrape_and_save() for
+each one in a child process, stopped after the job's timeout. Start as many
+workers as needed on the machine that holds the SQLite queue (workers on
+other machines need a networked backend, see jobqueue.QUEUE_BACKENDS):
+
+    python worker.py
+    python worker.py --queue sqlite:scraped_data/job_queue.db --id worker-2
+"""
+
+import os
+import random
+import socket
+import argparse
+from time import sleep
+from threading import Thread, Event
+from multiprocessing import Process, Pipe
+
+from jobqueue import open_job_queue, DEFAULT_LEASE_SECONDS
+from scraper import scrape_and_save, configure_session
+from scheduler import SESSION_OPTIONS, DEFAULT_JOB_TIMEOUT
+
+# Seconds between two looks at an empty queue (+ up to 50% jitter, so idle
+# workers do not all poll at the same moment)
+POLL_SECONDS = 10
+
+# Job params passed through to scrape_and_save()
+JOB_PARAMS = ("max_pages", "max_products", "export_format", "parser", "parse_workers")
+
+
+def _heartbeat(queue, job, lease_seconds, done):
+    # Renew the lease at a third of its length until the job is done
+    while not done.wait(lease_seconds / 3):
+        if not queue.heartbeat(job["id"], job["lease_token"], lease_seconds):
+            print(f"⚠️  Lost the lease on job {job['id']} ({job['name']}); its result will be discarded")
+            return
+
+
+def _job_process(conn, url, job_name, params):
+    # Child process: fresh HTTP session, run the scrape, send (success, message, count) back
+    configure_session(**SESSION_OPTIONS)
+    try:
+        success, message, df, count = scrape_and_save(url, job_name=job_name, **params)
+    except Exception as e:
+        success, message, count = False, f"Unexpected error: {str(e)}", 0
+    conn.send((success, message, count))
+    conn.close()
+
+
+def run_job(queue, job, lease_seconds=DEFAULT_LEASE_SECONDS):
+    """
+    Run one leased job in a child process, sending heartbeats while it runs,
+    then complete or fail it in the queue. A job still running after its
+    "timeout" param (default DEFAULT_JOB_TIMEOUT) is stopped and failed, so a
+    hung job cannot hold its lease forever.
+    Returns: True if the job succeeded
+    """
+    print(f"\n{'='*70}")
+    print(f"📥 Job {job['id']}: {job['name'] or job['url']} (attempt {job['attempts']}/{job['max_attempts']})")
+    print(f"{'='*70}")
+
+    params = {key: value for key, value in job["params"].items() if key in JOB_PARAMS}
+    timeout = job["params"].get("timeout", DEFAULT_JOB_TIMEOUT)
+    receiver, sender = Pipe(duplex=False)
+    process = Process(target=_job_process, args=(sender, job["url"], job["name"], params))
+
+    done = Event()
+    heartbeat = Thread(target=_heartbeat, args=(queue, job, lease_seconds, done), daemon=True)
+    heartbeat.start()
+    try:
+        process.start()
+        sender.close()
+        # poll() also returns when the process dies without sending a result
+        if receiver.poll(timeout):
+            try:
+                success, message, count = receiver.recv()
+            except EOFError:
+                process.join()
+                success, message, count = False, f"Job process exited with code {process.exitcode}", 0
+        else:
+            success, message, count = False, f"Timed out after {timeout} seconds", 0
+            print(f"⏱️  Job {job['id']} timed out after {timeout} seconds and was stopped")
+    finally:
+        if process.is_alive():
+            process.terminate()
+        process.join()
+        receiver.close()
+        done.set()
+        heartbeat.join()
+
+    if success:
+        if queue.complete(job["id"], job["lease_token"], {"count": count, "message": message}):
+            print(f"✅ Job {job['id']} done: {count} products")
+        return True
+
+    status = queue.fail(job["id"], job["lease_token"], message)
+    if status == "queued":
+        print(f"🔁 Job {job['id']} failed, will be retried: {message}")
+    elif status == "failed":
+        print(f"❌ Job {job['id']} failed for good: {message}")
+    return False
+
+
+def run_worker(queue_spec: str = None, worker_id: str = None, once: bool = False,
+               lease_seconds: float = DEFAULT_LEASE_SECONDS):
+    """
+    Lease and run jobs until stopped (Ctrl+C), or until the queue is empty
+    when once=True.
+    """
+    queue = open_job_queue(queue_spec)
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+
+    print(f"👷 Worker {worker_id} is running... (Press Ctrl+C to stop)\n")
+    try:
+        while True:
+            job = queue.lease(worker_id, lease_seconds)
+            if job is not None:
+                run_job(queue, job, lease_seconds)
+            elif once:
+                break
+            else:
+                sleep(POLL_SECONDS * (1 + random.random() / 2))
+    except KeyboardInterrupt:
+        # The lease of an interrupted job simply expires and another worker retries it
+        print("\n\n🛑 Worker stopped by user")
+
+    print(f"📊 Queue: {queue.stats()}")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Run scrape jobs from the job queue")
+    arg_parser.add_argument("--queue", help='Queue spec, e.g. "sqlite:scraped_data/job_queue.db"')
+    arg_parser.add_argument("--id", help="Worker name (default: <hostname>-<pid>)")
+    arg_parser.add_argument("--once", action="store_true", help="Exit when the queue is empty")
+    arg_parser.add_argument("--lease", type=float, default=DEFAULT_LEASE_SECONDS,
+                            help="Lease length in seconds (renewed by heartbeats)")
+    args = arg_parser.parse_args()
+    run_worker(args.queue, args.id, args.once, args.lease)